@@ -1,6 +1,7 @@
 # main.py
 
 import os
+import sys
 import pandas as pd
 import numpy as np
 import warnings
@@ -10,34 +11,76 @@ from src.extractors.interface.cli import (
     seleccionar_tipo_datos,
     seleccionar_extractor,
     pedir_tickers_y_fechas,
-    pedir_indicador_macro
+    pedir_indicador_macro,
+    pedir_formato_salida,
+    pedir_semilla,
+    tickers_canonicos
 )
-from src.models.series_precios import SeriePrecios
-from src.models.cartera import Cartera
-from src.utils.data_tools import quitar_outliers, rellenar_na, validar_df, sincronizar_fechas
-from src.utils.export_tools import exportar_a_excel
+from src.models.panel_precios import PanelPrecios
+from src.utils.data_tools import quitar_outliers, rellenar_huecos_series, validar_df, sincronizar_fechas
+from src.utils.export_tools import exportar_resultados
+from src.utils.render_graficos import obtener_servicio
+from src.extractors.fundamentales import AlmacenFundamentales
+from src.utils.espacio_trabajo import EspacioTrabajo, rango_cerrado
 
 
 # =========================================================
 # 1. Flujo principal
 # =========================================================
-def main():
+def simular(espacio: EspacioTrabajo, clave: str, funcion, semilla, persistir: bool, aviso: str):
+    """Con semilla la simulación es reproducible y se reutiliza; sin semilla siempre se generan trayectorias nuevas."""
+    if semilla is None:
+        return funcion()
+    return espacio.obtener_o_calcular(clave, funcion, persistir=persistir, aviso=aviso)
+
+
+def elegir_dataset_guardado(espacio: EspacioTrabajo):
+    """Ofrece reutilizar un dataset de precios ya descargado (en esta u otra ejecución)."""
+    # Los rangos que llegan hasta hoy se vuelven a descargar (puede haber sesiones nuevas)
+    guardados = [g for g in espacio.listar("precios") if rango_cerrado(g[1].get("fecha_fin"))]
+    if not guardados:
+        return None
+
+    print("\n🗃️ Datasets de precios disponibles sin volver a descargar:")
+    for i, (_, meta, guardado) in enumerate(guardados, start=1):
+        print(f"{i}. {', '.join(meta['tickers'])} ({meta['fecha_inicio']} → {meta['fecha_fin']}, "
+              f"{meta['proveedor']}, {meta['filas']} filas, {guardado})")
+    opcion = input("Nº del dataset a reutilizar (Enter para una nueva consulta): ").strip()
+    if opcion.isdigit() and 1 <= int(opcion) <= len(guardados):
+        clave, meta, _ = guardados[int(opcion) - 1]
+        return clave, meta
+    return None
+
+
+def flujo(espacio: EspacioTrabajo) -> bool:
+    """Una consulta completa. Devuelve True para volver al menú principal y False para salir."""
     print("\n" + "=" * 60)
     print("ANÁLISIS DE DATOS BURSÁTILES")
     print("=" * 60)
 
-    # Paso 1: Tipo de datos
-    tipo_datos = seleccionar_tipo_datos()
+    # Paso 0: Datasets del espacio de trabajo (se saltan la descarga)
+    reutilizado = elegir_dataset_guardado(espacio)
+    if reutilizado:
+        tipo_datos, extractor = "1", None
+        clave_datos, meta = reutilizado
+    else:
+        # Paso 1: Tipo de datos
+        tipo_datos = seleccionar_tipo_datos()
 
-    # Paso 2: Elegir extractor compatible
-    extractor = seleccionar_extractor(tipo_datos)
+        # Paso 2: Elegir extractor compatible
+        extractor = seleccionar_extractor(tipo_datos)
     # ====================================================
     # Mensaje informativo según extractor seleccionado
     # ====================================================
-    if tipo_datos == "1":  # PRECIOS HISTÓRICOS
+    if tipo_datos == "1" and extractor is not None:  # PRECIOS HISTÓRICOS
         print("\n🧭 Guía de uso del extractor seleccionado:")
+        # El extractor puede venir envuelto (caché local, single-flight...)
+        base = extractor
+        while hasattr(base, "extractor"):
+            base = base.extractor
+        tipo_extractor = str(type(base))
 
-        if "Yahoo" in str(type(extractor)):
+        if "Yahoo" in tipo_extractor:
             print("""
     📊 **Yahoo Finance**
     - Cobertura global: acciones, ETFs, índices, criptos y materias primas.
@@ -51,7 +94,7 @@ def main():
     ⚠️ Usa el sufijo del mercado correcto (.MC, .PA, .DE, etc.) o no se descargarán datos.
     """)
 
-        elif "AlphaVantage" in str(type(extractor)):
+        elif "AlphaVantage" in tipo_extractor:
             print("""
     📊 **Alpha Vantage**
     - Enfoque principal: acciones y ETFs de EE. UU.
@@ -62,7 +105,7 @@ def main():
     ⚠️ Requiere API key gratuita y puede limitar llamadas (5 por minuto).
     """)
 
-        elif "TwelveData" in str(type(extractor)):
+        elif "TwelveData" in tipo_extractor:
             print("""
     📊 **Twelve Data**
     - Cobertura global (acciones, índices, ETFs, criptos, forex), pero:
@@ -79,12 +122,32 @@ def main():
     💡 Consejo: Para acciones europeas, usa el extractor de Yahoo Finance.
     """)
 
+        elif "Router" in tipo_extractor:
+            print("""
+    🧭 **Selección automática de proveedor**
+    - Acepta tickers en formato Yahoo (AENA.MC) o TwelveData (AENA:BMAD).
+    - Cada ticker va al proveedor más barato que lo cubre; si falla, se reintenta con otro.
+    - Recuerda qué proveedor sirvió cada ticker para las siguientes ejecuciones.
+    """)
+
+        elif "Sintetico" in tipo_extractor:
+            print("""
+    🧪 **Extractor sintético (offline)**
+    - No usa la red: genera series deterministas para cualquier ticker (ej. SYN1, SYN2).
+    - Incluye huecos, duplicados y NaNs para probar la limpieza.
+    - Útil para benchmarks y pruebas de carga.
+    """)
+
 
     # Paso 3: Inputs según tipo
-    if tipo_datos in ["1", "2"]:
+    if reutilizado:
+        tickers, fecha_inicio, fecha_fin = meta["tickers"], meta["fecha_inicio"], meta["fecha_fin"]
+    elif tipo_datos in ["1", "2"]:
         tickers, fecha_inicio, fecha_fin = pedir_tickers_y_fechas()
     else:
         indicador = pedir_indicador_macro()
+    # El formato se pregunta al exportar por primera vez (los fundamentales no exportan)
+    formato_salida = None
 
     # Paso 4: Extracción de datos
     df = pd.DataFrame()
@@ -93,8 +156,27 @@ def main():
     # TIPO 1 - PRECIOS HISTÓRICOS
     # ====================================================
     if tipo_datos == "1":
-        print(f"\nDescargando precios de {len(tickers)} activos...")
-        df = extractor.obtener_datos(tickers, fecha_inicio, fecha_fin)
+        # Panel, series, carteras, claves y rutas usan el nombre con el que vuelven los datos
+        tickers = tickers_canonicos(extractor, tickers)
+        if not reutilizado:
+            clave_datos = espacio.clave("precios", type(base).__name__, tickers, fecha_inicio, fecha_fin)
+        # Rango abierto (hasta hoy o después): solo vive en memoria durante esta ejecución
+        cerrado = rango_cerrado(fecha_fin)
+        if espacio.contiene(clave_datos, en_disco=cerrado):
+            print(f"\n♻️ Precios de {len(tickers)} activos ya cargados en el espacio de trabajo.")
+            df = espacio.obtener(clave_datos)
+        else:
+            print(f"\nDescargando precios de {len(tickers)} activos...")
+            df = extractor.obtener_datos(tickers, fecha_inicio, fecha_fin)
+            # Solo hay estadísticas si el extractor elegido usó el transporte HTTP (requests)
+            transporte = sys.modules.get("src.extractors.transporte_http")
+            if transporte and transporte.estadisticas_http().peticiones:
+                print(transporte.estadisticas_http().resumen())
+            if not df.empty:
+                espacio.guardar(clave_datos, df, persistir=cerrado, meta={
+                    "tickers": tickers, "fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin,
+                    "proveedor": type(base).__name__, "filas": len(df),
+                })
 
     # ====================================================
     # TIPO 2 - DATOS FUNDAMENTALES
@@ -102,16 +184,10 @@ def main():
     elif tipo_datos == "2":
 
         print("\nDescargando datos fundamentales...")
-        dfs = []
-        for t in tickers:
-            if hasattr(extractor, "obtener_datos_fundamentales"):
-                print(f"📊 Descargando datos fundamentales para {t}...")
-                df_fund = extractor.obtener_datos_fundamentales(t)
-                if not df_fund.empty:
-                    dfs.append(df_fund)
-        if dfs:
-            df = pd.concat(dfs, ignore_index=True)
-        else:
+        # Caché con TTL: solo se llama a la API para los tickers sin datos recientes
+        almacen_fund = AlmacenFundamentales(extractor)
+        df = almacen_fund.obtener(tickers)
+        if df.empty:
             print("⚠️ No se obtuvieron datos fundamentales.")
 
     # ====================================================
@@ -123,7 +199,7 @@ def main():
         print("\n🌍 Análisis de datos macroeconómicos")
 
         # === Pedir país y rango temporal ===
-        pais = input("Ingrese el país (código ISO o nombre, ej. USA, FRA, ESP): ").strip().upper()
+        pais = input("Ingrese el país o países separados por coma (código ISO, ej. USA, FRA, ESP): ").strip().upper()
         rango = input("Ingrese el rango de años (ej. 2010-2025): ").strip()
         try:
             anio_inicio, anio_fin = [int(x) for x in rango.split("-")]
@@ -136,6 +212,22 @@ def main():
         while continuar:
             indicadores = ["GDP", "INFLATION", "UNEMPLOYMENT", "CPI"] if indicador == "ALL" else [indicador]
 
+            # 🔹 World Bank: todos los indicadores × países en una sola petición
+            if hasattr(extractor, "obtener_datos_macro_lote"):
+                paises = [p.strip() for p in pais.split(",") if p.strip()]
+                try:
+                    df_lote = extractor.obtener_datos_macro_lote(indicadores, paises, anio_inicio, anio_fin)
+                except Exception as e:
+                    print(f"⚠️ Error al obtener {', '.join(indicadores)}: {e}")
+                    df_lote = pd.DataFrame()
+
+                if not df_lote.empty:
+                    for (ind, p), df_i in df_lote.groupby(["INDICADOR", "PAIS"], sort=False):
+                        clave = ind if len(paises) == 1 else f"{ind}_{p}"
+                        all_data[clave] = df_i.reset_index(drop=True)
+                        print(f"✅ {clave}: {len(df_i)} registros obtenidos.")
+                indicadores = []
+
             for ind in indicadores:
                 print(f"\n📊 Descargando indicador '{ind}' para {pais} ({anio_inicio}-{anio_fin})...")
                 try:
@@ -163,9 +255,10 @@ def main():
                     continuar = False
 
         if all_data:
-            ruta_excel = f"outputs/macro_{pais}_{anio_inicio}-{anio_fin}.xlsx"
-            exportar_a_excel(ruta_excel, all_data)
-            print(f"\n📁 Datos macroeconómicos exportados correctamente a: {ruta_excel}")
+            ruta_excel = f"outputs/macro_{pais.replace(',', '_').replace(' ', '')}_{anio_inicio}-{anio_fin}.xlsx"
+            formato_salida = formato_salida or pedir_formato_salida()
+            rutas = exportar_resultados(ruta_excel, all_data, formato=formato_salida)
+            print(f"\n📁 Datos macroeconómicos exportados correctamente a: {', '.join(rutas)}")
 
             print("\nResumen general:")
             for k, v in all_data.items():
@@ -186,21 +279,21 @@ def main():
             print("2️⃣  Salir")
             opcion_fin = input("Opción [1-2]: ").strip()
             if opcion_fin == "1":
-                return main()
+                return True
             else:
                 print("\n👋 Gracias por usar el Análisis Bursátil. ¡Hasta pronto!")
-                return
+                return False
 
         else:
             print("⚠️ No se obtuvieron datos macroeconómicos.")
-            return main()
+            return True
 
     # ====================================================
     # Validación inicial
     # ====================================================
     if df.empty and tipo_datos != "3":
         print("\n⚠️ No se obtuvieron datos válidos. Ejecución finalizada.")
-        return main()
+        return True
 
     # ====================================================
     # Resultados según tipo
@@ -219,15 +312,28 @@ def main():
             with open("reports/reporte_fundamentales.md", "w", encoding="utf-8") as f:
                 f.write(reporte)
             print("📝 Reporte guardado en 'reports/reporte_fundamentales.md'")
+
+            # Screening en memoria sobre el índice ordenado de ratios
+            consulta = input("\nFiltro de screening (ej. PERatio < 15 and DividendYield > 3%), Enter para omitir: ").strip()
+            if consulta:
+                try:
+                    resultado = almacen_fund.indice(tickers).consultar(consulta)
+                    columnas = [c for c in ["ticker", "Name", "PERatio", "DividendYield", "MarketCapitalization"]
+                                if c in resultado.columns]
+                    print(f"\n🔎 {len(resultado)} empresa(s) cumplen el filtro:")
+                    print(resultado[columnas].to_string(index=False))
+                except (KeyError, ValueError) as e:
+                    print(f"⚠️ Filtro no válido: {e}")
+
             print("\n¿Deseas volver al menú principal o salir?")
             print("1️⃣  Volver al menú principal")
             print("2️⃣  Salir")
             opcion_fin = input("Opción [1-2]: ").strip()
             if opcion_fin == "1":
-                return main()
+                return True
             else:
                 print("\n👋 Gracias por usar el Análisis Bursátil. ¡Hasta pronto!")
-                return
+                return False
             
 
     # ====================================================
@@ -236,21 +342,30 @@ def main():
     if tipo_datos == "1":
         usar_limpieza = input("\n¿Desea aplicar limpieza avanzada (detección de outliers y NaNs)? [s/n]: ").lower()
         if usar_limpieza == "s":
-            print("\n🧹 Aplicando limpieza avanzada de datos...")
-            errores = validar_df(df, columnas_unicas=["date", "ticker"], permitir_negativos=["returns"])
-            if errores:
-                print(f"⚠️ Se detectaron posibles incidencias en los datos ({len(errores)} tipos).")
-
-            df = quitar_outliers(df, columnas=["close"], metodo="percentil")
-            df = rellenar_na(df, estrategia="media")
-            df = sincronizar_fechas(df)  # 👈 nueva función elegante de alineación temporal
-            print("✅ Limpieza avanzada completada.\n")
+            clave_limpio = espacio.clave("limpio", clave_datos)
+            if espacio.contiene(clave_limpio, en_disco=cerrado):
+                print("\n♻️ Limpieza ya aplicada a este dataset: se reutiliza el resultado.")
+                df = espacio.obtener(clave_limpio)
+            else:
+                print("\n🧹 Aplicando limpieza avanzada de datos...")
+                errores = validar_df(df, columnas_unicas=["date", "ticker"], permitir_negativos=["returns"])
+                if errores:
+                    print(f"⚠️ Se detectaron posibles incidencias en los datos ({len(errores)} tipos).")
+                    for comprobacion, n_filas in errores.conteos().items():
+                        print(f"   - {comprobacion}: {n_filas} filas")
+
+                df = quitar_outliers(df, columnas=["close"], metodo="percentil")
+                df = rellenar_huecos_series(df, max_huecos=5)  # huecos cortos por ticker, sobre las sesiones del propio dataset
+                df = sincronizar_fechas(df)  # 👈 nueva función elegante de alineación temporal
+                espacio.guardar(clave_limpio, df, persistir=cerrado)
+                print("✅ Limpieza avanzada completada.\n")
+            clave_datos = clave_limpio
 
             # === Diagnóstico de sincronización temporal ===
             print("🔎 Verificando solapamiento temporal entre los activos...\n")
 
             # Mostrar rango temporal individual por ticker
-            rangos = df.groupby("ticker")["date"].agg(["min", "max", "count"])
+            rangos = df.groupby("ticker", observed=True)["date"].agg(["min", "max", "count"])
             print(rangos)
 
             # Calcular intersección de fechas
@@ -267,6 +382,15 @@ def main():
     # Análisis (solo precios)
     # ====================================================
     if tipo_datos == "1":
+        # Panel fechas × tickers construido una sola vez; series y cartera se construyen a partir de él
+        # (los objetos derivados viven solo en memoria: se reconstruyen en segundos)
+        panel = espacio.obtener_o_calcular(
+            espacio.clave("panel", clave_datos),
+            lambda: PanelPrecios.desde_largo(df, modo="union", max_huecos=0),
+            persistir=False,
+        )
+        print(f"🧮 {panel} listo para el análisis.")
+
         while True:
             print("\nSeleccione el tipo de análisis:")
             print("1️⃣  Serie individual")
@@ -283,9 +407,10 @@ def main():
                 os.makedirs("reports", exist_ok=True)
 
                 for ticker in tickers:
-                    datos_ticker = df[df["ticker"] == ticker].copy()
-                    serie = SeriePrecios(ticker, datos_ticker)
-                    reporte = serie.report()
+                    serie = espacio.obtener_o_calcular(espacio.clave("serie", clave_datos, ticker),
+                                                       lambda: panel.serie(ticker), persistir=False)
+                    reporte = espacio.obtener_o_calcular(espacio.clave("reporte_serie", clave_datos, ticker),
+                                                         serie.report, persistir=False)
 
                     print(reporte)
 
@@ -299,12 +424,11 @@ def main():
                 print("\n=== 💼 Análisis de Cartera ===")
 
                 # 1️⃣ Composición de la cartera
-                cartera = Cartera(nombre="Cartera MIAX")
-                for ticker in tickers:
-                    datos_ticker = df[df["ticker"] == ticker].copy()
-                    serie = SeriePrecios(ticker, datos_ticker)
-                    cartera.agregar_serie(serie)
-                    print(f"➕ Añadido {ticker} a la cartera ({len(datos_ticker)} observaciones).")
+                cartera = espacio.obtener_o_calcular(espacio.clave("cartera", clave_datos, tickers),
+                                                     lambda: panel.cartera(tickers, nombre="Cartera MIAX"),
+                                                     persistir=False)
+                for serie in cartera.series:
+                    print(f"➕ Añadido {serie.ticker} a la cartera ({len(serie.datos)} observaciones).")
 
                 print("\n✅ Cartera compuesta correctamente con los siguientes activos:")
                 for t, w in cartera.pesos.items():
@@ -312,7 +436,8 @@ def main():
 
                 # 2️⃣ Reporte ejecutivo
                 print("\n📊 Calculando métricas globales...\n")
-                reporte_cartera = cartera.report()
+                reporte_cartera = espacio.obtener_o_calcular(espacio.clave("reporte_cartera", clave_datos, tickers),
+                                                             cartera.report, persistir=False)
                 print(reporte_cartera)
 
                 # Guardar reporte en archivo markdown
@@ -327,9 +452,22 @@ def main():
                 num_sim = input("Nº de simulaciones (default 500): ").strip()
                 num_days = int(num_days) if num_days else 252
                 num_sim = int(num_sim) if num_sim else 500
+                semilla = pedir_semilla()
+
+                def simular_cartera():
+                    # La simulación de cartera usa el generador global de numpy
+                    if semilla is not None:
+                        np.random.seed(semilla)
+                    return cartera.simulate_montecarlo(num_days=num_days, num_simulations=num_sim)
 
                 try:
-                    sim_cartera = cartera.simulate_montecarlo(num_days=num_days, num_simulations=num_sim)
+                    sim_cartera = simular(
+                        espacio, espacio.clave("sim_cartera", clave_datos, tickers, num_days, num_sim, semilla),
+                        simular_cartera, semilla, persistir=cerrado,
+                        aviso="Simulación de cartera con estos parámetros ya calculada: se reutiliza.",
+                    )
+                    # El gráfico dibuja la última simulación de la cartera (puede venir del disco)
+                    cartera._last_simulation = sim_cartera
                     resumen_sim = sim_cartera.describe().T[["mean", "std", "min", "50%", "max"]]
                     print("\n📈 Resumen de la simulación de la cartera:")
                     print(resumen_sim.head())
@@ -343,13 +481,15 @@ def main():
                     datos_para_exportar = {
                         "Datos Crudos": df,
                         "Series Individuales": "\n".join(
-                            [SeriePrecios(t, df[df['ticker'] == t]).report() for t in tickers]
+                            [s.report() for s in cartera.series]
                         ),
                         "Cartera": reporte_cartera,
                         "Simulación Monte Carlo": resumen_sim
                     }
-                    exportar_a_excel(ruta_excel, datos_para_exportar, imagenes=["simulaciones.png"])
-                    print(f"\n📁 Resultados exportados correctamente a: {ruta_excel}\n")
+                    formato_salida = formato_salida or pedir_formato_salida()
+                    rutas = exportar_resultados(ruta_excel, datos_para_exportar, imagenes=["simulaciones.png"],
+                                                formato=formato_salida)
+                    print(f"\n📁 Resultados exportados correctamente a: {', '.join(rutas)}\n")
 
                 except Exception as e:
                     print(f"⚠️ Error durante la simulación de la cartera: {e}")
@@ -362,38 +502,50 @@ def main():
                 num_sim = input("Nº de simulaciones (default 500): ").strip()
                 num_days = int(num_days) if num_days else 252
                 num_sim = int(num_sim) if num_sim else 500
+                semilla = pedir_semilla()
 
                 resultados_simulaciones = {}
+                graficos_simulaciones = {}
+                servicio_graficos = obtener_servicio()
                 print("\n🚀 Ejecutando simulaciones Monte Carlo...\n")
 
-                for ticker in tickers:
+                for i, ticker in enumerate(tickers):
                     print(f"📈 Simulando {ticker}...")
+                    semilla_ticker = None if semilla is None else semilla + i
 
-                    datos_ticker = df[df["ticker"] == ticker].copy()
-                    serie = SeriePrecios(ticker, datos_ticker)
+                    serie = espacio.obtener_o_calcular(espacio.clave("serie", clave_datos, ticker),
+                                                       lambda: panel.serie(ticker), persistir=False)
 
                     try:
-                        sim = serie.simulate_montecarlo(
-                            num_days=num_days,
-                            num_simulations=num_sim,
-                            use_historical_params=True
+                        sim = simular(
+                            espacio, espacio.clave("sim", clave_datos, ticker, num_days, num_sim, semilla_ticker),
+                            lambda: serie.simulate_montecarlo(
+                                num_days=num_days,
+                                num_simulations=num_sim,
+                                use_historical_params=True,
+                                random_seed=semilla_ticker
+                            ),
+                            semilla_ticker, persistir=cerrado,
+                            aviso=f"Simulación de {ticker} con estos parámetros ya calculada: se reutiliza.",
                         )
 
                         # Guardamos la simulación en el dict
                         resultados_simulaciones[ticker] = sim
 
-                        # Guardamos el gráfico individual
+                        # Encolamos los gráficos (abanico + histograma) en el pool de renderizado
+                        # y seguimos simulando mientras se dibujan
                         grafico_path = f"outputs/Simulacion_MonteCarlo_{ticker}.png"
-                        serie.plot_last_simulation(
+                        graficos_simulaciones[ticker] = servicio_graficos.simulacion(
+                            sim,
+                            grafico_path,
                             n_plot=50,
-                            title=f"Simulación de Montecarlo - {ticker}",
-                            savepath=grafico_path
+                            titulo=f"Simulación de Montecarlo - {ticker}"
                         )
 
                         # Mostramos resumen por consola
                         print(f"\n📊 Resumen de la simulación de {ticker}:")
                         print(sim.head())
-                        print(f"🖼️ Gráfico guardado en: {grafico_path}\n")
+                        print(f"🖼️ Gráfico en cola: {grafico_path}\n")
 
                     except Exception as e:
                         print(f"⚠️ Error en la simulación de {ticker}: {e}\n")
@@ -406,12 +558,15 @@ def main():
                     for ticker, sim_df in resultados_simulaciones.items():
                         hojas_export[f"Sim_{ticker}"] = sim_df
 
-                    # Construimos lista de imágenes generadas
-                    imagenes_paths = [f"outputs/Simulacion_MonteCarlo_{t}.png" for t in tickers if os.path.exists(f"outputs/Simulacion_MonteCarlo_{t}.png")]
+                    # Gráficos a incrustar (el Excel espera solo por cada uno al insertarlo)
+                    imagenes_paths = [graficos[0] for graficos in graficos_simulaciones.values()]
 
                     # Exportamos simulaciones con gráficos incrustados
-                    exportar_a_excel(ruta_excel, hojas_export, imagenes=imagenes_paths)
-                    print(f"\n📁 Todas las simulaciones exportadas a: {ruta_excel} (con gráficos individuales)")
+                    formato_salida = formato_salida or pedir_formato_salida()
+                    rutas = exportar_resultados(ruta_excel, hojas_export, imagenes=imagenes_paths, formato=formato_salida)
+                    servicio_graficos.esperar_todos()
+                    con_graficos = " (con gráficos individuales)" if formato_salida != "parquet" else ""
+                    print(f"\n📁 Todas las simulaciones exportadas a: {', '.join(rutas)}{con_graficos}")
 
                 else:
                     print("⚠️ No se generaron simulaciones válidas.")
@@ -422,12 +577,51 @@ def main():
 
             elif opcion_analisis == "5":
                 print("\n👋 Gracias por usar el Análisis Bursátil. ¡Hasta pronto!")
-                return
-            
-    return main()
+                return False
+
+    return True
+
+
+def main(presupuesto_mb: float = 512):
+    """
+    Menú iterativo: cada vuelta es una consulta completa y lo ya descargado, limpiado
+    o simulado queda en el espacio de trabajo para las siguientes (y para otras ejecuciones).
+    """
+    espacio = EspacioTrabajo(presupuesto_mb=presupuesto_mb)
+    while flujo(espacio):
+        print(f"\n🗃️ {espacio}")
+
+def parsear_argumentos(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Análisis Bursátil: menú interactivo, ejecución por lotes, servicio o planificador.")
+    parser.add_argument("--batch", metavar="TRABAJOS", help="Fichero JSON/YAML con uno o varios trabajos (sin menús).")
+    parser.add_argument("--workers", type=int, default=4, help="Procesos en paralelo: trabajos batch o simulaciones del servicio (default 4).")
+    parser.add_argument("--resumen", metavar="RUTA", help="Dónde guardar el resumen JSON del lote.")
+    parser.add_argument("--memoria", type=float, default=512, help="MB del espacio de trabajo en memoria (default 512).")
+    parser.add_argument("--servir", "--serve", action="store_true", help="Arranca el servicio HTTP/JSON local (sin menús).")
+    parser.add_argument("--host", default="127.0.0.1", help="Dirección del servicio (default 127.0.0.1).")
+    parser.add_argument("--puerto", type=int, default=8765, help="Puerto del servicio (default 8765).")
+    parser.add_argument("--proveedor", default="yahoo", help="Proveedor de precios del servicio (yahoo, sintetico, auto...).")
+    parser.add_argument("--planificar", metavar="UNIVERSOS", help="Fichero JSON/YAML de universos a mantener al día (sin menús).")
+    parser.add_argument("--una-vez", action="store_true", help="Con --planificar: un solo ciclo de refresco y salir.")
+    parser.add_argument("--ciclo", type=float, default=60, help="Con --planificar: segundos entre ciclos (default 60).")
+    return parser.parse_args(argv)
+
 
 if __name__ == "__main__":
-    main()
+    args = parsear_argumentos()
+    if args.batch:
+        from src.batch.runner import main_batch
+        raise SystemExit(main_batch(args.batch, max_workers=args.workers, ruta_resumen=args.resumen))
+    if args.servir:
+        from src.servicio.servidor import servir
+        servir(args.host, args.puerto, proveedor=args.proveedor, presupuesto_mb=args.memoria, max_workers=args.workers)
+        raise SystemExit(0)
+    if args.planificar:
+        from src.planificador.refresco import main_planificador
+        raise SystemExit(main_planificador(args.planificar, una_vez=args.una_vez, segundos_ciclo=args.ciclo))
+    main(presupuesto_mb=args.memoria)
 
 
 
@@ -0,0 +1,485 @@
+# src/batch/runner.py
+import copy
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+# ==========================================================
+# Especificación de trabajos
+# ==========================================================
+# Un trabajo es un dict (JSON o YAML) con la misma información que piden los menús:
+#
+#   nombre: cartera_tech
+#   tipo: precios                    # precios | fundamentales | macro
+#   proveedor: yahoo                 # yahoo | alphavantage | twelvedata | sintetico | auto | worldbank
+#   tickers: [AAPL, MSFT, GOOGL]
+#   fecha_inicio: 2020-01-01
+#   fecha_fin: 2024-12-31
+#   limpieza: {validar: true, outliers: {metodo: percentil}, huecos: {max_huecos: 5}, sincronizar: true}
+#   analisis: [series, cartera, montecarlo, estres]
+#   simulacion: {dias: 252, simulaciones: 500, semilla: 42, graficos: true}
+#   salida: {directorio: outputs/batch/cartera_tech, formato: excel}   # excel | parquet | ambos
+#   cache: true                      # reutiliza etapas ya calculadas (data/cache/pipeline)
+#
+# Para macro: indicadores: [GDP, CPI], paises: [ESP, FRA], anio_inicio: 2010, anio_fin: 2024
+
+TRABAJO_POR_DEFECTO = {
+    "tipo": "precios",
+    "proveedor": None,
+    "tickers": [],
+    "fecha_inicio": None,
+    "fecha_fin": None,
+    "limpieza": {"validar": True, "outliers": {"metodo": "percentil"}, "huecos": {"max_huecos": 5}, "sincronizar": True},
+    "analisis": ["series", "cartera"],
+    "simulacion": {"dias": 252, "simulaciones": 500, "semilla": None, "graficos": True},
+    "salida": {"directorio": None, "formato": "excel"},
+    "cache": True,
+    "indicadores": ["GDP", "INFLATION", "UNEMPLOYMENT", "CPI"],
+    "paises": ["USA"],
+    "anio_inicio": 2010,
+    "anio_fin": 2025,
+}
+
+ANALISIS_VALIDOS = {"series", "cartera", "montecarlo", "estres"}
+
+# Entra en la clave de todas las etapas: subirla invalida la caché del pipeline
+# cuando cambia código que las etapas usan pero no contienen (modelos, limpieza...)
+VERSION_PIPELINE = "3"
+
+_LOCK_ALEATORIO = threading.Lock()
+
+
+def cargar_trabajos(ruta: str) -> list:
+    """
+    Lee un fichero de trabajos (.json, .yaml o .yml). Admite un trabajo suelto,
+    una lista de trabajos o un dict con la clave 'trabajos' (más 'comun' opcional,
+    que se aplica como valores por defecto a todos).
+    """
+    with open(ruta, "r", encoding="utf-8") as f:
+        if ruta.lower().endswith((".yaml", ".yml")):
+            import yaml
+            contenido = yaml.safe_load(f)
+        else:
+            contenido = json.load(f)
+
+    comun = {}
+    if isinstance(contenido, dict) and "trabajos" in contenido:
+        comun = contenido.get("comun", {})
+        contenido = contenido["trabajos"]
+    if isinstance(contenido, dict):
+        contenido = [contenido]
+    return [normalizar_trabajo({**comun, **t}, i) for i, t in enumerate(contenido)]
+
+
+def normalizar_trabajo(spec: dict, indice: int = 0) -> dict:
+    """Completa un trabajo con los valores por defecto y valida lo imprescindible."""
+    trabajo = {**copy.deepcopy(TRABAJO_POR_DEFECTO), **copy.deepcopy(spec)}
+    for clave in ("limpieza", "simulacion", "salida"):
+        if isinstance(spec.get(clave), dict):
+            trabajo[clave] = {**TRABAJO_POR_DEFECTO[clave], **copy.deepcopy(spec[clave])}
+
+    trabajo["nombre"] = str(spec.get("nombre") or f"trabajo_{indice + 1}")
+    trabajo["tipo"] = trabajo["tipo"].lower()
+    if trabajo["proveedor"] is None:
+        trabajo["proveedor"] = {"precios": "yahoo", "fundamentales": "alphavantage", "macro": "worldbank"}.get(trabajo["tipo"])
+    if trabajo["salida"]["directorio"] is None:
+        trabajo["salida"]["directorio"] = os.path.join("outputs", "batch", trabajo["nombre"])
+    if isinstance(trabajo["tickers"], str):
+        trabajo["tickers"] = trabajo["tickers"].split(",")
+    trabajo["tickers"] = [t.strip().upper() for t in trabajo["tickers"] if t.strip()]
+    if trabajo["tipo"] == "precios" and str(trabajo["proveedor"]).lower() == "auto":
+        # El router devuelve los tickers en formato canónico ('AENA:BMAD' → 'AENA.MC')
+        from src.extractors.router_extractor import a_canonico
+        trabajo["tickers"] = list(dict.fromkeys(a_canonico(t) for t in trabajo["tickers"]))
+    for clave in ("fecha_inicio", "fecha_fin"):
+        if trabajo[clave] is not None:
+            # YAML convierte las fechas sin comillas en objetos date
+            trabajo[clave] = str(trabajo[clave])
+
+    if trabajo["tipo"] not in ("precios", "fundamentales", "macro"):
+        raise ValueError(f"[{trabajo['nombre']}] tipo desconocido: {trabajo['tipo']}")
+    if trabajo["tipo"] in ("precios", "fundamentales") and not trabajo["tickers"]:
+        raise ValueError(f"[{trabajo['nombre']}] falta la lista de tickers.")
+    if trabajo["tipo"] == "precios" and not (trabajo["fecha_inicio"] and trabajo["fecha_fin"]):
+        raise ValueError(f"[{trabajo['nombre']}] faltan fecha_inicio / fecha_fin.")
+    desconocidos = set(trabajo["analisis"]) - ANALISIS_VALIDOS
+    if desconocidos:
+        raise ValueError(f"[{trabajo['nombre']}] análisis desconocidos: {sorted(desconocidos)}")
+    return trabajo
+
+
+# ==========================================================
+# Etapas (sin input(): todo sale del trabajo)
+# ==========================================================
+def etapa_extraer(trabajo: dict) -> pd.DataFrame:
+    from src.extractors.interface.cli import crear_extractor_macro, crear_extractor_precios
+
+    if trabajo["tipo"] == "precios":
+        extractor = crear_extractor_precios(trabajo["proveedor"])
+        return extractor.obtener_datos(trabajo["tickers"], trabajo["fecha_inicio"], trabajo["fecha_fin"])
+
+    if trabajo["tipo"] == "fundamentales":
+        from src.extractors.fundamentales import AlmacenFundamentales
+        return AlmacenFundamentales(crear_extractor_precios("alphavantage")).obtener(trabajo["tickers"])
+
+    extractor = crear_extractor_macro(trabajo["proveedor"])
+    indicadores = [i.upper() for i in trabajo["indicadores"]]
+    paises = [p.upper() for p in trabajo["paises"]]
+    if hasattr(extractor, "obtener_datos_macro_lote"):
+        return extractor.obtener_datos_macro_lote(indicadores, paises, trabajo["anio_inicio"], trabajo["anio_fin"])
+
+    partes = []
+    for ind in indicadores:
+        for pais in paises:
+            df_i = extractor.obtener_datos_macro(ind, start_year=trabajo["anio_inicio"], end_year=trabajo["anio_fin"], pais=pais)
+            if not df_i.empty:
+                partes.append(df_i.assign(PAIS=pais) if "PAIS" not in df_i.columns else df_i)
+    return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+
+def etapa_limpiar(df: pd.DataFrame, limpieza: dict) -> tuple:
+    """Aplica los pasos de limpieza configurados. Devuelve (df, incidencias de validación)."""
+    from src.utils.data_tools import quitar_outliers, rellenar_huecos_series, sincronizar_fechas, validar_df
+
+    incidencias = {}
+    if df.empty:
+        return df, incidencias
+    if limpieza.get("validar"):
+        incidencias = validar_df(df, columnas_unicas=["date", "ticker"], permitir_negativos=["returns"]).conteos()
+    if limpieza.get("outliers"):
+        opciones = dict(limpieza["outliers"]) if isinstance(limpieza["outliers"], dict) else {}
+        columnas = opciones.pop("columnas", ["close"])
+        df = quitar_outliers(df, columnas=columnas, **opciones)
+    if limpieza.get("huecos"):
+        opciones = dict(limpieza["huecos"]) if isinstance(limpieza["huecos"], dict) else {}
+        df = rellenar_huecos_series(df, **opciones)
+    if limpieza.get("sincronizar"):
+        df = sincronizar_fechas(df)
+    return df, incidencias
+
+
+def _tickers_validos(panel, tickers: list) -> list:
+    validos = [t for t in tickers if t in panel.columna]
+    if not validos:
+        return panel.tickers
+    if len(validos) < len(tickers):
+        print(f"⚠️ Sin datos en el panel para: {', '.join(t for t in tickers if t not in panel.columna)}")
+    return validos
+
+
+def etapa_panel(limpio: tuple):
+    from src.models.panel_precios import PanelPrecios
+    return PanelPrecios.desde_largo(limpio[0], modo="union", max_huecos=0)
+
+
+def etapa_series(panel, tickers: list) -> dict:
+    """Reporte Markdown y resumen numérico por ticker: ticker → (reporte, resumen o None)."""
+    resultados = {}
+    for t in _tickers_validos(panel, tickers):
+        serie = panel.serie(t)
+        resultados[t] = (serie.report(), None if serie.datos.empty else serie.resumen())
+    return resultados
+
+
+def etapa_cartera(panel, tickers: list, nombre: str) -> dict:
+    """Reporte ejecutivo y métricas globales de la cartera."""
+    cartera = panel.cartera(_tickers_validos(panel, tickers), nombre=nombre)
+    return {"reporte": cartera.report(), "metricas": cartera.calcular_metricas_globales()}
+
+
+def etapa_sim_cartera(panel, tickers: list, nombre: str, simulacion: dict) -> pd.DataFrame:
+    """Monte Carlo de la cartera agregada."""
+    cartera = panel.cartera(_tickers_validos(panel, tickers), nombre=nombre)
+    # La simulación de cartera usa el generador global de numpy: semilla + simulación bajo el mismo lock
+    with _LOCK_ALEATORIO:
+        if simulacion.get("semilla") is not None:
+            np.random.seed(simulacion["semilla"])
+        return cartera.simulate_montecarlo(num_days=simulacion["dias"], num_simulations=simulacion["simulaciones"])
+
+
+def etapa_montecarlo(panel, tickers: list, simulacion: dict) -> dict:
+    """Simulación individual por ticker: ticker → simulación."""
+    sims = {}
+    semilla = simulacion.get("semilla")
+    with _LOCK_ALEATORIO:
+        for i, t in enumerate(_tickers_validos(panel, tickers)):
+            serie = panel.serie(t)
+            if serie.datos.empty:
+                continue
+            sims[t] = serie.simulate_montecarlo(
+                num_days=simulacion["dias"],
+                num_simulations=simulacion["simulaciones"],
+                random_seed=None if semilla is None else semilla + i,
+            )
+    return sims
+
+
+def etapa_estres(panel, tickers: list, nombre: str, ventana: int = 20, peores: int = 10) -> pd.DataFrame:
+    motor = panel.cartera(_tickers_validos(panel, tickers), nombre=nombre).motor_estres()
+    motor.agregar_historicos(ventana=ventana, peores=peores)
+    motor.agregar_shock_covarianza("vol_x2", mult_vol=2.0)
+    motor.agregar_shock_covarianza("correlacion_1", correlacion=0.99)
+    return motor.ejecutar()
+
+
+def _renderizar(peticiones: list) -> dict:
+    """
+    Dibuja (fichero, método del servicio, sim_df, titulo) en un directorio temporal y devuelve
+    fichero → bytes PNG, para que los gráficos se puedan cachear como cualquier otro artefacto.
+
+    Se dibuja en el hilo de la etapa con figuras independientes (sin pyplot), así que las
+    dos ramas de gráficos del DAG pueden ejecutarse a la vez.
+    """
+    import tempfile
+    from src.utils.render_graficos import ServicioGraficos
+
+    imagenes = {}
+    with tempfile.TemporaryDirectory() as tmp, ServicioGraficos(max_workers=0) as servicio:
+        for fichero, metodo, sim_df, titulo in peticiones:
+            ruta = getattr(servicio, metodo)(sim_df, os.path.join(tmp, fichero), titulo=titulo).esperar()
+            with open(ruta, "rb") as f:
+                imagenes[fichero] = f.read()
+    return imagenes
+
+
+def etapa_grafico_cartera(sim: pd.DataFrame, nombre: str) -> dict:
+    return _renderizar([("simulacion_cartera.png", "abanico_simulacion", sim, f"Simulación Monte Carlo - {nombre}")])
+
+
+def etapa_graficos_montecarlo(sims: dict) -> dict:
+    peticiones = []
+    for t, sim in sims.items():
+        peticiones.append((f"Simulacion_MonteCarlo_{t}.png", "abanico_simulacion", sim, f"Simulación de Montecarlo - {t}"))
+        peticiones.append((f"Simulacion_MonteCarlo_{t}_hist.png", "histograma_final", sim, None))
+    return _renderizar(peticiones)
+
+
+# ==========================================================
+# Ejecución de un trabajo (DAG con caché por contenido)
+# ==========================================================
+def _extraccion_cacheable(trabajo: dict) -> bool:
+    # Un rango ya cerrado no cambia: se reutiliza. Si llega hasta hoy, se vuelve a pedir
+    # (los extractores tienen su propia caché) y su huella decide si hay que recalcular algo.
+    if trabajo["tipo"] == "precios":
+        return pd.Timestamp(trabajo["fecha_fin"]).normalize() < pd.Timestamp.today().normalize()
+    if trabajo["tipo"] == "macro":
+        return int(trabajo["anio_fin"]) < pd.Timestamp.today().year
+    return False
+
+
+def construir_pipeline(trabajo: dict):
+    """
+    Grafo del trabajo:
+
+        extraer → limpiar → panel ─┬─ series
+                                   ├─ cartera
+                                   ├─ estres
+                                   ├─ sim_cartera ─ grafico_cartera
+                                   └─ montecarlo ── graficos_montecarlo
+
+    Las ramas que cuelgan del panel son independientes y se ejecutan en paralelo.
+    Las simulaciones solo se cachean con semilla fija (sin semilla cada ejecución es distinta).
+    """
+    from src.pipeline.dag import Pipeline
+
+    pipeline = Pipeline(
+        directorio_cache=os.path.join("data", "cache", "pipeline"),
+        max_workers=min(4, os.cpu_count() or 1),
+        usar_cache=trabajo["cache"],
+    )
+    claves_extraccion = ("tipo", "proveedor", "tickers", "fecha_inicio", "fecha_fin",
+                         "indicadores", "paises", "anio_inicio", "anio_fin")
+    pipeline.agregar("extraer", etapa_extraer,
+                     parametros={"trabajo": {k: trabajo[k] for k in claves_extraccion}},
+                     cachear=_extraccion_cacheable(trabajo), version=VERSION_PIPELINE)
+    if trabajo["tipo"] != "precios":
+        return pipeline
+
+    tickers, nombre, simulacion = trabajo["tickers"], trabajo["nombre"], trabajo["simulacion"]
+    params_sim = {k: simulacion[k] for k in ("dias", "simulaciones", "semilla")}
+    cachear_sim = simulacion.get("semilla") is not None
+    analisis = set(trabajo["analisis"])
+
+    pipeline.agregar("limpiar", etapa_limpiar, ["extraer"], {"limpieza": trabajo["limpieza"]}, version=VERSION_PIPELINE)
+    pipeline.agregar("panel", etapa_panel, ["limpiar"], version=VERSION_PIPELINE)
+    if "series" in analisis:
+        pipeline.agregar("series", etapa_series, ["panel"], {"tickers": tickers}, version=VERSION_PIPELINE)
+    if analisis & {"cartera", "estres"}:
+        pipeline.agregar("cartera", etapa_cartera, ["panel"], {"tickers": tickers, "nombre": nombre},
+                         version=VERSION_PIPELINE)
+        pipeline.agregar("sim_cartera", etapa_sim_cartera, ["panel"],
+                         {"tickers": tickers, "nombre": nombre, "simulacion": params_sim},
+                         cachear=cachear_sim, version=VERSION_PIPELINE)
+        if simulacion.get("graficos"):
+            pipeline.agregar("grafico_cartera", etapa_grafico_cartera, ["sim_cartera"], {"nombre": nombre},
+                             version=VERSION_PIPELINE)
+    if "estres" in analisis:
+        pipeline.agregar("estres", etapa_estres, ["panel"], {"tickers": tickers, "nombre": nombre},
+                         version=VERSION_PIPELINE)
+    if "montecarlo" in analisis:
+        pipeline.agregar("montecarlo", etapa_montecarlo, ["panel"], {"tickers": tickers, "simulacion": params_sim},
+                         cachear=cachear_sim, version=VERSION_PIPELINE)
+        if simulacion.get("graficos"):
+            pipeline.agregar("graficos_montecarlo", etapa_graficos_montecarlo, ["montecarlo"],
+                             version=VERSION_PIPELINE)
+    return pipeline
+
+
+# Etapas cuyos resultados lee _exportar_trabajo (y el resumen del trabajo)
+ETAPAS_EXPORTADAS = ("extraer", "limpiar", "series", "cartera", "sim_cartera", "estres", "montecarlo",
+                     "grafico_cartera", "graficos_montecarlo")
+
+
+def _exportar_trabajo(trabajo: dict, r: dict) -> None:
+    """Escribe reportes, PNG y Excel/Parquet a partir de los artefactos del pipeline."""
+    from src.utils.export_tools import exportar_resultados
+
+    directorio = trabajo["salida"]["directorio"]
+    hojas, imagenes = {}, []
+
+    if trabajo["tipo"] != "precios":
+        hojas["Fundamentales" if trabajo["tipo"] == "fundamentales" else "Macro"] = r["extraer"]
+    else:
+        hojas["Datos Crudos"] = r["limpiar"][0]
+        if "series" in r:
+            for t, (reporte, _) in r["series"].items():
+                with open(os.path.join(directorio, f"reporte_{t}.md"), "w", encoding="utf-8") as f:
+                    f.write(reporte)
+            hojas["Series Individuales"] = pd.DataFrame([res for _, res in r["series"].values() if res is not None])
+        if "cartera" in r:
+            with open(os.path.join(directorio, "reporte_cartera.md"), "w", encoding="utf-8") as f:
+                f.write(r["cartera"]["reporte"])
+            hojas["Cartera"] = r["cartera"]["reporte"]
+            hojas["Simulación Monte Carlo"] = r["sim_cartera"].describe().T[["mean", "std", "min", "50%", "max"]]
+        if "estres" in r:
+            hojas["Estres"] = r["estres"].reset_index()
+        if "montecarlo" in r:
+            hojas.update({f"Sim_{t}": s for t, s in r["montecarlo"].items()})
+        for clave in ("grafico_cartera", "graficos_montecarlo"):
+            for fichero, contenido in r.get(clave, {}).items():
+                ruta = os.path.join(directorio, fichero)
+                with open(ruta, "wb") as f:
+                    f.write(contenido)
+                if not fichero.endswith("_hist.png"):
+                    imagenes.append(ruta)
+
+    exportar_resultados(os.path.join(directorio, f"{trabajo['nombre']}.xlsx"), hojas,
+                        imagenes=imagenes, formato=trabajo["salida"]["formato"])
+
+
+def ejecutar_trabajo(trabajo: dict) -> dict:
+    """Ejecuta un trabajo completo sin interacción. Nunca lanza: los errores van al resumen."""
+    t0 = time.perf_counter()
+    nombre = trabajo["nombre"]
+    directorio = trabajo["salida"]["directorio"]
+    resultado = {"nombre": nombre, "estado": "ok", "filas": 0, "salidas": [], "error": None}
+
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        pipeline = construir_pipeline(trabajo)
+        # Solo lo que se exporta: el resto (p. ej. el panel) no se lee del disco si todo viene de caché
+        r = pipeline.ejecutar([n for n in ETAPAS_EXPORTADAS if n in pipeline.etapas])
+        resultado["etapas"] = pipeline.informe
+        resultado["filas"] = len(r["extraer"])
+        if r["extraer"].empty:
+            raise ValueError("la extracción no devolvió datos")
+
+        if "limpiar" in r:
+            resultado["incidencias"] = r["limpiar"][1]
+        if "cartera" in r:
+            resultado["metricas_cartera"] = {k: v for k, v in r["cartera"]["metricas"].items() if k != "pesos"}
+
+        _exportar_trabajo(trabajo, r)
+        resultado["salidas"] = sorted(os.listdir(directorio))
+    except Exception as e:
+        resultado["estado"] = "error"
+        resultado["error"] = f"{type(e).__name__}: {e}"
+
+    resultado["segundos"] = round(time.perf_counter() - t0, 2)
+    return resultado
+
+
+# ==========================================================
+# Ejecución de lotes
+# ==========================================================
+# Proveedores con pocas llamadas por minuto ('auto' puede acabar en cualquiera de ellos).
+# Cada proceso tiene su propio LimitadorTokens: en paralelo la cuota se multiplicaría por N.
+PROVEEDORES_LIMITADOS = {"alphavantage", "twelvedata", "auto"}
+
+
+def _usa_proveedor_limitado(trabajo: dict) -> bool:
+    # Los fundamentales siempre salen de AlphaVantage
+    proveedor = "alphavantage" if trabajo["tipo"] == "fundamentales" else str(trabajo["proveedor"]).lower()
+    return proveedor in PROVEEDORES_LIMITADOS
+
+
+def _ejecutar_en_serie(trabajos: list) -> list:
+    return [ejecutar_trabajo(t) for t in trabajos]
+
+
+def ejecutar_lote(trabajos: list, max_workers: int = 4) -> list:
+    """
+    Ejecuta muchos trabajos con un pool de procesos acotado (max_workers trabajos a la vez).
+    max_workers=1 los ejecuta en serie en el propio proceso.
+
+    Los trabajos de proveedores con límite de llamadas (PROVEEDORES_LIMITADOS) van todos,
+    uno detrás de otro, a un mismo worker: así comparten limitador y respetan la cuota.
+    """
+    print(f"🗂️ Lote de {len(trabajos)} trabajo(s) con {max_workers} worker(s)...")
+    resultados = []
+
+    if max_workers <= 1 or len(trabajos) == 1:
+        for trabajo in trabajos:
+            resultados.append(ejecutar_trabajo(trabajo))
+            _imprimir_estado(resultados[-1], len(resultados), len(trabajos))
+        return resultados
+
+    limitados = [t for t in trabajos if _usa_proveedor_limitado(t)]
+    if len(limitados) > 1:
+        print(f"🐢 {len(limitados)} trabajo(s) con proveedores limitados ({', '.join(sorted(PROVEEDORES_LIMITADOS))}) "
+              f"se ejecutan en serie en un único worker.")
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futuros = {pool.submit(ejecutar_trabajo, t): [t] for t in trabajos if not _usa_proveedor_limitado(t)}
+        if limitados:
+            futuros[pool.submit(_ejecutar_en_serie, limitados)] = limitados
+        for futuro in as_completed(futuros):
+            try:
+                resultado = futuro.result()
+                hechos = resultado if isinstance(resultado, list) else [resultado]
+            except Exception as e:
+                # Caída del proceso worker (no del trabajo en sí)
+                hechos = [{"nombre": t["nombre"], "estado": "error", "error": str(e)} for t in futuros[futuro]]
+            for resultado in hechos:
+                resultados.append(resultado)
+                _imprimir_estado(resultado, len(resultados), len(trabajos))
+
+    orden = {t["nombre"]: i for i, t in enumerate(trabajos)}
+    return sorted(resultados, key=lambda r: orden.get(r["nombre"], 0))
+
+
+def _imprimir_estado(resultado: dict, hechos: int, total: int):
+    if resultado["estado"] == "ok":
+        print(f"✅ [{hechos}/{total}] {resultado['nombre']}: {resultado['filas']} filas en {resultado.get('segundos', 0)} s")
+    else:
+        print(f"❌ [{hechos}/{total}] {resultado['nombre']}: {resultado['error']}")
+
+
+def main_batch(ruta_trabajos: str, max_workers: int = 4, ruta_resumen: str = None) -> int:
+    """Punto de entrada del modo batch. Devuelve el código de salida (0 si todo fue bien)."""
+    trabajos = cargar_trabajos(ruta_trabajos)
+    resultados = ejecutar_lote(trabajos, max_workers=max_workers)
+
+    ruta_resumen = ruta_resumen or os.path.join("outputs", "batch", "resumen_lote.json")
+    os.makedirs(os.path.dirname(ruta_resumen) or ".", exist_ok=True)
+    with open(ruta_resumen, "w", encoding="utf-8") as f:
+        json.dump(resultados, f, indent=1, ensure_ascii=False, default=str)
+
+    errores = sum(r["estado"] != "ok" for r in resultados)
+    print(f"\n📋 Lote terminado: {len(resultados) - errores} ok, {errores} con error. Resumen en {ruta_resumen}")
+    return 1 if errores else 0
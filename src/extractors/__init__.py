@@ -1,5 +1,26 @@
-from .extractor_base import ExtractorBase
-from .yahoo_finance_extractor import ExtractorYahooFinance
-from .alpha_vantage_extractor import ExtractorAlphaVantage
-from .twelvedata_extractor import ExtractorTwelveData
-from .world_bank_extractor import ExtractorWorldBank
\ No newline at end of file
+import importlib
+
+# Re-exportaciones perezosas: `from src.extractors import ExtractorWorldBank`
+# solo importa el módulo de World Bank (no yfinance, requests, etc.)
+_EXPORTADOS = {
+    "ExtractorBase": ".extractor_base",
+    "ExtractorYahooFinance": ".yahoo_finance_extractor",
+    "ExtractorAlphaVantage": ".alpha_vantage_extractor",
+    "ExtractorTwelveData": ".twelvedata_extractor",
+    "ExtractorWorldBank": ".world_bank_extractor",
+    "ExtractorSintetico": ".sintetico_extractor",
+}
+
+__all__ = list(_EXPORTADOS)
+
+
+def __getattr__(nombre):
+    if nombre not in _EXPORTADOS:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(importlib.import_module(_EXPORTADOS[nombre], __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
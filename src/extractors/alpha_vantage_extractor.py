@@ -1,7 +1,10 @@
 import os
 import pandas as pd
-import requests
 from src.extractors.extractor_base import ExtractorBase
+from src.extractors.transporte_http import http_get
+from src.extractors.parseo_json import parsear_alphavantage
+from src.extractors.descarga_concurrente import (LimitadorTokens, LimiteDiarioAgotado, obtener_json,
+                                                 ejecutar_concurrente, ejecutar)
 from src.utils.data_cleaning import limpiar_dataframe
 
 
@@ -13,9 +16,25 @@ class ExtractorAlphaVantage(ExtractorBase):
     - Indicadores macroeconómicos
     """
 
-    def __init__(self, api_key=None):
-        self.api_key = "0SIZNMC3TR9BZFF6"
-        self.base_url = "https://www.alphavantage.co/query"
+    def __init__(self, api_key=None, llamadas_por_minuto: float = 5, max_en_vuelo: int = 5, base_url: str = None):
+        self.api_key = api_key or "0SIZNMC3TR9BZFF6"
+        self.base_url = base_url or "https://www.alphavantage.co/query"
+        # Plan gratuito: 5 llamadas/min. Con plan premium basta con subir llamadas_por_minuto.
+        self.limitador = LimitadorTokens(llamadas_por_minuto)
+        self.max_en_vuelo = max_en_vuelo
+
+    @staticmethod
+    def _es_limitado(data: dict) -> bool:
+        """
+        Detecta los mensajes de throttling ('Note' / 'Information') de AlphaVantage.
+        El de cuota diaria agotada no se arregla esperando: lanza LimiteDiarioAgotado.
+        """
+        info = str(data.get("Information", "") or data.get("Note", "")).lower()
+        if "per day" in info and "per minute" not in info and "per second" not in info:
+            raise LimiteDiarioAgotado(f"AlphaVantage: cuota diaria agotada ({data.get('Information') or data.get('Note')})")
+        if "Note" in data:
+            return True
+        return bool(info) and "premium endpoint" not in info
 
     # ==========================
     # 🔹 Precios históricos
@@ -24,63 +43,20 @@ class ExtractorAlphaVantage(ExtractorBase):
         """
         Descarga precios históricos de múltiples tickers desde AlphaVantage.
         Se adapta automáticamente al tipo de cuenta (gratuita/premium).
+        Las descargas se lanzan en paralelo respetando el límite de llamadas por minuto.
         """
-        import time
-        datos_completos = []
-
-        for ticker in tickers:
-            print(f"📈 Descargando {ticker} desde AlphaVantage...")
-
-            # --- Intento 1: endpoint ajustado ---
-            params = {
-                "function": "TIME_SERIES_DAILY_ADJUSTED",
-                "symbol": ticker,
-                "outputsize": "full",
-                "apikey": self.api_key,
-            }
-
-            response = requests.get(self.base_url, params=params)
-            data_json = response.json()
-
-            # --- Manejo de mensajes de error o premium ---
-            if "Information" in data_json or "Note" in data_json:
-                print(f"⚠️ Endpoint premium detectado o límite alcanzado. "
-                    f"Cambiando a versión gratuita (TIME_SERIES_DAILY)...")
-                # Esperar un poco para evitar rate limit
-                time.sleep(15)
-                params["function"] = "TIME_SERIES_DAILY"
-                response = requests.get(self.base_url, params=params)
-                data_json = response.json()
-
-            if "Error Message" in data_json:
-                print(f"❌ Error en la solicitud para {ticker}: {data_json['Error Message']}")
-                continue
-
-            # --- Validar datos ---
-            data = data_json.get("Time Series (Daily)")
-            if not data:
-                print(f"⚠️ No se pudieron obtener datos para {ticker}. Claves devueltas: {list(data_json.keys())}")
-                continue
-
-            # --- Construcción del DataFrame ---
-            df = pd.DataFrame.from_dict(data, orient="index").reset_index()
-
-            # Detectar si es versión ajustada o simple
-            if len(df.columns) >= 8:
-                df.columns = [
-                    "date", "open", "high", "low", "close",
-                    "adjusted_close", "volume", "dividend_amount", "split_coefficient"
-                ]
-            else:
-                df.columns = ["date", "open", "high", "low", "close", "volume"]
-
-            df["ticker"] = ticker
-            df["date"] = pd.to_datetime(df["date"])
-            df = df[(df["date"] >= fecha_inicio) & (df["date"] <= fecha_fin)]
-            datos_completos.append(df)
-
-            # Esperar 15 segundos para no exceder el límite gratuito (5 llamadas/min)
-            time.sleep(15)
+        return ejecutar(self.obtener_datos_async(tickers, fecha_inicio, fecha_fin))
+
+    async def obtener_datos_async(self, tickers, fecha_inicio, fecha_fin):
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        resultados = await ejecutar_concurrente(
+            tickers,
+            lambda t: self._descargar_ticker(t, fecha_inicio, fecha_fin),
+            max_en_vuelo=self.max_en_vuelo,
+        )
+        datos_completos = [resultados[t] for t in tickers if resultados[t] is not None]
 
         if datos_completos:
             df_total = pd.concat(datos_completos, ignore_index=True)
@@ -88,6 +64,41 @@ class ExtractorAlphaVantage(ExtractorBase):
         else:
             return pd.DataFrame()
 
+    async def _descargar_ticker(self, ticker, fecha_inicio, fecha_fin):
+        print(f"📈 Descargando {ticker} desde AlphaVantage...")
+
+        # 'compact' devuelve las últimas 100 sesiones: basta para rangos recientes (p. ej. huecos de la caché)
+        reciente = pd.Timestamp(fecha_inicio) >= pd.Timestamp.today() - pd.Timedelta(days=140)
+
+        # --- Intento 1: endpoint ajustado ---
+        params = {
+            "function": "TIME_SERIES_DAILY_ADJUSTED",
+            "symbol": ticker,
+            "outputsize": "compact" if reciente else "full",
+            "apikey": self.api_key,
+        }
+        data_json = await obtener_json(self.base_url, params, self.limitador, es_limitado=self._es_limitado)
+
+        # --- Endpoint premium: cambiar a la versión gratuita ---
+        if "Information" in data_json or "Note" in data_json:
+            print(f"⚠️ Endpoint premium detectado o límite alcanzado. "
+                  f"Cambiando a versión gratuita (TIME_SERIES_DAILY) para {ticker}...")
+            params = {**params, "function": "TIME_SERIES_DAILY"}
+            data_json = await obtener_json(self.base_url, params, self.limitador, es_limitado=self._es_limitado)
+
+        if "Error Message" in data_json:
+            print(f"❌ Error en la solicitud para {ticker}: {data_json['Error Message']}")
+            return None
+
+        # --- Validar datos ---
+        data = data_json.get("Time Series (Daily)")
+        if not data:
+            print(f"⚠️ No se pudieron obtener datos para {ticker}. Claves devueltas: {list(data_json.keys())}")
+            return None
+
+        # --- Construcción del DataFrame (columnas tipadas, mapeadas por nombre de clave) ---
+        return parsear_alphavantage(data, ticker, fecha_inicio, fecha_fin)
+
 
     # ==========================
     # 🔹 Datos fundamentales
@@ -99,7 +110,7 @@ class ExtractorAlphaVantage(ExtractorBase):
             "symbol": ticker,
             "apikey": self.api_key,
         }
-        response = requests.get(self.base_url, params=params)
+        response = http_get(self.base_url, params=params)
         data = response.json()
 
         if not data or "Symbol" not in data:
@@ -109,6 +120,22 @@ class ExtractorAlphaVantage(ExtractorBase):
         df = pd.DataFrame([data])
         df["ticker"] = ticker
         return (df)
+
+    def obtener_overviews(self, tickers: list) -> dict:
+        """
+        Descarga en paralelo (respetando el límite de llamadas) el payload OVERVIEW
+        de varios tickers. Devuelve ticker → dict (o None si no hay datos).
+        """
+        return ejecutar(ejecutar_concurrente(tickers, self._descargar_overview, max_en_vuelo=self.max_en_vuelo))
+
+    async def _descargar_overview(self, ticker: str):
+        print(f"📊 Descargando datos fundamentales para {ticker}...")
+        params = {"function": "OVERVIEW", "symbol": ticker, "apikey": self.api_key}
+        data = await obtener_json(self.base_url, params, self.limitador, es_limitado=self._es_limitado)
+        if not data or "Symbol" not in data:
+            print(f"⚠️ No se encontraron datos fundamentales para {ticker}")
+            return None
+        return data
     
     # ==========================
     # 🔹 Reporte resumen fundamentales
@@ -196,10 +223,10 @@ class ExtractorAlphaVantage(ExtractorBase):
         if indicador not in indicadores_av:
             raise ValueError(f"Indicador '{indicador}' no soportado por AlphaVantage.")
 
-        url = f"https://www.alphavantage.co/query?function={indicadores_av[indicador]}&apikey={self.api_key}&datatype=json"
+        params = {"function": indicadores_av[indicador], "apikey": self.api_key, "datatype": "json"}
         print(f"🔗 Consultando AlphaVantage ({indicador})...")
 
-        response = requests.get(url)
+        response = http_get(self.base_url, params=params)
         if response.status_code != 200:
             print(f"⚠️ Error {response.status_code} al conectar con AlphaVantage")
             return pd.DataFrame()
@@ -0,0 +1,250 @@
+# src/extractors/cache_ohlcv.py
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+import pandas as pd
+from src.extractors.extractor_base import ExtractorBase
+from src.utils.data_cleaning import limpiar_dataframe
+
+COLUMNAS_ESTANDAR = ['date', 'open', 'high', 'low', 'close', 'volume', 'ticker']
+
+
+def nombre_fichero(ticker: str) -> str:
+    """Nombre de fichero Parquet seguro para un ticker ('AENA:BMAD' → 'AENA_BMAD.parquet')."""
+    return re.sub(r"[^A-Za-z0-9._=-]", "_", ticker) + ".parquet"
+
+
+def _temporal(ruta: str) -> str:
+    # Único por proceso e hilo: dos escrituras simultáneas nunca comparten fichero temporal
+    return f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+@contextmanager
+def bloqueo_fichero(ruta: str):
+    """Bloqueo exclusivo entre procesos (y entre hilos) sobre un fichero auxiliar."""
+    with open(ruta, "a+b") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CacheOHLCV:
+    """
+    Caché local en Parquet de precios OHLCV, particionada por proveedor y ticker:
+
+        <raiz>/<proveedor>/<TICKER>.parquet
+        <raiz>/<proveedor>/_cobertura.json   → rangos de fechas ya consultados por ticker
+
+    La cobertura se guarda aparte porque los fines de semana y festivos no tienen barras:
+    un día sin datos no es un hueco si ya se preguntó al proveedor por él.
+
+    Menús, batch, servicio y planificador pueden compartir la caché a la vez: las escrituras
+    van a un temporal que sustituye al fichero de golpe, y la fusión de barras y de cobertura
+    se hace bajo `<raiz>/<proveedor>/_cache.lock` releyendo lo que haya en disco.
+    """
+
+    def __init__(self, proveedor: str, raiz: str = "data/cache/ohlcv"):
+        self.directorio = os.path.join(raiz, proveedor)
+        os.makedirs(self.directorio, exist_ok=True)
+        self._ruta_cobertura = os.path.join(self.directorio, "_cobertura.json")
+        self._ruta_bloqueo = os.path.join(self.directorio, "_cache.lock")
+        self.cobertura = self._cargar_cobertura()
+
+    # ==========================================================
+    # Cobertura
+    # ==========================================================
+    def _cargar_cobertura(self) -> dict:
+        if not os.path.exists(self._ruta_cobertura):
+            return {}
+        with open(self._ruta_cobertura, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+        return {t: [(pd.Timestamp(a), pd.Timestamp(b)) for a, b in rangos] for t, rangos in datos.items()}
+
+    def _guardar_cobertura(self):
+        with bloqueo_fichero(self._ruta_bloqueo):
+            # Otro proceso puede haber ampliado la cobertura desde que se cargó: se fusiona, no se pisa
+            for t, rangos in self._cargar_cobertura().items():
+                for a, b in rangos:
+                    self.marcar_cubierto(t, a, b)
+            datos = {t: [(a.strftime("%Y-%m-%d"), b.strftime("%Y-%m-%d")) for a, b in rangos]
+                     for t, rangos in self.cobertura.items()}
+            tmp = _temporal(self._ruta_cobertura)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(datos, f, indent=1)
+            os.replace(tmp, self._ruta_cobertura)
+
+    def marcar_cubierto(self, ticker: str, inicio, fin):
+        """Añade [inicio, fin] a la cobertura del ticker fusionando rangos contiguos."""
+        inicio, fin = pd.Timestamp(inicio).normalize(), pd.Timestamp(fin).normalize()
+        if fin < inicio:
+            return
+        rangos = sorted(self.cobertura.get(ticker, []) + [(inicio, fin)])
+        fusionados = [rangos[0]]
+        for a, b in rangos[1:]:
+            ult_a, ult_b = fusionados[-1]
+            if a <= ult_b + pd.Timedelta(days=1):
+                fusionados[-1] = (ult_a, max(ult_b, b))
+            else:
+                fusionados.append((a, b))
+        self.cobertura[ticker] = fusionados
+
+    def huecos(self, ticker: str, inicio, fin) -> list:
+        """Rangos [a, b] de (inicio, fin) que todavía no se han consultado para el ticker."""
+        inicio, fin = pd.Timestamp(inicio).normalize(), pd.Timestamp(fin).normalize()
+        pendientes = []
+        cursor = inicio
+        for a, b in self.cobertura.get(ticker, []):
+            if b < cursor:
+                continue
+            if a > fin:
+                break
+            if a > cursor:
+                pendientes.append((cursor, a - pd.Timedelta(days=1)))
+            cursor = max(cursor, b + pd.Timedelta(days=1))
+        if cursor <= fin:
+            pendientes.append((cursor, fin))
+        return pendientes
+
+    # ==========================================================
+    # Lectura / escritura de datos
+    # ==========================================================
+    def _ruta(self, ticker: str) -> str:
+        return os.path.join(self.directorio, nombre_fichero(ticker))
+
+    def leer(self, ticker: str, inicio=None, fin=None) -> pd.DataFrame:
+        ruta = self._ruta(ticker)
+        if not os.path.exists(ruta):
+            return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+        filtros = []
+        if inicio is not None:
+            filtros.append(("date", ">=", pd.Timestamp(inicio)))
+        if fin is not None:
+            filtros.append(("date", "<=", pd.Timestamp(fin)))
+        return pd.read_parquet(ruta, filters=filtros or None)
+
+    def escribir(self, ticker: str, nuevos: pd.DataFrame):
+        """Fusiona las nuevas barras con las existentes (las nuevas prevalecen)."""
+        ruta = self._ruta(ticker)
+        with bloqueo_fichero(self._ruta_bloqueo):
+            existentes = self.leer(ticker)
+            df = pd.concat([existentes, nuevos], ignore_index=True) if not existentes.empty else nuevos
+            df = (df.drop_duplicates(subset="date", keep="last")
+                    .sort_values("date")
+                    .reset_index(drop=True))
+            df["ticker"] = df["ticker"].astype(str)
+            tmp = _temporal(ruta)
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, ruta)
+
+    def guardar(self):
+        self._guardar_cobertura()
+
+
+class ExtractorCacheado(ExtractorBase):
+    """
+    Envuelve cualquier extractor de precios con la caché Parquet.
+
+    Para una petición (tickers, fecha_inicio, fecha_fin) calcula los huecos de cada ticker,
+    agrupa los tickers que comparten el mismo hueco en una sola llamada al proveedor,
+    fusiona lo descargado en disco y sirve el resto desde la caché.
+    """
+
+    # Rangos cortos sin datos (fines de semana, festivos) se consideran consultados
+    DIAS_HUECO_SIN_DATOS = 5
+
+    def __init__(self, extractor: ExtractorBase, raiz: str = "data/cache/ohlcv", proveedor: str = None):
+        self.extractor = extractor
+        proveedor = proveedor or type(extractor).__name__.replace("Extractor", "").lower()
+        self.cache = CacheOHLCV(proveedor, raiz=raiz)
+
+    def __getattr__(self, nombre):
+        if nombre == "extractor":
+            raise AttributeError(nombre)
+        # Resto de métodos (fundamentales, macro...) se delegan en el extractor original
+        return getattr(self.extractor, nombre)
+
+    def obtener_datos(self, tickers: list, fecha_inicio: str, fecha_fin: str) -> pd.DataFrame:
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        self.completar(tickers, fecha_inicio, fecha_fin)
+
+        # 3️⃣ Servir desde disco
+        dfs = [self.cache.leer(t, fecha_inicio, fecha_fin) for t in tickers]
+        dfs = [d for d in dfs if not d.empty]
+        if not dfs:
+            return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+        return limpiar_dataframe(pd.concat(dfs, ignore_index=True))
+
+    def rangos_pendientes(self, tickers: list, fecha_inicio, fecha_fin) -> dict:
+        """Huecos de (fecha_inicio, fecha_fin) → tickers que los comparten (una llamada por rango)."""
+        grupos = defaultdict(list)
+        for t in tickers:
+            for hueco in self.cache.huecos(t, fecha_inicio, fecha_fin):
+                grupos[hueco].append(t)
+        return grupos
+
+    def completar(self, tickers: list, fecha_inicio: str, fecha_fin: str) -> int:
+        """
+        Descarga y guarda en disco solo los huecos de (fecha_inicio, fecha_fin), sin leer
+        lo ya cacheado. Devuelve el nº de rangos pedidos al proveedor.
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        # La barra de hoy puede estar incompleta: nunca se marca como consultada
+        limite_cobertura = pd.Timestamp.today().normalize() - pd.Timedelta(days=1)
+
+        # 1️⃣ Huecos por ticker, agrupados por rango para minimizar llamadas
+        grupos = self.rangos_pendientes(tickers, fecha_inicio, fecha_fin)
+
+        if grupos:
+            print(f"💾 Caché: {len(tickers)} tickers, {len(grupos)} rango(s) pendientes de descargar.")
+        else:
+            print(f"💾 Caché: {len(tickers)} tickers servidos íntegramente desde disco.")
+
+        # 2️⃣ Descargar solo los huecos (por lotes si el extractor lo permite, escribiendo cada uno al llegar)
+        for (inicio, fin), tickers_hueco in grupos.items():
+            fin_peticion = fin + pd.Timedelta(days=1) if getattr(self.extractor, "fin_exclusivo", False) else fin
+            args = (tickers_hueco, inicio.strftime("%Y-%m-%d"), fin_peticion.strftime("%Y-%m-%d"))
+            if hasattr(self.extractor, "iterar_lotes"):
+                lotes = self.extractor.iterar_lotes(*args)
+            else:
+                lotes = [self.extractor.obtener_datos(*args)]
+
+            con_datos = set()
+            for df_nuevo in lotes:
+                if df_nuevo is None or df_nuevo.empty:
+                    continue
+                df_nuevo = df_nuevo[(df_nuevo["date"] >= inicio) & (df_nuevo["date"] <= fin)]
+                for t, df_t in df_nuevo.groupby("ticker", observed=True):
+                    self.cache.escribir(t, df_t)
+                    con_datos.add(str(t))
+
+            hueco_corto = (fin - inicio).days < self.DIAS_HUECO_SIN_DATOS
+            for t in tickers_hueco:
+                if t in con_datos or (hueco_corto and con_datos):
+                    self.cache.marcar_cubierto(t, inicio, min(fin, limite_cobertura))
+
+        self.cache.guardar()
+        return len(grupos)
@@ -0,0 +1,155 @@
+# src/extractors/coalescencia.py
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+from src.extractors.cache_ohlcv import COLUMNAS_ESTANDAR
+from src.utils.data_cleaning import limpiar_dataframe
+
+
+class GrupoVuelo:
+    """
+    "Single-flight": si varias peticiones idénticas llegan mientras la primera
+    sigue en curso, solo la primera llama a la red y el resto espera su resultado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._en_vuelo = {}
+
+    def reclamar(self, claves: list) -> tuple:
+        """
+        Separa las claves en propias (este hilo debe resolverlas) y ajenas
+        (ya hay otra petición en curso). Devuelve (propias, ajenas): dicts clave → Future.
+        """
+        propias, ajenas = {}, {}
+        with self._lock:
+            for clave in claves:
+                if clave in self._en_vuelo:
+                    ajenas[clave] = self._en_vuelo[clave]
+                else:
+                    futuro = Future()
+                    self._en_vuelo[clave] = futuro
+                    propias[clave] = futuro
+        return propias, ajenas
+
+    def liberar(self, claves):
+        with self._lock:
+            for clave in claves:
+                self._en_vuelo.pop(clave, None)
+
+    def ejecutar(self, clave, funcion, *args, **kwargs):
+        """Ejecuta funcion(*args, **kwargs) una sola vez por clave en vuelo."""
+        propias, ajenas = self.reclamar([clave])
+        if ajenas:
+            return ajenas[clave].result()
+
+        futuro = propias[clave]
+        try:
+            futuro.set_result(funcion(*args, **kwargs))
+        except Exception as e:
+            futuro.set_exception(e)
+        finally:
+            self.liberar([clave])
+        return futuro.result()
+
+
+class ExtractorCoalescente:
+    """
+    Envuelve un extractor y colapsa las peticiones idénticas concurrentes.
+
+    - Precios: la clave es (ticker, fecha_inicio, fecha_fin). Un hilo solo descarga
+      los tickers que nadie está descargando ya y espera al resto. Si el extractor
+      renombra tickers (el router: 'AENA:BMAD' → 'AENA.MC'), la clave usa el nombre
+      que devuelve su `normalizar_ticker`.
+    - Macro: los alias se normalizan con el `indicador_map` del extractor
+      (en World Bank, CPI e INFLATION son el mismo código FP.CPI.TOTL.ZG).
+    - Fundamentales: la clave es el ticker.
+    """
+
+    def __init__(self, extractor):
+        self.extractor = extractor
+        self._vuelos = GrupoVuelo()
+
+    def __getattr__(self, nombre):
+        if nombre == "extractor":
+            raise AttributeError(nombre)
+        return getattr(self.extractor, nombre)
+
+    # ==========================
+    # 🔹 Precios históricos
+    # ==========================
+    def normalizar_ticker(self, ticker: str) -> str:
+        normalizar = getattr(self.extractor, "normalizar_ticker", None)
+        return normalizar(ticker) if normalizar else ticker
+
+    def obtener_datos(self, tickers: list, fecha_inicio: str, fecha_fin: str) -> pd.DataFrame:
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        # La clave es el ticker tal como vuelve en el resultado, no como se pidió
+        tickers = [self.normalizar_ticker(t) for t in tickers]
+        claves = [("precios", t, fecha_inicio, fecha_fin) for t in dict.fromkeys(tickers)]
+        propias, ajenas = self._vuelos.reclamar(claves)
+
+        if propias:
+            try:
+                df = self.extractor.obtener_datos([c[1] for c in propias], fecha_inicio, fecha_fin)
+                por_ticker = dict(tuple(df.groupby("ticker", observed=True))) if df is not None and not df.empty else {}
+                vacio = pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+                for clave, futuro in propias.items():
+                    futuro.set_result(por_ticker.get(clave[1], vacio))
+            except Exception as e:
+                for futuro in propias.values():
+                    if not futuro.done():
+                        futuro.set_exception(e)
+            finally:
+                self._vuelos.liberar(propias)
+
+        if ajenas:
+            print(f"🔗 {len(ajenas)} ticker(s) ya en descarga por otra petición: esperando su resultado.")
+
+        partes = [f.result() for f in list(propias.values()) + list(ajenas.values())]
+        partes = [p for p in partes if not p.empty]
+        if not partes:
+            return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+        if len(partes) == 1:
+            return partes[0].reset_index(drop=True)
+        # Al concatenar, las categorías de ticker de cada parte no coinciden: se recanoniza
+        return limpiar_dataframe(pd.concat(partes, ignore_index=True))
+
+    # ==========================
+    # 🔹 Datos macroeconómicos
+    # ==========================
+    def _codigo_indicador(self, indicador: str) -> str:
+        mapa = getattr(self.extractor, "indicador_map", {})
+        return mapa.get(indicador.upper(), indicador.upper())
+
+    def obtener_datos_macro(self, indicador: str, *args, **kwargs) -> pd.DataFrame:
+        clave = ("macro", self._codigo_indicador(indicador), args, tuple(sorted(kwargs.items())))
+        df = self._vuelos.ejecutar(clave, self.extractor.obtener_datos_macro, indicador, *args, **kwargs)
+        # La petición compartida puede venir etiquetada con el alias de otro hilo
+        if not df.empty and "INDICADOR" in df.columns:
+            df = df.assign(INDICADOR=indicador.upper())
+        return df
+
+    # ==========================
+    # 🔹 Datos fundamentales
+    # ==========================
+    def obtener_datos_fundamentales(self, ticker: str) -> pd.DataFrame:
+        return self._vuelos.ejecutar(("fundamentales", ticker), self.extractor.obtener_datos_fundamentales, ticker)
+
+    def obtener_overviews(self, tickers: list) -> dict:
+        claves = [("overview", t) for t in dict.fromkeys(tickers)]
+        propias, ajenas = self._vuelos.reclamar(claves)
+        if propias:
+            try:
+                datos = self.extractor.obtener_overviews([c[1] for c in propias])
+                for clave, futuro in propias.items():
+                    futuro.set_result(datos.get(clave[1]))
+            except Exception as e:
+                for futuro in propias.values():
+                    if not futuro.done():
+                        futuro.set_exception(e)
+            finally:
+                self._vuelos.liberar(propias)
+        return {c[1]: f.result() for c, f in list(propias.items()) + list(ajenas.items())}
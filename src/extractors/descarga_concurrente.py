@@ -0,0 +1,161 @@
+# src/extractors/descarga_concurrente.py
+import asyncio
+import random
+import threading
+import time
+
+import requests
+
+from src.extractors.transporte_http import http_get, TIMEOUT_POR_DEFECTO
+
+
+class LimiteDiarioAgotado(RuntimeError):
+    """El proveedor rechaza más llamadas hasta el día siguiente: reintentar no sirve de nada."""
+
+
+class LimitadorTokens:
+    """
+    Token bucket para respetar el límite de llamadas de cada proveedor.
+
+    - llamadas_por_minuto: ritmo de recarga (ej. 5 AlphaVantage gratis, 8 TwelveData gratis).
+    - rafaga: nº máximo de tokens acumulables (por defecto, una llamada).
+
+    Cada petición reserva un token; si no hay disponible se calcula cuánto hay que esperar,
+    de forma que las peticiones concurrentes quedan espaciadas exactamente al ritmo permitido.
+    Sirve tanto para código asíncrono (`adquirir`) como síncrono (`adquirir_sync`).
+    """
+
+    def __init__(self, llamadas_por_minuto: float, rafaga: int = 1):
+        if llamadas_por_minuto <= 0:
+            raise ValueError("llamadas_por_minuto debe ser mayor que 0.")
+        self.ritmo = llamadas_por_minuto / 60.0
+        self.capacidad = float(rafaga)
+        self._tokens = float(rafaga)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reservar(self) -> float:
+        """Reserva un token y devuelve los segundos a esperar antes de usarlo."""
+        with self._lock:
+            ahora = time.monotonic()
+            self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.ritmo)
+            self._ultimo = ahora
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.ritmo
+
+    def intentar(self, n: int = 1) -> bool:
+        """
+        Reserva n tokens solo si están disponibles ahora mismo (nunca espera). Si n supera la
+        ráfaga basta con tenerla llena: el saldo queda en negativo y las siguientes reservas
+        esperan a que se recupere.
+        """
+        if n <= 0:
+            return True
+        with self._lock:
+            ahora = time.monotonic()
+            self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.ritmo)
+            self._ultimo = ahora
+            if self._tokens < min(n, self.capacidad):
+                return False
+            self._tokens -= n
+            return True
+
+    async def adquirir(self):
+        espera = self._reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+    def adquirir_sync(self):
+        espera = self._reservar()
+        if espera > 0:
+            time.sleep(espera)
+
+
+def _get_json(url: str, params: dict, timeout):
+    """Payload JSON de la respuesta, o None si el proveedor contestó 429 (demasiadas peticiones)."""
+    response = http_get(url, params=params, timeout=timeout)
+    if response.status_code == 429:
+        return None
+    return response.json()
+
+
+async def obtener_json(
+    url: str,
+    params: dict,
+    limitador: LimitadorTokens,
+    es_limitado=None,
+    max_reintentos: int = 4,
+    espera_base: float = 2.0,
+    timeout=TIMEOUT_POR_DEFECTO,
+) -> dict:
+    """
+    Lanza una petición GET respetando el limitador y la reintenta con backoff exponencial
+    con jitter mientras el proveedor devuelva un 429 o un mensaje de límite de llamadas.
+    Cada reintento vuelve a pasar por el limitador.
+
+    es_limitado : callable(dict) -> bool, detecta el payload de throttling del proveedor.
+                  Puede lanzar LimiteDiarioAgotado para cortar los reintentos.
+    """
+    data = {}
+    for intento in range(max_reintentos + 1):
+        await limitador.adquirir()
+        try:
+            data = await asyncio.to_thread(_get_json, url, params, timeout)
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠️ Error de red ({params.get('symbol', url)}): {e}")
+            data, motivo = {}, "Error de red"
+        else:
+            if data is not None and not (es_limitado and es_limitado(data)):
+                return data
+            data, motivo = data or {}, "Límite de llamadas alcanzado"
+
+        if intento < max_reintentos:
+            espera = espera_base * (2 ** intento) * random.uniform(0.5, 1.5)
+            print(f"⏳ {motivo} ({params.get('symbol', '')}). Reintentando en {espera:.1f}s...")
+            await asyncio.sleep(espera)
+    return data
+
+
+async def ejecutar_concurrente(claves: list, corutina, max_en_vuelo: int = 8) -> dict:
+    """
+    Ejecuta `corutina(clave)` para cada clave con como máximo `max_en_vuelo` tareas a la vez.
+    Devuelve un dict clave → resultado (None si la tarea lanzó una excepción).
+
+    Si una tarea lanza LimiteDiarioAgotado se cancelan las demás: el resto de claves
+    quedan en None sin gastar más peticiones.
+    """
+    semaforo = asyncio.Semaphore(max_en_vuelo)
+    agotado = False
+
+    async def _tarea(clave):
+        nonlocal agotado
+        async with semaforo:
+            if agotado:
+                return None
+            try:
+                return await corutina(clave)
+            except LimiteDiarioAgotado as e:
+                if not agotado:
+                    agotado = True
+                    print(f"⛔ {e}. Se cancelan las descargas pendientes.")
+                    for tarea in tareas:
+                        if tarea is not asyncio.current_task():
+                            tarea.cancel()
+                return None
+            except Exception as e:
+                print(f"⚠️ Error descargando {clave}: {e}")
+                return None
+
+    tareas = [asyncio.ensure_future(_tarea(c)) for c in claves]
+    resultados = await asyncio.gather(*tareas, return_exceptions=True)
+    return {c: None if isinstance(r, BaseException) else r for c, r in zip(claves, resultados)}
+
+
+def ejecutar(corutina):
+    """Ejecuta una corutina desde código síncrono (CLI)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(corutina)
+    corutina.close()
+    raise RuntimeError("Ya hay un bucle de eventos activo: usa la variante *_async del extractor.")
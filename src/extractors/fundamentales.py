@@ -0,0 +1,143 @@
+# src/extractors/fundamentales.py
+import re
+
+import numpy as np
+import pandas as pd
+from src.utils.cache_ttl import CacheTTL
+
+# Campos numéricos del endpoint OVERVIEW de AlphaVantage
+CAMPOS_NUMERICOS = [
+    "MarketCapitalization", "EBITDA", "PERatio", "PEGRatio", "BookValue",
+    "DividendPerShare", "DividendYield", "EPS", "RevenuePerShareTTM", "ProfitMargin",
+    "OperatingMarginTTM", "ReturnOnAssetsTTM", "ReturnOnEquityTTM", "RevenueTTM",
+    "GrossProfitTTM", "DilutedEPSTTM", "QuarterlyEarningsGrowthYOY",
+    "QuarterlyRevenueGrowthYOY", "AnalystTargetPrice", "TrailingPE", "ForwardPE",
+    "PriceToSalesRatioTTM", "PriceToBookRatio", "EVToRevenue", "EVToEBITDA", "Beta",
+    "52WeekHigh", "52WeekLow", "50DayMovingAverage", "200DayMovingAverage",
+    "SharesOutstanding",
+]
+
+CAMPOS_INDICE = ["PERatio", "MarketCapitalization", "DividendYield", "PriceToBookRatio",
+                 "ReturnOnEquityTTM", "EVToEBITDA", "Beta"]
+
+
+def tipar_fundamentales(df: pd.DataFrame) -> pd.DataFrame:
+    """Convierte los ratios (strings como '12.5', 'None', '-') a float64."""
+    for col in CAMPOS_NUMERICOS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+
+class AlmacenFundamentales:
+    """
+    Almacén de datos fundamentales con caché en disco (TTL) y en memoria.
+
+    - Solo se llama a la API para los tickers sin payload vigente en caché.
+    - Los pendientes se descargan en lote (en paralelo, respetando el límite de llamadas).
+    """
+
+    def __init__(self, extractor=None, ttl_horas: float = 24, directorio: str = "data/cache/fundamentales"):
+        self.extractor = extractor
+        self.cache = CacheTTL(directorio, ttl_segundos=ttl_horas * 3600)
+        self._memoria = {}
+
+    def obtener(self, tickers: list) -> pd.DataFrame:
+        """Devuelve un DataFrame tipado (una fila por ticker) con los datos OVERVIEW."""
+        pendientes = []
+        for t in tickers:
+            if t in self._memoria:
+                continue
+            payload = self.cache.leer_json(t)
+            if payload is not None:
+                self._memoria[t] = payload
+            else:
+                pendientes.append(t)
+
+        if pendientes and self.extractor is not None:
+            print(f"📡 Fundamentales: {len(tickers) - len(pendientes)} en caché, {len(pendientes)} a descargar.")
+            for t, payload in self.extractor.obtener_overviews(pendientes).items():
+                if payload:
+                    self.cache.guardar_json(t, payload)
+                    self._memoria[t] = payload
+        elif not pendientes:
+            print(f"💾 Fundamentales: {len(tickers)} tickers servidos desde caché.")
+
+        filas = [{**self._memoria[t], "ticker": t} for t in tickers if t in self._memoria]
+        if not filas:
+            return pd.DataFrame()
+        return tipar_fundamentales(pd.DataFrame(filas))
+
+    def indice(self, tickers: list = None, campos: list = None) -> "IndiceFundamentales":
+        """Construye el índice de screening sobre los tickers indicados (o todo lo cargado)."""
+        df = self.obtener(tickers if tickers is not None else list(self._memoria))
+        return IndiceFundamentales(df, campos=campos)
+
+
+class IndiceFundamentales:
+    """
+    Índice columnar ordenado sobre campos numéricos de fundamentales.
+
+    Para cada campo se guardan los valores ordenados y sus posiciones de fila;
+    cada condición se resuelve con una búsqueda binaria (searchsorted) y las
+    condiciones se combinan con máscaras booleanas.
+    """
+
+    _PATRON = re.compile(r"^\s*(\w+)\s*(<=|>=|==|<|>)\s*(-?[\d.]+)\s*(%?)\s*$")
+
+    def __init__(self, df: pd.DataFrame, campos: list = None):
+        self.df = df.reset_index(drop=True)
+        self.n = len(self.df)
+        self._ordenados = {}
+        self._posiciones = {}
+
+        for campo in campos or CAMPOS_INDICE:
+            if campo not in self.df.columns:
+                continue
+            valores = pd.to_numeric(self.df[campo], errors="coerce").to_numpy(np.float64)
+            validos = np.flatnonzero(~np.isnan(valores))
+            orden = validos[np.argsort(valores[validos], kind="stable")]
+            self._ordenados[campo] = valores[orden]
+            self._posiciones[campo] = orden
+
+    def filas(self, campo: str, operador: str, valor: float) -> np.ndarray:
+        """Posiciones de fila que cumplen `campo operador valor`."""
+        if campo not in self._ordenados:
+            raise KeyError(f"Campo '{campo}' no indexado. Disponibles: {', '.join(self._ordenados)}")
+        ordenados, posiciones = self._ordenados[campo], self._posiciones[campo]
+
+        if operador == "<":
+            return posiciones[:np.searchsorted(ordenados, valor, side="left")]
+        if operador == "<=":
+            return posiciones[:np.searchsorted(ordenados, valor, side="right")]
+        if operador == ">":
+            return posiciones[np.searchsorted(ordenados, valor, side="right"):]
+        if operador == ">=":
+            return posiciones[np.searchsorted(ordenados, valor, side="left"):]
+        if operador == "==":
+            return posiciones[np.searchsorted(ordenados, valor, side="left"):
+                              np.searchsorted(ordenados, valor, side="right")]
+        raise ValueError(f"Operador '{operador}' no soportado.")
+
+    def filtrar(self, condiciones: list) -> pd.DataFrame:
+        """condiciones: lista de tuplas (campo, operador, valor) combinadas con AND."""
+        mascara = np.ones(self.n, dtype=bool)
+        for campo, operador, valor in condiciones:
+            cumple = np.zeros(self.n, dtype=bool)
+            cumple[self.filas(campo, operador, valor)] = True
+            mascara &= cumple
+        return self.df[mascara]
+
+    def consultar(self, consulta: str) -> pd.DataFrame:
+        """
+        Filtra con una expresión simple, ej. "PERatio < 15 and DividendYield > 3%".
+        Un sufijo % divide el valor entre 100 (DividendYield viene en tanto por uno).
+        """
+        condiciones = []
+        for parte in re.split(r"\s+and\s+", consulta.strip(), flags=re.IGNORECASE):
+            m = self._PATRON.match(parte)
+            if not m:
+                raise ValueError(f"Condición no válida: '{parte}'")
+            campo, operador, valor, pct = m.groups()
+            condiciones.append((campo, operador, float(valor) / (100 if pct else 1)))
+        return self.filtrar(condiciones)
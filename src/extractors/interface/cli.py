@@ -1,11 +1,6 @@
-import pandas as pd
-from src.extractors.yahoo_finance_extractor import ExtractorYahooFinance
-from src.extractors.alpha_vantage_extractor import ExtractorAlphaVantage
-from src.extractors.twelvedata_extractor import ExtractorTwelveData
-from src.extractors.world_bank_extractor import ExtractorWorldBank
-
-from src.models.series_precios import SeriePrecios
-from src.models.cartera import Cartera
+# Los extractores se importan al elegirlos (src/extractors/registro.py):
+# el menú aparece sin cargar yfinance, wbgapi, requests ni matplotlib.
+from src.extractors.registro import crear_extractor
 
 # =========================================================
 # 🔹 1. Selección de tipo de datos
@@ -20,7 +15,52 @@ def seleccionar_tipo_datos():
 
 
 # =========================================================
-# 🔹 2. Selección dinámica del extractor según tipo de dato
+# 🔹 2. Construcción de extractores por nombre (CLI y modo batch)
+# =========================================================
+def crear_extractor_precios(proveedor: str = "yahoo"):
+    """
+    Extractor de precios por nombre: yahoo, alphavantage, twelvedata, sintetico o auto.
+
+    Todos los precios pasan por la caché local (solo se descargan los huecos)
+    y por la capa single-flight (peticiones idénticas concurrentes → una sola llamada).
+    """
+    proveedor = proveedor.lower()
+    if proveedor not in ("yahoo", "alphavantage", "twelvedata", "sintetico", "auto"):
+        raise ValueError(f"Proveedor de precios desconocido: {proveedor}")
+    if proveedor == "sintetico":
+        return crear_extractor("sintetico", prob_hueco=0.01, prob_duplicado=0.005, prob_nan=0.005)
+
+    from src.extractors.cache_ohlcv import ExtractorCacheado
+    from src.extractors.coalescencia import ExtractorCoalescente
+    if proveedor == "auto":
+        from src.extractors.router_extractor import ExtractorRouter
+        # Cada proveedor se importa la primera vez que el router lo necesita
+        return ExtractorCoalescente(ExtractorRouter({
+            nombre: (lambda nombre=nombre: ExtractorCacheado(crear_extractor(nombre)))
+            for nombre in ("yahoo", "twelvedata", "alphavantage")
+        }))
+    return ExtractorCoalescente(ExtractorCacheado(crear_extractor(proveedor)))
+
+
+def tickers_canonicos(extractor, tickers: list) -> list:
+    """
+    Tickers con el nombre que tendrán en los resultados del extractor (sin repetidos).
+    Con el router ('auto') es el formato canónico: 'AENA:BMAD' → 'AENA.MC'.
+    """
+    normalizar = getattr(extractor, "normalizar_ticker", None)
+    return list(dict.fromkeys(normalizar(t) for t in tickers)) if normalizar else list(tickers)
+
+
+def crear_extractor_macro(proveedor: str = "worldbank"):
+    """Extractor macroeconómico por nombre: worldbank o alphavantage."""
+    proveedor = proveedor.lower()
+    if proveedor not in ("worldbank", "alphavantage"):
+        raise ValueError(f"Proveedor macro desconocido: {proveedor}")
+    return crear_extractor(proveedor)
+
+
+# =========================================================
+# 🔹 3. Selección dinámica del extractor según tipo de dato
 # =========================================================
 def seleccionar_extractor(tipo_datos):
     """
@@ -32,14 +72,12 @@ def seleccionar_extractor(tipo_datos):
         print("1️⃣  Yahoo Finance")
         print("2️⃣  AlphaVantage")
         print("3️⃣  TwelveData")
-        opcion = input("Opción [1-3]: ").strip()
+        print("4️⃣  Sintético (offline, pruebas de carga)")
+        print("5️⃣  Automático (elige proveedor por ticker, con reintento en otro)")
+        opcion = input("Opción [1-5]: ").strip()
 
-        if opcion == "2":
-            return ExtractorAlphaVantage()
-        elif opcion == "3":
-            return ExtractorTwelveData()
-        else:
-            return ExtractorYahooFinance()
+        proveedores = {"2": "alphavantage", "3": "twelvedata", "4": "sintetico", "5": "auto"}
+        return crear_extractor_precios(proveedores.get(opcion, "yahoo"))
 
     elif tipo_datos == "2":
         # Solo AlphaVantage soporta datos fundamentales
@@ -52,7 +90,7 @@ def seleccionar_extractor(tipo_datos):
         a partir de los informes de la SEC (EE. UU.).
         ⚠️ Empresas fuera de EE. UU. (como AENA, BBVA, etc.) no devolverán resultados.
         """)
-        return ExtractorAlphaVantage()
+        return crear_extractor("alphavantage")
 
     elif tipo_datos == "3":
         print("\nSeleccione la API para datos macroeconómicos:")
@@ -71,13 +109,10 @@ def seleccionar_extractor(tipo_datos):
         print("2️⃣  World Bank")
         opcion = input("Opción [1-2]: ").strip()
 
-        if opcion == "2":
-            return ExtractorWorldBank()
-        else:
-            return ExtractorAlphaVantage()
+        return crear_extractor_macro("worldbank" if opcion == "2" else "alphavantage")
         
 # =========================================================
-# 🔹 3. Inputs según tipo de dato
+# 🔹 4. Inputs según tipo de dato
 # =========================================================
 def pedir_tickers_y_fechas():
     tickers = input("Ingrese los tickers separados por coma (ej: AAPL,MSFT,GOOGL): ")
@@ -109,3 +144,23 @@ def pedir_indicador_macro():
             return indicadores[opcion]
         else:
             print("⚠️ Opción inválida. Intente nuevamente.")
+
+
+# =========================================================
+# 🔹 5. Formato de salida
+# =========================================================
+def pedir_formato_salida():
+    formatos = {"1": "excel", "2": "parquet", "3": "ambos"}
+
+    print("\nSeleccione el formato de salida:")
+    print("1️⃣  Excel (.xlsx con gráficos)")
+    print("2️⃣  Parquet (columnar comprimido, particionado por ticker)")
+    print("3️⃣  Ambos")
+    opcion = input("Opción [1-3] (default 1): ").strip()
+    return formatos.get(opcion, "excel")
+
+
+def pedir_semilla():
+    """Semilla de las simulaciones: con semilla son reproducibles (y se reutilizan), sin ella no."""
+    semilla = input("Semilla (Enter para trayectorias nuevas cada vez): ").strip()
+    return int(semilla) if semilla.lstrip("-").isdigit() else None
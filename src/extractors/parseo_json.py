@@ -0,0 +1,91 @@
+# src/extractors/parseo_json.py
+import re
+
+import numpy as np
+import pandas as pd
+from src.extractors.cache_ohlcv import COLUMNAS_ESTANDAR
+
+# Nombre normalizado de la clave del proveedor → columna estándar
+MAPA_COLUMNAS = {
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "close": "close",
+    "adjusted_close": "adjusted_close",
+    "volume": "volume",
+    "dividend_amount": "dividend_amount",
+    "split_coefficient": "split_coefficient",
+}
+
+_PREFIJO_AV = re.compile(r"^\d+\.\s*")
+
+
+def _normalizar_clave(clave: str) -> str:
+    """'5. adjusted close' → 'adjusted_close'"""
+    return _PREFIJO_AV.sub("", clave).strip().lower().replace(" ", "_")
+
+
+def _a_float(valores: list) -> np.ndarray:
+    try:
+        return np.array(valores, dtype=np.float64)
+    except (ValueError, TypeError):
+        # Valores no numéricos ('None', '-', None...) → NaN
+        return pd.to_numeric(pd.Series(valores, dtype=object), errors="coerce").to_numpy(np.float64)
+
+
+def _a_volumen(valores: list) -> np.ndarray:
+    try:
+        return np.array(valores, dtype=np.int64)
+    except (ValueError, TypeError, OverflowError):
+        vol = _a_float(valores)
+        # Solo se pasa a entero si no hay huecos (NaN no es representable en int64)
+        return vol.astype(np.int64) if np.isfinite(vol).all() else vol
+
+
+def _construir_frame(fechas: list, registros: list, ticker: str, fecha_inicio=None, fecha_fin=None) -> pd.DataFrame:
+    """
+    Convierte (fechas, lista de dicts de strings) en un DataFrame tipado columna a columna:
+    date datetime64, precios float64 y volume int64. Las columnas se mapean por nombre de clave.
+    Sin sesiones en el rango se devuelve un frame vacío con las columnas estándar.
+    """
+    if not registros:
+        return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+
+    fechas = np.array(fechas, dtype="datetime64[ns]")
+    mascara = np.ones(len(fechas), dtype=bool)
+    if fecha_inicio is not None:
+        mascara &= fechas >= np.datetime64(pd.Timestamp(fecha_inicio))
+    if fecha_fin is not None:
+        mascara &= fechas <= np.datetime64(pd.Timestamp(fecha_fin))
+    if not mascara.all():
+        idx = np.flatnonzero(mascara)
+        fechas = fechas[idx]
+        registros = [registros[i] for i in idx]
+        if not registros:
+            return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+
+    columnas = {"date": fechas}
+    for clave in registros[0]:
+        nombre = MAPA_COLUMNAS.get(_normalizar_clave(clave))
+        if nombre is None:
+            continue
+        valores = [r.get(clave, "nan") for r in registros]
+        columnas[nombre] = _a_volumen(valores) if nombre == "volume" else _a_float(valores)
+
+    df = pd.DataFrame(columnas, copy=False)
+    df["ticker"] = ticker
+    # Los proveedores suelen devolver primero la sesión más reciente
+    if len(fechas) > 1 and fechas[0] > fechas[-1]:
+        df = df.iloc[::-1].reset_index(drop=True)
+    return df
+
+
+def parsear_alphavantage(serie: dict, ticker: str, fecha_inicio=None, fecha_fin=None) -> pd.DataFrame:
+    """Parsea el bloque 'Time Series (Daily)' de AlphaVantage: {fecha: {'1. open': '...', ...}}."""
+    return _construir_frame(list(serie.keys()), list(serie.values()), ticker, fecha_inicio, fecha_fin)
+
+
+def parsear_twelvedata(valores: list, ticker: str, fecha_inicio=None, fecha_fin=None) -> pd.DataFrame:
+    """Parsea la lista 'values' de TwelveData: [{'datetime': '...', 'open': '...', ...}]."""
+    fechas = [v.get("datetime") for v in valores]
+    return _construir_frame(fechas, valores, ticker, fecha_inicio, fecha_fin)
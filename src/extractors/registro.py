@@ -0,0 +1,60 @@
+# src/extractors/registro.py
+import importlib
+from importlib.metadata import entry_points
+
+# ==========================================================
+# Registro de extractores (carga perezosa)
+# ==========================================================
+# nombre → (módulo, clase). Nada se importa hasta que se pide el extractor:
+# elegir World Bank no carga yfinance, y elegir Yahoo no carga wbgapi.
+# Paquetes externos pueden añadir extractores con registrar_extractor() o
+# declarando un entry point en el grupo GRUPO_PLUGINS ("nombre = paquete.modulo:Clase").
+
+GRUPO_PLUGINS = "miax.extractores"
+
+_REGISTRO = {
+    "yahoo": ("src.extractors.yahoo_finance_extractor", "ExtractorYahooFinance"),
+    "alphavantage": ("src.extractors.alpha_vantage_extractor", "ExtractorAlphaVantage"),
+    "twelvedata": ("src.extractors.twelvedata_extractor", "ExtractorTwelveData"),
+    "worldbank": ("src.extractors.world_bank_extractor", "ExtractorWorldBank"),
+    "sintetico": ("src.extractors.sintetico_extractor", "ExtractorSintetico"),
+}
+
+_clases = {}
+
+
+def registrar_extractor(nombre: str, modulo: str, clase: str):
+    """Registra (o sustituye) un extractor sin importarlo."""
+    nombre = nombre.lower()
+    _REGISTRO[nombre] = (modulo, clase)
+    _clases.pop(nombre, None)
+
+
+def _cargar_plugins():
+    for ep in entry_points(group=GRUPO_PLUGINS):
+        if ep.name.lower() not in _REGISTRO:
+            modulo, _, clase = ep.value.partition(":")
+            _REGISTRO[ep.name.lower()] = (modulo.strip(), clase.strip())
+
+
+def extractores_disponibles() -> list:
+    _cargar_plugins()
+    return sorted(_REGISTRO)
+
+
+def clase_extractor(nombre: str):
+    """Importa (la primera vez) y devuelve la clase del extractor `nombre`."""
+    nombre = nombre.lower()
+    if nombre not in _clases:
+        if nombre not in _REGISTRO:
+            _cargar_plugins()
+        if nombre not in _REGISTRO:
+            raise ValueError(f"Extractor desconocido: {nombre}. Disponibles: {', '.join(sorted(_REGISTRO))}")
+        modulo, clase = _REGISTRO[nombre]
+        _clases[nombre] = getattr(importlib.import_module(modulo), clase)
+    return _clases[nombre]
+
+
+def crear_extractor(nombre: str, *args, **kwargs):
+    """Instancia el extractor `nombre` (importando su módulo solo ahora)."""
+    return clase_extractor(nombre)(*args, **kwargs)
@@ -0,0 +1,225 @@
+# src/extractors/router_extractor.py
+import json
+import os
+import threading
+from collections import defaultdict
+
+import pandas as pd
+from src.extractors.extractor_base import ExtractorBase
+from src.extractors.cache_ohlcv import COLUMNAS_ESTANDAR, bloqueo_fichero
+from src.utils.data_cleaning import limpiar_dataframe
+
+# Sufijo Yahoo → código de mercado TwelveData
+MERCADOS_TWELVEDATA = {
+    ".MC": "BMAD",
+    ".PA": "EURONEXT",
+    ".AS": "EURONEXT",
+    ".BR": "EURONEXT",
+    ".LS": "EURONEXT",
+    ".DE": "XETR",
+    ".MI": "MTA",
+    ".L": "LSE",
+    ".SW": "SIX",
+}
+
+
+def a_canonico(ticker: str) -> str:
+    """Normaliza al formato Yahoo (canónico del toolkit): 'AENA:BMAD' → 'AENA.MC'."""
+    ticker = ticker.strip().upper()
+    if ":" in ticker:
+        simbolo, mercado = ticker.split(":", 1)
+        sufijo = next((s for s, m in MERCADOS_TWELVEDATA.items() if m == mercado), None)
+        return simbolo + sufijo if sufijo else simbolo
+    return ticker
+
+
+def _sufijo(ticker: str) -> str:
+    return "." + ticker.rsplit(".", 1)[1] if "." in ticker else ""
+
+
+def _es_eeuu(ticker: str) -> bool:
+    # Acciones y ETFs de EE. UU.: sin sufijo de mercado ni formato cripto/índice
+    return "." not in ticker and "-" not in ticker and not ticker.startswith("^")
+
+
+class ExtractorRouter(ExtractorBase):
+    """
+    Extractor que reparte cada ticker al proveedor más barato que probablemente lo sirva
+    y, si falla, reintenta automáticamente con el siguiente.
+
+    - Conoce las convenciones de símbolos (AENA.MC en Yahoo, AENA:BMAD en TwelveData).
+    - Conoce la cobertura de cada proveedor (los planes gratuitos de AlphaVantage y
+      TwelveData solo sirven EE. UU.).
+    - Recuerda éxitos y fallos por símbolo en disco para no repetir llamadas inútiles.
+
+    proveedores : dict nombre → extractor (o callable que lo crea, para instanciar solo los usados).
+    costes      : dict nombre → coste relativo de una llamada (límite de llamadas, API key...).
+    """
+
+    COSTES_POR_DEFECTO = {"yahoo": 0.0, "twelvedata": 1.0, "alphavantage": 2.0}
+
+    # Penalización (en unidades de coste) por probabilidad estimada de fallo
+    PENALIZACION_FALLO = 5.0
+
+    def __init__(
+        self,
+        proveedores: dict = None,
+        costes: dict = None,
+        twelvedata_premium: bool = False,
+        ruta_historial: str = "data/cache/router_historial.json",
+    ):
+        if proveedores is None:
+            from src.extractors.yahoo_finance_extractor import ExtractorYahooFinance
+            from src.extractors.twelvedata_extractor import ExtractorTwelveData
+            from src.extractors.alpha_vantage_extractor import ExtractorAlphaVantage
+            proveedores = {
+                "yahoo": ExtractorYahooFinance,
+                "twelvedata": ExtractorTwelveData,
+                "alphavantage": ExtractorAlphaVantage,
+            }
+        self._proveedores = proveedores
+        self._instancias = {}
+        self.costes = {**self.COSTES_POR_DEFECTO, **(costes or {})}
+        self.twelvedata_premium = twelvedata_premium
+        self.ruta_historial = ruta_historial
+        self.historial = self._cargar_historial()
+        # Éxitos/fallos registrados desde el último guardado (se suman a lo que haya en disco)
+        self._pendiente = {}
+        self._lock = threading.Lock()
+
+    # ==========================================================
+    # Cobertura y convenciones de símbolos
+    # ==========================================================
+    def cubre(self, proveedor: str, ticker: str) -> bool:
+        if proveedor == "yahoo":
+            return True
+        if proveedor == "twelvedata":
+            return _es_eeuu(ticker) or (self.twelvedata_premium and _sufijo(ticker) in MERCADOS_TWELVEDATA)
+        if proveedor == "alphavantage":
+            return _es_eeuu(ticker)
+        return True
+
+    @staticmethod
+    def normalizar_ticker(ticker: str) -> str:
+        """Nombre con el que el ticker aparece en los resultados del router (formato canónico)."""
+        return a_canonico(ticker)
+
+    @staticmethod
+    def simbolo(proveedor: str, ticker: str) -> str:
+        """Traduce el ticker canónico a la convención del proveedor."""
+        if proveedor == "twelvedata":
+            sufijo = _sufijo(ticker)
+            if sufijo in MERCADOS_TWELVEDATA:
+                return f"{ticker[:-len(sufijo)]}:{MERCADOS_TWELVEDATA[sufijo]}"
+        return ticker
+
+    # ==========================================================
+    # Historial de éxitos / fallos
+    # ==========================================================
+    def _cargar_historial(self) -> dict:
+        if self.ruta_historial and os.path.exists(self.ruta_historial):
+            try:
+                with open(self.ruta_historial, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                print("⚠️ Historial del router ilegible: se empieza de cero.")
+        return {}
+
+    def _guardar_historial(self):
+        """
+        Servicio, planificador y batch comparten el fichero: bajo un bloqueo se relee, se le suman
+        los contadores pendientes y se sustituye de golpe (temporal + os.replace).
+        """
+        if not self.ruta_historial:
+            return
+        os.makedirs(os.path.dirname(self.ruta_historial) or ".", exist_ok=True)
+        with self._lock, bloqueo_fichero(self.ruta_historial + ".lock"):
+            if not self._pendiente:
+                return
+            historial = self._cargar_historial()
+            for proveedor, tickers in self._pendiente.items():
+                for ticker, (exitos, fallos) in tickers.items():
+                    previos = historial.setdefault(proveedor, {}).get(ticker, [0, 0])
+                    historial[proveedor][ticker] = [previos[0] + exitos, previos[1] + fallos]
+            tmp = f"{self.ruta_historial}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(historial, f, indent=1)
+            os.replace(tmp, self.ruta_historial)
+            self.historial, self._pendiente = historial, {}
+
+    def _registrar(self, proveedor: str, ticker: str, exito: bool):
+        with self._lock:
+            for contadores in (self.historial, self._pendiente):
+                exitos, fallos = contadores.setdefault(proveedor, {}).get(ticker, [0, 0])
+                contadores[proveedor][ticker] = [exitos + int(exito), fallos + int(not exito)]
+
+    def prob_fallo(self, proveedor: str, ticker: str) -> float:
+        """Estimación suavizada de que el proveedor no sirva el ticker (0 si nunca ha fallado)."""
+        exitos, fallos = self.historial.get(proveedor, {}).get(ticker, [0, 0])
+        return fallos / (exitos + fallos + 1)
+
+    def puntuacion(self, proveedor: str, ticker: str) -> float:
+        return self.costes.get(proveedor, 1.0) + self.PENALIZACION_FALLO * self.prob_fallo(proveedor, ticker)
+
+    def _extractor(self, proveedor: str):
+        if proveedor not in self._instancias:
+            p = self._proveedores[proveedor]
+            # Se admiten instancias ya creadas o clases/factorías (se instancian al primer uso)
+            self._instancias[proveedor] = p if hasattr(p, "obtener_datos") and not isinstance(p, type) else p()
+        return self._instancias[proveedor]
+
+    # ==========================================================
+    # Precios históricos
+    # ==========================================================
+    def obtener_datos(self, tickers: list, fecha_inicio: str, fecha_fin: str) -> pd.DataFrame:
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        pendientes = list(dict.fromkeys(a_canonico(t) for t in tickers))
+        intentados = defaultdict(set)
+        resultados = []
+
+        while pendientes:
+            # 1️⃣ Asignar cada ticker al mejor proveedor todavía no intentado
+            asignacion = defaultdict(list)
+            sin_opcion = []
+            for t in pendientes:
+                candidatos = [p for p in self._proveedores if p not in intentados[t] and self.cubre(p, t)]
+                if not candidatos:
+                    sin_opcion.append(t)
+                    continue
+                asignacion[min(candidatos, key=lambda p: self.puntuacion(p, t))].append(t)
+
+            for t in sin_opcion:
+                print(f"❌ Ningún proveedor disponible ha servido {t}.")
+            if not asignacion:
+                break
+
+            # 2️⃣ Una llamada por proveedor con todos sus tickers
+            pendientes = []
+            for proveedor, lote in asignacion.items():
+                print(f"🧭 Router: {len(lote)} ticker(s) → {proveedor}")
+                traduccion = {self.simbolo(proveedor, t): t for t in lote}
+                try:
+                    df = self._extractor(proveedor).obtener_datos(list(traduccion), fecha_inicio, fecha_fin)
+                except Exception as e:
+                    print(f"⚠️ Error en {proveedor}: {e}")
+                    df = pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+
+                servidos = set()
+                if df is not None and not df.empty:
+                    df = df.copy()
+                    df["ticker"] = df["ticker"].astype(str).map(lambda s: traduccion.get(s, a_canonico(s)))
+                    servidos = set(df["ticker"].unique())
+                    resultados.append(df)
+
+                for t in lote:
+                    intentados[t].add(proveedor)
+                    self._registrar(proveedor, t, t in servidos)
+                    if t not in servidos:
+                        pendientes.append(t)
+
+        self._guardar_historial()
+
+        if not resultados:
+            return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+        return limpiar_dataframe(pd.concat(resultados, ignore_index=True))
@@ -0,0 +1,196 @@
+# src/extractors/sintetico_extractor.py
+import os
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+from src.extractors.extractor_base import ExtractorBase
+from src.extractors.cache_ohlcv import COLUMNAS_ESTANDAR, nombre_fichero
+from src.extractors.descarga_concurrente import LimitadorTokens
+from src.utils.data_cleaning import limpiar_dataframe
+
+# Origen común de todas las trayectorias sintéticas (no hay datos anteriores)
+EPOCA = np.datetime64("1990-01-01")
+
+
+class ExtractorSintetico(ExtractorBase):
+    """
+    Extractor offline para pruebas de carga y benchmarks (no necesita red).
+
+    Dos fuentes de datos:
+    - Generador sintético determinista: cada ticker usa su propia semilla (semilla + hash del
+      ticker) y una trayectoria que empieza en EPOCA, así que cada barra depende solo de
+      (ticker, fecha): ni del resto del universo ni del rango pedido. Soporta regímenes de
+      volatilidad, huecos, duplicados y NaNs para ejercitar la limpieza.
+    - Replay de ficheros Parquet grabados (p. ej. la caché de data/cache/ohlcv/<proveedor>).
+
+    Simula además latencia por petición y límite de llamadas, para medir el rendimiento
+    del pipeline completo de forma reproducible.
+    """
+
+    def __init__(
+        self,
+        semilla: int = 42,
+        regimenes: tuple = (0.01, 0.03),
+        prob_cambio_regimen: float = 0.01,
+        prob_hueco: float = 0.0,
+        prob_duplicado: float = 0.0,
+        prob_nan: float = 0.0,
+        directorio_replay: str = None,
+        latencia: float = 0.0,
+        llamadas_por_minuto: float = None,
+        tickers_por_peticion: int = 1,
+        max_en_vuelo: int = 8,
+        limpiar: bool = False,
+    ):
+        self.semilla = semilla
+        self.regimenes = np.asarray(regimenes, dtype=float)
+        self.prob_cambio_regimen = prob_cambio_regimen
+        self.prob_hueco = prob_hueco
+        self.prob_duplicado = prob_duplicado
+        self.prob_nan = prob_nan
+        self.directorio_replay = directorio_replay
+        self.latencia = latencia
+        self.limitador = LimitadorTokens(llamadas_por_minuto) if llamadas_por_minuto else None
+        self.tickers_por_peticion = tickers_por_peticion
+        self.max_en_vuelo = max_en_vuelo
+        # Por defecto los datos "sucios" llegan tal cual, para probar las etapas de limpieza
+        self.limpiar = limpiar
+
+    # ==========================
+    # 🔹 Precios históricos
+    # ==========================
+    def obtener_datos(self, tickers: list, fecha_inicio: str, fecha_fin: str) -> pd.DataFrame:
+        # Los lotes llegan según terminan; se reordenan para que el resultado sea reproducible
+        lotes = sorted(self._lotes_completados(tickers, fecha_inicio, fecha_fin), key=lambda x: x[0])
+        dfs = [df for _, df in lotes if not df.empty]
+        if not dfs:
+            return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+        df = pd.concat(dfs, ignore_index=True)
+        return limpiar_dataframe(df) if self.limpiar else df
+
+    def iterar_lotes(self, tickers: list, fecha_inicio: str, fecha_fin: str):
+        """Entrega un DataFrame por "petición" simulada, en el orden en que terminan."""
+        for _, df in self._lotes_completados(tickers, fecha_inicio, fecha_fin):
+            yield df
+
+    def _lotes_completados(self, tickers: list, fecha_inicio: str, fecha_fin: str):
+        """Genera (nº de petición, DataFrame) a medida que cada petición termina."""
+        if isinstance(tickers, str):
+            tickers = [tickers]
+        peticiones = [tickers[i:i + self.tickers_por_peticion]
+                      for i in range(0, len(tickers), self.tickers_por_peticion)]
+
+        # Calendario de días laborables calculado una sola vez para todo el universo
+        dias = np.arange(np.datetime64(pd.Timestamp(fecha_inicio).date()),
+                         np.datetime64(pd.Timestamp(fecha_fin).date()) + 1)
+        fechas = dias[np.is_busday(dias)].astype("datetime64[ns]")
+
+        with ThreadPoolExecutor(max_workers=self.max_en_vuelo) as pool:
+            futuros = {pool.submit(self._peticion, p, fecha_inicio, fecha_fin, fechas): i
+                       for i, p in enumerate(peticiones)}
+            for futuro in as_completed(futuros):
+                yield futuros[futuro], futuro.result()
+
+    def _peticion(self, tickers: list, fecha_inicio: str, fecha_fin: str, fechas: np.ndarray) -> pd.DataFrame:
+        if self.limitador:
+            self.limitador.adquirir_sync()
+        if self.latencia:
+            time.sleep(self.latencia)
+
+        if self.directorio_replay:
+            partes = [self._replay(t, fecha_inicio, fecha_fin) for t in tickers]
+        else:
+            partes = [self._generar(t, fechas) for t in tickers]
+        partes = [p for p in partes if not p.empty]
+        return pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+
+    # ==========================
+    # 🔹 Fuentes de datos
+    # ==========================
+    def _replay(self, ticker: str, fecha_inicio: str, fecha_fin: str) -> pd.DataFrame:
+        ruta = os.path.join(self.directorio_replay, nombre_fichero(ticker))
+        if not os.path.exists(ruta):
+            print(f"⚠️ No hay grabación para {ticker} en {self.directorio_replay}")
+            return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+        df = pd.read_parquet(ruta, filters=[("date", ">=", pd.Timestamp(fecha_inicio)),
+                                            ("date", "<=", pd.Timestamp(fecha_fin))])
+        df["ticker"] = ticker
+        return df[COLUMNAS_ESTANDAR]
+
+    def _generar(self, ticker: str, fechas: np.ndarray) -> pd.DataFrame:
+        fechas = fechas[fechas >= EPOCA]
+        n = len(fechas)
+        if n == 0:
+            return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+
+        # La trayectoria arranca siempre en EPOCA y se recorta a las fechas pedidas: el precio de
+        # un día depende solo de (ticker, fecha), no del rango consultado. Cada componente tiene su
+        # propio flujo aleatorio, así que alargar la serie no cambia los valores ya generados.
+        dias = np.arange(EPOCA, fechas[-1].astype("datetime64[D]") + 1)
+        calendario = dias[np.is_busday(dias)]
+        pos = np.searchsorted(calendario, fechas.astype("datetime64[D]"))
+        total = len(calendario)
+        semilla = [self.semilla, zlib.crc32(ticker.encode("utf-8"))]
+
+        def flujo(k: int) -> np.random.Generator:
+            return np.random.default_rng(semilla + [k])
+
+        # --- Regímenes de volatilidad (cadena que cambia con probabilidad fija) ---
+        cambios = flujo(0).random(total) < self.prob_cambio_regimen
+        regimen = np.cumsum(cambios) % len(self.regimenes)
+        vol = self.regimenes[regimen]
+
+        # --- Precio de cierre (GBM) y OHLC coherentes ---
+        precio_ini = flujo(1).uniform(5, 500)
+        log_rets = flujo(2).normal(0.0002, 1.0, total) * vol
+        close = precio_ini * np.exp(np.cumsum(log_rets))
+        open_ = np.concatenate([[precio_ini], close[:-1]]) * (1 + flujo(3).normal(0, 0.002, total))
+        high = np.maximum(open_, close) * (1 + np.abs(flujo(4).normal(0, vol / 2)))
+        low = np.minimum(open_, close) * (1 - np.abs(flujo(5).normal(0, vol / 2)))
+        volume = flujo(6).lognormal(13, 0.5, total).astype(np.int64)
+
+        df = pd.DataFrame({
+            "date": fechas,
+            "open": open_[pos], "high": high[pos], "low": low[pos], "close": close[pos],
+            "volume": volume[pos],
+        })
+        df["ticker"] = ticker
+
+        # --- Imperfecciones configurables (también fijas por fecha) ---
+        if self.prob_nan:
+            df.loc[flujo(7).random(total)[pos] < self.prob_nan, "close"] = np.nan
+        if self.prob_hueco:
+            conservar = flujo(8).random(total)[pos] >= self.prob_hueco
+            df, pos = df[conservar], pos[conservar]
+        if self.prob_duplicado and len(df):
+            df = pd.concat([df, df[flujo(9).random(total)[pos] < self.prob_duplicado]], ignore_index=True)
+        return df
+
+
+def medir_rendimiento(n_tickers: int = 10_000, anios: int = 5, **kwargs) -> dict:
+    """Mide el rendimiento de extracción + limpieza con el extractor sintético."""
+    tickers = [f"SYN{i:05d}" for i in range(n_tickers)]
+    fin = pd.Timestamp.today().normalize()
+    inicio = fin - pd.DateOffset(years=anios)
+    extractor = ExtractorSintetico(**kwargs)
+
+    t0 = time.perf_counter()
+    df = extractor.obtener_datos(tickers, inicio.strftime("%Y-%m-%d"), fin.strftime("%Y-%m-%d"))
+    t1 = time.perf_counter()
+    df = limpiar_dataframe(df)
+    t2 = time.perf_counter()
+
+    return {
+        "tickers": n_tickers,
+        "filas": len(df),
+        "seg_extraccion": round(t1 - t0, 3),
+        "seg_limpieza": round(t2 - t1, 3),
+        "filas_por_seg": round(len(df) / max(t2 - t0, 1e-9)),
+    }
+
+
+if __name__ == "__main__":
+    print(medir_rendimiento(prob_hueco=0.01, prob_duplicado=0.005, prob_nan=0.005))
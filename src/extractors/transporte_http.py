@@ -0,0 +1,111 @@
+# src/extractors/transporte_http.py
+import threading
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (conexión, lectura) en segundos: un socket colgado no puede bloquear la CLI indefinidamente
+TIMEOUT_POR_DEFECTO = (5, 30)
+
+
+@dataclass
+class EstadisticasHTTP:
+    """Contadores acumulados de las peticiones realizadas por la sesión compartida."""
+    peticiones: int = 0
+    errores: int = 0
+    bytes_recibidos: int = 0
+    latencia_total: float = 0.0
+    por_host: dict = field(default_factory=dict)
+
+    @property
+    def latencia_media(self) -> float:
+        return self.latencia_total / self.peticiones if self.peticiones else 0.0
+
+    def resumen(self) -> str:
+        return (f"🌐 HTTP: {self.peticiones} peticiones, {self.errores} errores, "
+                f"{self.bytes_recibidos / 1e6:.2f} MB, latencia media {self.latencia_media * 1000:.0f} ms")
+
+
+_sesion = None
+_lock = threading.Lock()
+_estadisticas = EstadisticasHTTP()
+
+
+def crear_sesion(max_por_host: int = 10, max_hosts: int = 8, reintentos: int = 3,
+                 backoff: float = 0.5) -> requests.Session:
+    """
+    Crea una sesión con keep-alive, pool de conexiones acotado por host,
+    reintentos con backoff exponencial y compresión gzip/deflate.
+
+    Los 429 no se reintentan aquí: cada reintento es una llamada más al proveedor y debe
+    pasar por su LimitadorTokens (lo hace `obtener_json` en descarga_concurrente).
+
+    - max_por_host: conexiones reutilizables hacia un mismo host (pool_maxsize).
+    - max_hosts: hosts distintos con pool propio antes de descartar el menos usado (pool_connections).
+    """
+    retry = Retry(
+        total=reintentos,
+        connect=reintentos,
+        read=reintentos,
+        backoff_factor=backoff,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset(["GET"]),
+        # Con Retry-After urllib3 reintentaría también los 429 aunque no estén en la lista
+        respect_retry_after_header=False,
+    )
+    adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_por_host, max_retries=retry)
+
+    sesion = requests.Session()
+    sesion.mount("https://", adapter)
+    sesion.mount("http://", adapter)
+    sesion.headers.update({
+        "Accept-Encoding": "gzip, deflate",
+        "User-Agent": "market-analysis-toolkit",
+    })
+    return sesion
+
+
+def obtener_sesion() -> requests.Session:
+    """Devuelve la sesión compartida por todos los extractores (se crea una sola vez)."""
+    global _sesion
+    if _sesion is None:
+        with _lock:
+            if _sesion is None:
+                _sesion = crear_sesion()
+    return _sesion
+
+
+def http_get(url: str, params: dict = None, timeout=TIMEOUT_POR_DEFECTO) -> requests.Response:
+    """GET a través de la sesión compartida, registrando latencia y bytes recibidos."""
+    host = urlparse(url).netloc
+    inicio = time.perf_counter()
+    try:
+        response = obtener_sesion().get(url, params=params, timeout=timeout)
+    except requests.RequestException:
+        _registrar(host, time.perf_counter() - inicio, 0, error=True)
+        raise
+    _registrar(host, time.perf_counter() - inicio, len(response.content), error=not response.ok)
+    return response
+
+
+def _registrar(host: str, latencia: float, n_bytes: int, error: bool):
+    with _lock:
+        for stats in (_estadisticas, _estadisticas.por_host.setdefault(host, EstadisticasHTTP())):
+            stats.peticiones += 1
+            stats.errores += int(error)
+            stats.bytes_recibidos += n_bytes
+            stats.latencia_total += latencia
+
+
+def estadisticas_http() -> EstadisticasHTTP:
+    return _estadisticas
+
+
+def reiniciar_estadisticas():
+    global _estadisticas
+    with _lock:
+        _estadisticas = EstadisticasHTTP()
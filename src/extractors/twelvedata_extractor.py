@@ -1,7 +1,8 @@
 import os
 import pandas as pd
-import requests
 from src.extractors.extractor_base import ExtractorBase
+from src.extractors.descarga_concurrente import LimitadorTokens, obtener_json, ejecutar_concurrente, ejecutar
+from src.extractors.parseo_json import parsear_twelvedata
 from src.utils.data_cleaning import limpiar_dataframe
 
 
@@ -11,38 +12,34 @@ class ExtractorTwelveData(ExtractorBase):
     Solo soporta datos de precios.
     """
 
-    def __init__(self, api_key=None):
-        self.api_key = "ec4022f800244ac291656f7964340a70"
-        self.base_url = "https://api.twelvedata.com"
+    def __init__(self, api_key=None, llamadas_por_minuto: float = 8, max_en_vuelo: int = 8, base_url: str = None):
+        self.api_key = api_key or "ec4022f800244ac291656f7964340a70"
+        self.base_url = base_url or "https://api.twelvedata.com"
+        # Plan gratuito: 8 llamadas/min.
+        self.limitador = LimitadorTokens(llamadas_por_minuto)
+        self.max_en_vuelo = max_en_vuelo
+
+    @staticmethod
+    def _es_limitado(data: dict) -> bool:
+        """TwelveData devuelve {'code': 429, 'status': 'error', ...} al superar el límite."""
+        return data.get("status") == "error" and data.get("code") == 429
 
     # ==========================
     # 🔹 Precios históricos
     # ==========================
     def obtener_datos(self, tickers, fecha_inicio, fecha_fin):
-        datos_completos = []
-
-        for ticker in tickers:
-            print(f"📈 Descargando {ticker} desde TwelveData...")
-            params = {
-                "symbol": ticker,
-                "interval": "1day",
-                "apikey": self.api_key,
-                "start_date": fecha_inicio,
-                "end_date": fecha_fin,
-                "format": "JSON",
-            }
-            response = requests.get(f"{self.base_url}/time_series", params=params)
-            data = response.json().get("values", [])
-
-            if not data:
-                print(f"⚠️ No se pudieron obtener datos para {ticker}")
-                continue
-
-            df = pd.DataFrame(data)
-            df["ticker"] = ticker
-            df["datetime"] = pd.to_datetime(df["datetime"])
-            df.rename(columns={"datetime": "date"}, inplace=True)
-            datos_completos.append(df)
+        return ejecutar(self.obtener_datos_async(tickers, fecha_inicio, fecha_fin))
+
+    async def obtener_datos_async(self, tickers, fecha_inicio, fecha_fin):
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        resultados = await ejecutar_concurrente(
+            tickers,
+            lambda t: self._descargar_ticker(t, fecha_inicio, fecha_fin),
+            max_en_vuelo=self.max_en_vuelo,
+        )
+        datos_completos = [resultados[t] for t in tickers if resultados[t] is not None]
 
         if datos_completos:
             df_total = pd.concat(datos_completos, ignore_index=True)
@@ -50,6 +47,26 @@ class ExtractorTwelveData(ExtractorBase):
         else:
             return pd.DataFrame()
 
+    async def _descargar_ticker(self, ticker, fecha_inicio, fecha_fin):
+        print(f"📈 Descargando {ticker} desde TwelveData...")
+        params = {
+            "symbol": ticker,
+            "interval": "1day",
+            "apikey": self.api_key,
+            "start_date": fecha_inicio,
+            "end_date": fecha_fin,
+            "format": "JSON",
+        }
+        data_json = await obtener_json(f"{self.base_url}/time_series", params, self.limitador,
+                                       es_limitado=self._es_limitado)
+        data = data_json.get("values", [])
+
+        if not data:
+            print(f"⚠️ No se pudieron obtener datos para {ticker}")
+            return None
+
+        return parsear_twelvedata(data, ticker)
+
     # ==========================
     # 🔸 No soporta fundamentales ni macro, se crean los métodos por conveniencia entre clases o de cara a un futuro
     # ==========================
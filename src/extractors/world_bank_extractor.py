@@ -1,5 +1,7 @@
 import pandas as pd
 import wbgapi as wb
+from src.extractors.transporte_http import TIMEOUT_POR_DEFECTO
+from src.utils.cache_ttl import CacheTTL
 
 
 class ExtractorWorldBank:
@@ -9,7 +11,10 @@ class ExtractorWorldBank:
     filtrando por país y rango de años.
     """
 
-    def __init__(self):
+    def __init__(self, ttl_cache_dias: int = 30):
+        # wbgapi usa requests.get internamente: al menos le aplicamos el mismo timeout
+        wb.get_options.setdefault("timeout", TIMEOUT_POR_DEFECTO)
+
         # Mapeo de tus indicadores a los códigos del Banco Mundial
         self.indicador_map = {
             "GDP": "NY.GDP.MKTP.KD.ZG",        # Crecimiento del PIB (% anual)
@@ -17,6 +22,7 @@ class ExtractorWorldBank:
             "CPI": "FP.CPI.TOTL.ZG",           # Igual que inflación general
             "UNEMPLOYMENT": "SL.UEM.TOTL.ZS"   # Tasa de desempleo total (%)
         }
+        self.cache = CacheTTL("data/cache/worldbank", ttl_segundos=ttl_cache_dias * 86400)
 
     # =========================================================
     # MÉTODO PRINCIPAL
@@ -32,59 +38,92 @@ class ExtractorWorldBank:
         Descarga datos macroeconómicos anuales desde el Banco Mundial
         filtrando por código de país (ISO 3) y rango de años.
         """
+        df = self.obtener_datos_macro_lote([indicador], [pais], start_year, end_year)
+        if not df.empty:
+            df["PAIS"] = pais.upper()
+        return df
 
-        indicador_key = indicador.upper()
+    # =========================================================
+    # DESCARGA EN LOTE (varios indicadores × países)
+    # =========================================================
+    def obtener_datos_macro_lote(
+        self,
+        indicadores: list,
+        paises: list,
+        start_year: int = 2010,
+        end_year: int = 2025,
+        usar_cache: bool = True
+    ) -> pd.DataFrame:
+        """
+        Descarga todos los indicadores × países × años en una sola petición a wbgapi
+        y devuelve un único DataFrame "tidy" (una fila por país, año e indicador).
 
-        if indicador_key not in self.indicador_map:
+        Los indicadores con el mismo código (INFLATION y CPI) se piden una sola vez.
+        El resultado se guarda en disco; los datos anuales apenas cambian, así que
+        se reutiliza durante `ttl_cache_dias` días.
+        """
+        indicadores = [i.upper() for i in indicadores]
+        no_soportados = [i for i in indicadores if i not in self.indicador_map]
+        if no_soportados:
             raise ValueError(
-                f"Indicador '{indicador_key}' no soportado. Usa: {', '.join(self.indicador_map.keys())}."
+                f"Indicador(es) {', '.join(no_soportados)} no soportado(s). Usa: {', '.join(self.indicador_map.keys())}."
             )
 
-        indicador_code = self.indicador_map[indicador_key]
-
-        # Validamos código de país
-        pais = pais.upper()
-        if len(pais) != 3:
-            print(f"⚠️ Aviso: El Banco Mundial usa códigos ISO-3 (ej. ESP). Usando '{pais}' igualmente.")
-
-        print(f"🔗 Conectando con el Banco Mundial ({indicador_key}, código: {indicador_code})...")
+        # Validamos códigos de país
+        paises = sorted({p.strip().upper() for p in paises if p.strip()})
+        for pais in paises:
+            if len(pais) != 3:
+                print(f"⚠️ Aviso: El Banco Mundial usa códigos ISO-3 (ej. ESP). Usando '{pais}' igualmente.")
+
+        codigos = sorted({self.indicador_map[i] for i in indicadores})
+        clave = f"wb|{','.join(codigos)}|{','.join(paises)}|{start_year}-{end_year}"
+
+        df = self.cache.leer_frame(clave) if usar_cache else None
+        if df is not None:
+            print(f"💾 World Bank: {len(codigos)} indicador(es) × {len(paises)} país(es) servidos desde caché.")
+        else:
+            print(f"🔗 Conectando con el Banco Mundial ({len(codigos)} indicador(es) × {len(paises)} país(es))...")
+            try:
+                df_data = list(wb.data.fetch(
+                    codigos,
+                    paises,
+                    time=range(start_year, end_year + 1),
+                    skipBlanks=True,
+                    numericTimeKeys=True,
+                ))
+            except Exception as e:
+                print(f"⚠️ Error al descargar datos del Banco Mundial: {e}")
+                return pd.DataFrame()
 
-        try:
-            df_data = wb.data.fetch(
-                indicador_code,
-                pais,
-                time=range(start_year, end_year + 1),
-                skipBlanks=True,
-                numericTimeKeys=True,
-            )
             if not df_data:
-                print(f"⚠️ No se encontraron datos para {indicador_key} ({pais})")
+                print(f"⚠️ No se encontraron datos para {', '.join(indicadores)} ({', '.join(paises)})")
                 return pd.DataFrame()
 
-            df = pd.DataFrame(df_data)
-
-        except Exception as e:
-            print(f"⚠️ Error al descargar datos de {indicador_key}: {e}")
-            return pd.DataFrame()
-
-        # =========================================================
-        # Normalización
-        # =========================================================
-        df = df.rename(
-            columns={
-                "value": "VALOR",
-                "time": "AÑO",
-                "economy": "PAIS_CODE",
-                "series": "SERIES_CODE",
-            }
-        )
-
-        df["PAIS"] = pais
-        df["INDICADOR"] = indicador_key
-        df["FUENTE"] = "WORLD_BANK"
-
-        # Limpieza del campo AÑO
-        df["AÑO"] = pd.to_numeric(df["AÑO"], errors="coerce").astype("Int64")
+            # =========================================================
+            # Normalización
+            # =========================================================
+            df = pd.DataFrame(df_data).rename(
+                columns={
+                    "value": "VALOR",
+                    "time": "AÑO",
+                    "economy": "PAIS_CODE",
+                    "series": "SERIES_CODE",
+                }
+            )
+            df["AÑO"] = pd.to_numeric(df["AÑO"], errors="coerce").astype("Int64")
+            df["VALOR"] = pd.to_numeric(df["VALOR"], errors="coerce")
+            df = df[["PAIS_CODE", "AÑO", "VALOR", "SERIES_CODE"]]
+            if usar_cache:
+                self.cache.guardar_frame(clave, df)
+
+        # Un bloque por indicador pedido (los alias comparten filas del mismo código)
+        bloques = []
+        for indicador_key in dict.fromkeys(indicadores):
+            sub = df[df["SERIES_CODE"] == self.indicador_map[indicador_key]].copy()
+            sub["PAIS"] = sub["PAIS_CODE"]
+            sub["INDICADOR"] = indicador_key
+            sub["FUENTE"] = "WORLD_BANK"
+            bloques.append(sub)
 
         columnas_principales = [
             "PAIS",
@@ -95,10 +134,10 @@ class ExtractorWorldBank:
             "PAIS_CODE",
             "SERIES_CODE",
         ]
-        df = df[[c for c in columnas_principales if c in df.columns]].reset_index(drop=True)
-        df = df.sort_values("AÑO")
+        df = pd.concat(bloques, ignore_index=True)[columnas_principales]
+        df = df.sort_values(["INDICADOR", "PAIS", "AÑO"]).reset_index(drop=True)
 
-        print(f"✅ Datos World Bank - {indicador_key}: {len(df)} registros para {pais} ({start_year}-{end_year})")
+        print(f"✅ Datos World Bank: {len(df)} registros ({start_year}-{end_year})")
         return df
 
     # =========================================================
@@ -1,53 +1,76 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 import yfinance as yf
 from src.extractors.extractor_base import ExtractorBase
 from src.utils.data_cleaning import limpiar_dataframe
 
+COLUMNAS_ESTANDAR = ['date', 'open', 'high', 'low', 'close', 'volume', 'ticker']
+
+
+def _a_formato_largo(raw: pd.DataFrame, tickers: list) -> pd.DataFrame:
+    """
+    Convierte la salida de yf.download (columnas MultiIndex Precio × Ticker)
+    al formato estándar largo con una sola operación stack.
+    """
+    if raw.empty:
+        return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+
+    if isinstance(raw.columns, pd.MultiIndex):
+        nivel = "Ticker" if "Ticker" in raw.columns.names else 1
+        df = raw.stack(level=nivel, future_stack=True)
+        df.index.names = ["date", "ticker"]
+        df = df.reset_index()
+    else:
+        df = raw.reset_index()
+        df["ticker"] = tickers[0]
+
+    # normalizar nombres: 'Adj Close' -> 'adj_close', 'Open' -> 'open', etc.
+    df.columns = [c.lower().replace(' ', '_') if isinstance(c, str) else c for c in df.columns]
+
+    # si solo hay adj_close y no close, rellenamos close
+    if 'adj_close' in df.columns and 'close' not in df.columns:
+        df['close'] = df['adj_close']
+
+    # asegurar presencia de columnas estándar (si falta, rellenar con NaN)
+    for col in COLUMNAS_ESTANDAR:
+        if col not in df.columns:
+            df[col] = pd.NA
+
+    df = df[COLUMNAS_ESTANDAR]
+    # filas de tickers sin cotización ese día (huecos del stack)
+    return df.dropna(subset=['open', 'high', 'low', 'close'], how='all')
+
+
+def _descargar_lote(tickers: list, fecha_inicio: str, fecha_fin: str) -> pd.DataFrame:
+    """Descarga un lote de tickers y lo devuelve ya en formato largo estándar."""
+    raw = yf.download(
+        tickers,
+        start=fecha_inicio,
+        end=fecha_fin,
+        group_by='column',
+        threads=True,
+        progress=False,
+    )
+    raw.dropna(how='all', inplace=True)
+    return _a_formato_largo(raw, tickers)
+
+
 class ExtractorYahooFinance(ExtractorBase):
-    def __init__(self):
+    # yf.download trata 'end' como límite exclusivo
+    fin_exclusivo = True
+
+    def __init__(self, tam_lote: int = 200, max_workers: int = 4, max_reintentos: int = 2):
+        self.tam_lote = tam_lote
+        self.max_workers = max_workers
+        self.max_reintentos = max_reintentos
         print("-> ExtractorYahooFinance listo.")
 
     def obtener_datos(self, tickers: list, fecha_inicio: str, fecha_fin: str) -> pd.DataFrame:
         if isinstance(tickers, str):
             tickers = [tickers]
 
-        raw = yf.download(
-            tickers,
-            start=fecha_inicio,
-            end=fecha_fin,
-            group_by='column',
-            threads=True
-        )
-        raw.dropna(how='all', inplace=True)
-
-        dfs = []
-        for ticker in tickers:
-            # si la descarga tiene MultiIndex (varios tickers)
-            if isinstance(raw.columns, pd.MultiIndex):
-                try:
-                    df_t = raw.xs(ticker, axis=1, level=1).copy()
-                except KeyError:
-                    print(f"⚠️ Ticker {ticker} no encontrado en la descarga.")
-                    continue
-            else:
-                df_t = raw.copy()
-
-            df_t = df_t.reset_index()
-            # normalizar nombres: 'Adj Close' -> 'adj_close', 'Open' -> 'open', etc.
-            df_t.columns = [c.lower().replace(' ', '_') if isinstance(c, str) else c for c in df_t.columns]
-
-            # si solo hay adj_close y no close, rellenamos close
-            if 'adj_close' in df_t.columns and 'close' not in df_t.columns:
-                df_t['close'] = df_t['adj_close']
-
-            # asegurar presencia de columnas estándar (si falta, rellenar con NaN)
-            for col in ['date', 'open', 'high', 'low', 'close', 'volume']:
-                if col not in df_t.columns:
-                    df_t[col] = pd.NA
-
-            df_std = df_t[['date', 'open', 'high', 'low', 'close', 'volume']].copy()
-            df_std['ticker'] = ticker
-            dfs.append(df_std)
+        dfs = [df for df in self.iterar_lotes(tickers, fecha_inicio, fecha_fin) if not df.empty]
 
         if dfs:
             df_final = pd.concat(dfs, ignore_index=True)
@@ -55,4 +78,56 @@ class ExtractorYahooFinance(ExtractorBase):
             return limpiar_dataframe(df_final)
         else:
             # Devolvemos siempre las columnas estándar, aunque vacío
-            return pd.DataFrame(columns=['date', 'open', 'high', 'low', 'close', 'volume', 'ticker'])
\ No newline at end of file
+            return pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+
+    def iterar_lotes(self, tickers: list, fecha_inicio: str, fecha_fin: str):
+        """
+        Generador que descarga el universo en lotes de `tam_lote` tickers y entrega
+        cada lote (formato estándar) en cuanto termina, para que el llamador o la caché
+        lo procese sin acumular todo el universo en memoria.
+
+        Los lotes se reparten en un pool de procesos acotado: yf.download guarda su estado
+        en variables globales del módulo y no admite llamadas simultáneas en un mismo proceso.
+        Solo se reintentan los tickers de un lote que fallaron o no devolvieron datos.
+        """
+        if isinstance(tickers, str):
+            tickers = [tickers]
+
+        # Universos pequeños: una única descarga en el propio proceso
+        if len(tickers) <= self.tam_lote:
+            df = _descargar_lote(tickers, fecha_inicio, fecha_fin)
+            self._avisar_faltantes(tickers, df)
+            yield df
+            return
+
+        lotes = [tickers[i:i + self.tam_lote] for i in range(0, len(tickers), self.tam_lote)]
+        print(f"📦 Descargando {len(tickers)} tickers en {len(lotes)} lotes ({self.max_workers} procesos)...")
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            pendientes = {pool.submit(_descargar_lote, lote, fecha_inicio, fecha_fin): (lote, 0) for lote in lotes}
+            while pendientes:
+                futuro = next(as_completed(pendientes))
+                lote, intento = pendientes.pop(futuro)
+                try:
+                    df = futuro.result()
+                except Exception as e:
+                    print(f"⚠️ Error en lote de {len(lote)} tickers: {e}")
+                    df = pd.DataFrame(columns=COLUMNAS_ESTANDAR)
+
+                recibidos = set(df["ticker"].unique()) if not df.empty else set()
+                fallidos = [t for t in lote if t not in recibidos]
+                if fallidos and intento < self.max_reintentos:
+                    print(f"🔁 Reintentando {len(fallidos)} ticker(s) del lote (intento {intento + 1})...")
+                    pendientes[pool.submit(_descargar_lote, fallidos, fecha_inicio, fecha_fin)] = (fallidos, intento + 1)
+                elif fallidos:
+                    self._avisar_faltantes(fallidos, df)
+
+                if not df.empty:
+                    yield df
+
+    @staticmethod
+    def _avisar_faltantes(tickers: list, df: pd.DataFrame):
+        recibidos = set(df["ticker"].unique()) if not df.empty else set()
+        for t in tickers:
+            if t not in recibidos:
+                print(f"⚠️ Ticker {t} no encontrado en la descarga.")
@@ -12,6 +12,8 @@ class Cartera:
     series: list = field(default_factory=list)
     pesos: dict = field(default_factory=dict)
     risk_free_rate: float = 0.02  # 2% anual por defecto
+    # Panel ya alineado (PanelPrecios); si existe, los retornos se leen de sus matrices
+    panel: object = field(default=None, repr=False)
 
     # ==========================================================
     # Gestión de series
@@ -62,6 +64,11 @@ class Cartera:
         if not self.series:
             raise ValueError("No hay series en la cartera.")
 
+        # 🔹 Con panel: la alineación ya está hecha, solo se toman sus columnas
+        if self.panel is not None:
+            df_rets = self.panel.retornos_df([s.ticker for s in self.series])
+            return df_rets.dropna(how="any" if metodo_union == "inner" else "all")
+
         dfs = []
         for s in self.series:
             if not s.returns.empty:
@@ -199,6 +206,14 @@ class Cartera:
 
         return "\n".join(lines)
 
+    # ==========================================================
+    # Escenarios de estrés
+    # ==========================================================
+    def motor_estres(self, horizonte_dias: int = 1):
+        """Devuelve un MotorEstres sobre esta cartera (ver src/simulations/estres.py)."""
+        from src.simulations.estres import MotorEstres
+        return MotorEstres([self], horizonte_dias=horizonte_dias)
+
     # ==========================================================
     # Simulación Monte Carlo
     # ==========================================================
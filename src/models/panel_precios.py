@@ -0,0 +1,189 @@
+# src/models/panel_precios.py
+
+import numpy as np
+import pandas as pd
+from src.models.series_precios import SeriePrecios
+
+
+def _ffill_matriz(matriz: np.ndarray, limite: int = None) -> np.ndarray:
+    """Forward-fill por columnas de una matriz (fechas × tickers), opcionalmente limitado."""
+    n = matriz.shape[0]
+    filas = np.arange(n)[:, None]
+    validos = ~np.isnan(matriz)
+    ultimo = np.maximum.accumulate(np.where(validos, filas, -1), axis=0)
+    relleno = np.take_along_axis(matriz, np.maximum(ultimo, 0), axis=0)
+    fuera = ultimo < 0
+    if limite is not None:
+        fuera |= (filas - ultimo) > limite
+    relleno[fuera] = np.nan
+    return relleno
+
+
+class PanelPrecios:
+    """
+    Panel ancho de precios: matrices NumPy contiguas (fechas × tickers) con un índice
+    de fechas común y un mapa ticker → columna.
+
+    Se construye una sola vez por dataset (desde el DataFrame largo estándar) y el resto
+    del toolkit (SeriePrecios, Cartera, MotorEstres, Monte Carlo) parte de sus matrices en
+    lugar de volver a filtrar y pivotar el frame largo en cada llamada. Solo guarda cierre
+    y volumen: las series que construye no tienen open/high/low.
+
+    Modos de alineación (desde_largo):
+    - 'interseccion': solo las fechas en las que todos los tickers tienen cierre.
+    - 'union'      : todas las fechas; huecos con forward-fill (hasta `max_huecos`).
+    - 'calendario' : un calendario dado (o días laborables); huecos con forward-fill.
+    """
+
+    MODOS = ("interseccion", "union", "calendario")
+
+    def __init__(self, fechas, tickers: list, close: np.ndarray, volumen: np.ndarray = None):
+        self.fechas = pd.DatetimeIndex(fechas)
+        self.tickers = list(tickers)
+        self.columna = {t: i for i, t in enumerate(self.tickers)}
+        self.close = np.ascontiguousarray(close, dtype=float)
+        self.volumen = None if volumen is None else np.ascontiguousarray(volumen, dtype=float)
+        self._retornos = None
+
+    @classmethod
+    def desde_largo(
+        cls,
+        df: pd.DataFrame,
+        modo: str = "interseccion",
+        calendario=None,
+        max_huecos: int = None,
+        columna_ticker: str = "ticker",
+        columna_fecha: str = "date",
+    ) -> "PanelPrecios":
+        """
+        Pivota el DataFrame largo (date, ticker, close[, volume]) en una sola pasada.
+        max_huecos: límite del forward-fill en 'union'/'calendario' (None = sin límite, 0 = no rellenar).
+        """
+        if modo not in cls.MODOS:
+            raise ValueError(f"Modo de alineación no soportado: {modo}. Usa uno de {cls.MODOS}.")
+        if df.empty:
+            return cls([], [], np.empty((0, 0)))
+
+        fechas_largo = pd.to_datetime(df[columna_fecha]).to_numpy()
+        codigos, tickers = pd.factorize(df[columna_ticker], sort=True)
+        fechas, pos_fecha = np.unique(fechas_largo, return_inverse=True)
+
+        def pivotar(columna):
+            matriz = np.full((len(fechas), len(tickers)), np.nan)
+            matriz[pos_fecha, codigos] = df[columna].to_numpy(dtype=float, na_value=np.nan)
+            return matriz
+
+        close = pivotar("close")
+        volumen = pivotar("volume") if "volume" in df.columns else None
+
+        if modo == "interseccion":
+            filas = ~np.isnan(close).any(axis=1)
+            close, fechas = close[filas], fechas[filas]
+            volumen = volumen[filas] if volumen is not None else None
+
+        elif modo == "calendario":
+            if calendario is None:
+                cal = pd.bdate_range(fechas.min(), fechas.max()).to_numpy()
+            else:
+                cal = np.unique(pd.to_datetime(pd.Index(calendario)).to_numpy())
+            # Se reindexa sobre la unión para poder arrastrar el último cierre y luego se recorta
+            todas = np.union1d(fechas, cal)
+            pos = np.searchsorted(todas, fechas)
+            close_ext = np.full((len(todas), len(tickers)), np.nan)
+            close_ext[pos] = close
+            en_cal = np.isin(todas, cal)
+            close = _ffill_matriz(close_ext, max_huecos)[en_cal]
+            if volumen is not None:
+                vol_ext = np.full((len(todas), len(tickers)), np.nan)
+                vol_ext[pos] = volumen
+                volumen = vol_ext[en_cal]
+            fechas = todas[en_cal]
+
+        if modo in ("union", "calendario"):
+            if modo == "union":
+                close = _ffill_matriz(close, max_huecos)
+            if volumen is not None:
+                # Sin negociación ese día (cierre arrastrado) → volumen 0
+                volumen = np.where(np.isnan(volumen) & ~np.isnan(close), 0.0, volumen)
+
+        return cls(fechas, [str(t) for t in tickers], close, volumen)
+
+    # ==========================================================
+    # Matrices derivadas
+    # ==========================================================
+    @property
+    def retornos(self) -> np.ndarray:
+        """Retornos logarítmicos (fechas × tickers); la primera fila es NaN. Se calculan una vez."""
+        if self._retornos is None:
+            rets = np.full_like(self.close, np.nan)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rets[1:] = np.log(self.close[1:] / self.close[:-1])
+            rets[~np.isfinite(rets)] = np.nan
+            self._retornos = rets
+        return self._retornos
+
+    def __len__(self):
+        return len(self.fechas)
+
+    def __repr__(self):
+        return f"PanelPrecios({len(self.fechas)} fechas × {len(self.tickers)} tickers)"
+
+    def _columnas(self, tickers: list = None):
+        if tickers is None:
+            return self.tickers, slice(None)
+        tickers = [t for t in tickers if t in self.columna]
+        return tickers, [self.columna[t] for t in tickers]
+
+    def retornos_df(self, tickers: list = None) -> pd.DataFrame:
+        """Retornos como DataFrame (fechas × tickers), sin copiar si se piden todos los tickers."""
+        tickers, cols = self._columnas(tickers)
+        return pd.DataFrame(self.retornos[1:, cols], index=self.fechas[1:], columns=tickers, copy=False)
+
+    def close_df(self, tickers: list = None) -> pd.DataFrame:
+        tickers, cols = self._columnas(tickers)
+        return pd.DataFrame(self.close[:, cols], index=self.fechas, columns=tickers, copy=False)
+
+    # ==========================================================
+    # Series y carteras para el resto del toolkit
+    # ==========================================================
+    def serie(self, ticker: str) -> SeriePrecios:
+        """
+        SeriePrecios del ticker con su columna del panel (fechas con cierre): date, close,
+        volume y ticker, sin open/high/low. SeriePrecios ordena y amplía su DataFrame
+        (returns, cumulative_return), así que trabaja sobre una copia, no sobre el panel.
+        """
+        if ticker not in self.columna:
+            return SeriePrecios(ticker)
+        j = self.columna[ticker]
+        close = self.close[:, j]
+        validos = ~np.isnan(close)
+        # Sin huecos interiores basta con recortar los extremos (evita la máscara booleana)
+        idx = np.flatnonzero(validos)
+        if len(idx) and idx[-1] - idx[0] + 1 == len(idx):
+            filas = slice(idx[0], idx[-1] + 1)
+        else:
+            filas = validos
+
+        datos = {"date": self.fechas[filas], "close": close[filas]}
+        if self.volumen is not None:
+            datos["volume"] = self.volumen[filas, j]
+        datos["ticker"] = ticker
+        return SeriePrecios(ticker, pd.DataFrame(datos, copy=False))
+
+    def cartera(self, tickers: list = None, nombre: str = "Cartera", pesos: dict = None):
+        """Cartera con las series del panel; sus retornos se leen directamente de las matrices."""
+        from src.models.cartera import Cartera
+
+        tickers = self.tickers if tickers is None else tickers
+        cartera = Cartera(nombre=nombre, panel=self)
+        for t in tickers:
+            if t not in self.columna:
+                print(f"⚠️ {t} no está en el panel de precios; se omite de la cartera.")
+                continue
+            cartera.series.append(self.serie(t))
+
+        if pesos:
+            cartera.pesos = dict(pesos)
+        else:
+            cartera.ajustar_pesos_por_volatilidad()
+        return cartera
@@ -0,0 +1,244 @@
+# src/pipeline/dag.py
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+
+# ==========================================================
+# Huellas de contenido
+# ==========================================================
+def huella(obj) -> str:
+    """
+    Hash de contenido (sha256) de un artefacto: DataFrames/Series por sus valores,
+    índices y tipos; arrays por sus bytes; el resto por su serialización pickle.
+    """
+    h = hashlib.sha256()
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        h.update(repr(list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        h.update(repr(list(obj.dtypes) if isinstance(obj, pd.DataFrame) else obj.dtype).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=repr):
+            h.update(repr(k).encode())
+            h.update(huella(obj[k]).encode())
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            h.update(huella(v).encode())
+    else:
+        h.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+    return h.hexdigest()
+
+
+def _huella_funcion(funcion) -> str:
+    # El código fuente forma parte de la clave: cambiar la función invalida su caché
+    try:
+        fuente = inspect.getsource(funcion)
+    except (OSError, TypeError):
+        fuente = getattr(funcion, "__qualname__", repr(funcion))
+    return hashlib.sha256(fuente.encode()).hexdigest()
+
+
+# ==========================================================
+# Etapas y pipeline
+# ==========================================================
+@dataclass
+class Etapa:
+    """
+    Nodo del DAG. `funcion` recibe los resultados de `dependencias` como argumentos
+    posicionales (en ese orden) y `parametros` como argumentos con nombre.
+    cachear=False fuerza su ejecución siempre (p. ej. escritura de ficheros o datos vivos).
+    """
+    nombre: str
+    funcion: object
+    dependencias: list = field(default_factory=list)
+    parametros: dict = field(default_factory=dict)
+    cachear: bool = True
+    version: str = "1"
+
+
+class Pipeline:
+    """
+    Ejecutor de un DAG de etapas con caché direccionada por contenido.
+
+    La clave de cada etapa es el hash de (nombre, versión, código de la función, parámetros,
+    huellas de contenido de sus entradas). Si existe un artefacto con esa clave en disco, la
+    etapa no se ejecuta; y como la clave depende del contenido (no de la ejecución) de las
+    entradas, una etapa recalculada que produce lo mismo no invalida lo que viene detrás.
+    Los artefactos se cargan de disco solo si alguna etapa posterior tiene que ejecutarse.
+
+    Las ramas independientes se ejecutan en paralelo (pool de hilos acotado).
+    """
+
+    def __init__(self, directorio_cache: str = "data/cache/pipeline", max_workers: int = 4, usar_cache: bool = True):
+        self.directorio_cache = directorio_cache
+        self.max_workers = max_workers
+        self.usar_cache = usar_cache
+        self.etapas = {}
+        self.informe = []
+        self._lock = threading.Lock()
+
+    def agregar(self, nombre: str, funcion, dependencias=(), parametros: dict = None,
+                cachear: bool = True, version: str = "1") -> "Pipeline":
+        if nombre in self.etapas:
+            raise ValueError(f"Etapa duplicada: {nombre}")
+        self.etapas[nombre] = Etapa(nombre, funcion, list(dependencias), parametros or {}, cachear, version)
+        return self
+
+    # ==========================
+    # 🔹 Estructura del grafo
+    # ==========================
+    def orden_topologico(self) -> list:
+        pendientes = {n: set(e.dependencias) for n, e in self.etapas.items()}
+        for n, deps in pendientes.items():
+            faltan = deps - set(self.etapas)
+            if faltan:
+                raise ValueError(f"La etapa '{n}' depende de etapas inexistentes: {sorted(faltan)}")
+        orden = []
+        while pendientes:
+            listas = sorted(n for n, deps in pendientes.items() if not deps)
+            if not listas:
+                raise ValueError(f"El pipeline tiene un ciclo entre: {sorted(pendientes)}")
+            for n in listas:
+                orden.append(n)
+                del pendientes[n]
+            for deps in pendientes.values():
+                deps.difference_update(listas)
+        return orden
+
+    def _necesarias(self, objetivos: list) -> list:
+        necesarias, pila = set(), list(objetivos)
+        while pila:
+            n = pila.pop()
+            if n not in necesarias:
+                necesarias.add(n)
+                pila.extend(self.etapas[n].dependencias)
+        return [n for n in self.orden_topologico() if n in necesarias]
+
+    # ==========================
+    # 🔹 Caché de artefactos
+    # ==========================
+    def _clave(self, etapa: Etapa, huellas_entrada: dict) -> str:
+        contenido = json.dumps({
+            "nombre": etapa.nombre,
+            "version": etapa.version,
+            "funcion": _huella_funcion(etapa.funcion),
+            "parametros": etapa.parametros,
+            "entradas": {d: huellas_entrada[d] for d in etapa.dependencias},
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(contenido.encode()).hexdigest()
+
+    def _rutas(self, clave: str) -> tuple:
+        base = os.path.join(self.directorio_cache, clave[:2], clave)
+        return f"{base}.pkl", f"{base}.json"
+
+    def _leer_meta(self, clave: str) -> dict:
+        ruta_pkl, ruta_meta = self._rutas(clave)
+        if not (os.path.exists(ruta_pkl) and os.path.exists(ruta_meta)):
+            return None
+        try:
+            with open(ruta_meta, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Metadatos ilegibles (p. ej. de una versión que los escribía sin temporal): se recalcula
+            return None
+
+    def _guardar(self, clave: str, etapa: Etapa, resultado, huella_salida: str):
+        ruta_pkl, ruta_meta = self._rutas(clave)
+        os.makedirs(os.path.dirname(ruta_pkl), exist_ok=True)
+        tmp = f"{ruta_pkl}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(resultado, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, ruta_pkl)
+        # Otros workers pueden estar leyendo los metadatos: también se sustituyen de golpe
+        tmp = f"{ruta_meta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"etapa": etapa.nombre, "huella": huella_salida, "creado": time.time()}, f)
+        os.replace(tmp, ruta_meta)
+
+    def _cargar(self, clave: str):
+        with open(self._rutas(clave)[0], "rb") as f:
+            return pickle.load(f)
+
+    # ==========================
+    # 🔹 Ejecución
+    # ==========================
+    def ejecutar(self, objetivos: list = None) -> dict:
+        """
+        Ejecuta las etapas necesarias para `objetivos` (por defecto, las hojas del grafo)
+        y devuelve un dict nombre → resultado de cada objetivo.
+        """
+        if objetivos is None:
+            usadas = {d for e in self.etapas.values() for d in e.dependencias}
+            objetivos = [n for n in self.etapas if n not in usadas]
+        orden = self._necesarias(objetivos)
+
+        huellas, claves, resultados = {}, {}, {}
+        self.informe = []
+
+        def obtener(nombre):
+            # Resultado de una etapa: en memoria si se ejecutó, si no se lee del artefacto
+            with self._lock:
+                if nombre not in resultados:
+                    resultados[nombre] = self._cargar(claves[nombre])
+                return resultados[nombre]
+
+        def procesar(nombre):
+            etapa = self.etapas[nombre]
+            t0 = time.perf_counter()
+            clave = self._clave(etapa, huellas)
+            claves[nombre] = clave
+
+            meta = self._leer_meta(clave) if (self.usar_cache and etapa.cachear) else None
+            if meta is not None:
+                huellas[nombre] = meta["huella"]
+                self.informe.append((nombre, "caché", round(time.perf_counter() - t0, 3)))
+                return
+
+            entradas = [obtener(d) for d in etapa.dependencias]
+            resultado = etapa.funcion(*entradas, **etapa.parametros)
+            huella_salida = huella(resultado)
+            if etapa.cachear:
+                self._guardar(clave, etapa, resultado, huella_salida)
+            with self._lock:
+                resultados[nombre] = resultado
+            huellas[nombre] = huella_salida
+            self.informe.append((nombre, "ejecutada", round(time.perf_counter() - t0, 3)))
+
+        pendientes = {n: set(self.etapas[n].dependencias) for n in orden}
+        en_curso = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pendientes or en_curso:
+                for n in [n for n, deps in pendientes.items() if not deps]:
+                    del pendientes[n]
+                    en_curso[pool.submit(procesar, n)] = n
+                hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    n = en_curso.pop(futuro)
+                    try:
+                        futuro.result()
+                    except Exception as e:
+                        for f in en_curso:
+                            f.cancel()
+                        raise RuntimeError(f"Falló la etapa '{n}': {e}") from e
+                    for deps in pendientes.values():
+                        deps.discard(n)
+
+        return {n: obtener(n) for n in objetivos}
+
+    def resumen(self) -> str:
+        ejecutadas = sum(1 for _, estado, _ in self.informe if estado == "ejecutada")
+        detalle = ", ".join(f"{n} ({estado}, {s}s)" for n, estado, s in self.informe)
+        return f"🧩 Pipeline: {ejecutadas} etapa(s) ejecutadas, {len(self.informe) - ejecutadas} desde caché → {detalle}"
@@ -0,0 +1,458 @@
+# src/planificador/refresco.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+from src.extractors.descarga_concurrente import LimitadorTokens
+
+# ==========================================================
+# Especificación de universos
+# ==========================================================
+# Un fichero JSON/YAML con los universos que se mantienen al día:
+#
+#   limites: {alphavantage: 5, yahoo: 30}   # llamadas/minuto por proveedor (opcional)
+#   universos:
+#     - nombre: tech
+#       tipo: precios                       # precios | macro
+#       proveedor: yahoo                    # yahoo | alphavantage | twelvedata | sintetico
+#       tickers: [AAPL, MSFT, GOOGL]
+#       desde: 2018-01-01                   # histórico que se mantiene (backfill incluido)
+#       cada_minutos: 60
+#     - nombre: macro_ue
+#       tipo: macro
+#       proveedor: worldbank                # worldbank | alphavantage
+#       indicadores: [GDP, CPI]
+#       paises: [ESP, FRA, DEU]
+#       desde: 2000
+#       cada_minutos: 1440
+
+LIMITES_POR_DEFECTO = {"alphavantage": 5, "twelvedata": 8, "yahoo": 30, "worldbank": 30, "sintetico": 600}
+
+# Tickers por llamada al proveedor (los que no aparecen descargan de uno en uno)
+TICKERS_POR_LLAMADA = {"yahoo": 50, "sintetico": 100}
+
+UNIVERSO_POR_DEFECTO = {
+    "tipo": "precios",
+    "proveedor": None,
+    "tickers": [],
+    "desde": None,
+    "cada_minutos": 60,
+    "indicadores": ["GDP", "INFLATION", "UNEMPLOYMENT", "CPI"],
+    "paises": ["USA"],
+}
+
+ANIOS_HISTORICO = 5
+DIAS_ANUALES = 252
+
+
+def cargar_universos(ruta: str) -> tuple:
+    """Lee el fichero de universos (.json, .yaml o .yml) y devuelve (universos, limites)."""
+    with open(ruta, "r", encoding="utf-8") as f:
+        if ruta.lower().endswith((".yaml", ".yml")):
+            import yaml
+            contenido = yaml.safe_load(f)
+        else:
+            contenido = json.load(f)
+
+    limites = {}
+    if isinstance(contenido, dict) and "universos" in contenido:
+        limites = contenido.get("limites") or {}
+        contenido = contenido["universos"]
+    if isinstance(contenido, dict):
+        contenido = [contenido]
+    return [normalizar_universo(u, i) for i, u in enumerate(contenido)], limites
+
+
+def normalizar_universo(spec: dict, indice: int = 0) -> dict:
+    """Completa un universo con los valores por defecto y valida lo imprescindible."""
+    universo = {**UNIVERSO_POR_DEFECTO, **spec}
+    universo["nombre"] = str(spec.get("nombre") or f"universo_{indice + 1}")
+    universo["tipo"] = universo["tipo"].lower()
+    if universo["tipo"] not in ("precios", "macro"):
+        raise ValueError(f"[{universo['nombre']}] tipo desconocido: {universo['tipo']}")
+    if universo["proveedor"] is None:
+        universo["proveedor"] = "yahoo" if universo["tipo"] == "precios" else "worldbank"
+    universo["proveedor"] = universo["proveedor"].lower()
+
+    if universo["tipo"] == "precios":
+        if isinstance(universo["tickers"], str):
+            universo["tickers"] = universo["tickers"].split(",")
+        universo["tickers"] = [t.strip().upper() for t in universo["tickers"] if t.strip()]
+        if not universo["tickers"]:
+            raise ValueError(f"[{universo['nombre']}] falta la lista de tickers.")
+        desde = universo["desde"] or pd.Timestamp.today().normalize() - pd.DateOffset(years=ANIOS_HISTORICO)
+        # YAML convierte las fechas sin comillas en objetos date
+        universo["desde"] = pd.Timestamp(str(desde)).strftime("%Y-%m-%d")
+    else:
+        universo["indicadores"] = [i.upper() for i in universo["indicadores"]]
+        universo["paises"] = [p.upper() for p in universo["paises"]]
+        universo["desde"] = int(universo["desde"] or pd.Timestamp.today().year - 15)
+    universo["cada_minutos"] = float(universo["cada_minutos"])
+    return universo
+
+
+# ==========================================================
+# Métricas incrementales por serie
+# ==========================================================
+@dataclass
+class EstadisticasSerie:
+    """
+    Estado acumulado de una serie de cierres: se actualiza solo con las barras nuevas.
+
+    Media y varianza de los retornos logarítmicos con la fusión de Chan (equivalente a
+    Welford por bloques) y drawdown máximo con el pico acumulado. Si llegan barras
+    anteriores a la última ya procesada (backfill), hay que empezar de cero.
+    """
+    ticker: str
+    primera_fecha: str = None
+    ultima_fecha: str = None
+    primer_cierre: float = None
+    ultimo_cierre: float = None
+    barras: int = 0
+    n: int = 0
+    media: float = 0.0
+    m2: float = 0.0
+    pico: float = None
+    max_drawdown: float = 0.0
+
+    def actualizar(self, df: pd.DataFrame) -> int:
+        """Incorpora las barras de `df` posteriores a `ultima_fecha`. Devuelve cuántas."""
+        if df.empty:
+            return 0
+        df = df[df["close"].notna() & (df["close"] > 0)].sort_values("date")
+        if self.ultima_fecha is not None:
+            df = df[df["date"] > pd.Timestamp(self.ultima_fecha)]
+        if df.empty:
+            return 0
+
+        cierres = df["close"].to_numpy(dtype=float)
+        previos = cierres if self.ultimo_cierre is None else np.concatenate(([self.ultimo_cierre], cierres))
+        retornos = np.diff(np.log(previos))
+        if retornos.size:
+            n_b, media_b = retornos.size, float(retornos.mean())
+            m2_b = float(((retornos - media_b) ** 2).sum())
+            n = self.n + n_b
+            delta = media_b - self.media
+            self.media += delta * n_b / n
+            self.m2 += m2_b + delta ** 2 * self.n * n_b / n
+            self.n = n
+
+        picos = np.maximum.accumulate(cierres if self.pico is None else np.concatenate(([self.pico], cierres)))
+        picos = picos[-cierres.size:]
+        self.max_drawdown = min(self.max_drawdown, float((cierres / picos - 1).min()))
+        self.pico = float(picos[-1])
+
+        if self.primera_fecha is None:
+            self.primera_fecha = df["date"].iloc[0].strftime("%Y-%m-%d")
+            self.primer_cierre = float(cierres[0])
+        self.ultima_fecha = df["date"].iloc[-1].strftime("%Y-%m-%d")
+        self.ultimo_cierre = float(cierres[-1])
+        self.barras += int(cierres.size)
+        return int(cierres.size)
+
+    def metricas(self) -> dict:
+        std = float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else float("nan")
+        return {
+            "ticker": self.ticker,
+            "desde": self.primera_fecha,
+            "hasta": self.ultima_fecha,
+            "n_datos": self.barras,
+            "ultimo_cierre": self.ultimo_cierre,
+            "rendimiento_total": self.ultimo_cierre / self.primer_cierre - 1 if self.primer_cierre else float("nan"),
+            "retorno_anualizado": self.media * DIAS_ANUALES,
+            "volatilidad_anualizada": float(std * np.sqrt(DIAS_ANUALES)),
+            "sharpe": float(self.media / std * np.sqrt(DIAS_ANUALES)) if std > 0 else float("nan"),
+            "max_drawdown": self.max_drawdown,
+        }
+
+
+# ==========================================================
+# Planificador
+# ==========================================================
+class Planificador:
+    """
+    Mantiene al día un conjunto de universos (precios y series macro) sin intervención.
+
+    - Precios: las barras se guardan en la misma caché que usan menús, batch y servicio
+      (`ExtractorCacheado`), que solo descarga los huecos: las barras nuevas y, tras una
+      parada, todo el periodo perdido. Las métricas se actualizan con las barras nuevas.
+    - Macro: una petición por universo desde el último año ya guardado (el anterior se
+      vuelve a pedir por si hubo revisiones), fusionada en `<directorio>/macro/<universo>.parquet`.
+
+    Cada ciclo reparte las tareas pendientes por proveedor (un hilo por proveedor) y solo
+    lanza las que caben en su presupuesto de llamadas/minuto; las demás esperan al ciclo
+    siguiente, empezando siempre por las más atrasadas.
+    """
+
+    def __init__(self, universos: list, limites: dict = None, directorio: str = "data/cache/planificador",
+                 segundos_ciclo: float = 60, raiz_cache: str = "data/cache/ohlcv"):
+        self.universos = {u["nombre"]: u for u in universos}
+        self.limites = {**LIMITES_POR_DEFECTO, **(limites or {})}
+        self.directorio = directorio
+        self.segundos_ciclo = segundos_ciclo
+        self.raiz_cache = raiz_cache
+        os.makedirs(os.path.join(directorio, "macro"), exist_ok=True)
+        os.makedirs(os.path.join(directorio, "metricas"), exist_ok=True)
+
+        self._ruta_estado = os.path.join(directorio, "estado.json")
+        self.estado = self._leer_estado()
+        self._lock = threading.Lock()
+        self._limitadores = {}
+        self._extractores = {}
+        self._cacheados = {}
+
+    # ==========================
+    # 🔹 Estado en disco
+    # ==========================
+    def _leer_estado(self) -> dict:
+        estado = {"tareas": {}, "metricas": {}, "macro": {}}
+        if os.path.exists(self._ruta_estado):
+            try:
+                with open(self._ruta_estado, "r", encoding="utf-8") as f:
+                    estado.update(json.load(f))
+            except (OSError, ValueError):
+                print("⚠️ Estado del planificador ilegible: se reconstruye desde la caché.")
+        return estado
+
+    def _guardar_estado(self):
+        tmp = self._ruta_estado + ".tmp"
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.estado, f, indent=1, ensure_ascii=False, default=str)
+        os.replace(tmp, self._ruta_estado)
+
+    # ==========================
+    # 🔹 Proveedores
+    # ==========================
+    def limitador(self, proveedor: str) -> LimitadorTokens:
+        if proveedor not in self._limitadores:
+            por_minuto = float(self.limites.get(proveedor, 10))
+            # Como mucho un minuto de llamadas de golpe: más solo haría esperar al limitador del extractor
+            rafaga = max(1, int(por_minuto))
+            self._limitadores[proveedor] = LimitadorTokens(por_minuto, rafaga=rafaga)
+        return self._limitadores[proveedor]
+
+    def _extractor(self, proveedor: str):
+        if proveedor not in self._extractores:
+            from src.extractors.registro import crear_extractor
+            self._extractores[proveedor] = crear_extractor(proveedor)
+        return self._extractores[proveedor]
+
+    def _cacheado(self, proveedor: str):
+        if proveedor not in self._cacheados:
+            from src.extractors.cache_ohlcv import ExtractorCacheado
+            self._cacheados[proveedor] = ExtractorCacheado(self._extractor(proveedor), raiz=self.raiz_cache)
+        return self._cacheados[proveedor]
+
+    # ==========================
+    # 🔹 Tareas
+    # ==========================
+    def tareas(self) -> list:
+        """Una tarea por llamada al proveedor: lotes de tickers o un universo macro entero."""
+        tareas = []
+        for nombre, u in self.universos.items():
+            if u["tipo"] == "macro":
+                tareas.append({"id": nombre, "universo": nombre, "tipo": "macro", "proveedor": u["proveedor"]})
+                continue
+            tamano = TICKERS_POR_LLAMADA.get(u["proveedor"], 1)
+            for i in range(0, len(u["tickers"]), tamano):
+                lote = u["tickers"][i:i + tamano]
+                tareas.append({"id": f"{nombre}#{i // tamano}", "universo": nombre, "tipo": "precios",
+                               "proveedor": u["proveedor"], "tickers": lote})
+        return tareas
+
+    def pendientes(self, ahora: float = None) -> list:
+        """Tareas a las que les toca refrescarse, de la más atrasada a la más reciente."""
+        ahora = time.time() if ahora is None else ahora
+        pendientes = []
+        for tarea in self.tareas():
+            ultima = self.estado["tareas"].get(tarea["id"], {}).get("ultima_ok", 0)
+            if ahora - ultima >= self.universos[tarea["universo"]]["cada_minutos"] * 60:
+                pendientes.append((ultima, tarea))
+        return [t for _, t in sorted(pendientes, key=lambda x: x[0])]
+
+    def _llamadas(self, tarea: dict) -> int:
+        """Llamadas al proveedor que va a hacer la tarea (0 si la caché ya está al día)."""
+        if tarea["tipo"] == "macro":
+            # La primera; el resto (una por indicador y país) se espera dentro de la tarea
+            return 1
+        desde = self.universos[tarea["universo"]]["desde"]
+        hoy = pd.Timestamp.today().normalize()
+        return len(self._cacheado(tarea["proveedor"]).rangos_pendientes(tarea["tickers"], desde, hoy))
+
+    def _refrescar_precios(self, tarea: dict) -> int:
+        universo = self.universos[tarea["universo"]]
+        cacheado = self._cacheado(tarea["proveedor"])
+        hoy = pd.Timestamp.today().normalize()
+        # La barra de hoy puede estar incompleta: las métricas llegan hasta ayer
+        ayer = hoy - pd.Timedelta(days=1)
+        desde = universo["desde"]
+
+        with self._lock:
+            metricas = dict(self.estado["metricas"].get(universo["nombre"], {}))
+
+        # Huecos anteriores a lo ya procesado (parada larga, `desde` ampliado) → recalcular la serie
+        reiniciar = set()
+        for t in tarea["tickers"]:
+            ultima = metricas.get(t, {}).get("ultima_fecha")
+            if ultima and any(a <= pd.Timestamp(ultima) for a, _ in cacheado.cache.huecos(t, desde, hoy)):
+                reiniciar.add(t)
+
+        cacheado.completar(tarea["tickers"], desde, hoy.strftime("%Y-%m-%d"))
+
+        nuevas = 0
+        for t in tarea["tickers"]:
+            if t in metricas and t not in reiniciar:
+                est = EstadisticasSerie(**metricas[t])
+            else:
+                est = EstadisticasSerie(t)
+            inicio = desde if est.ultima_fecha is None else pd.Timestamp(est.ultima_fecha) + pd.Timedelta(days=1)
+            if pd.Timestamp(inicio) <= ayer:
+                nuevas += est.actualizar(cacheado.cache.leer(t, inicio, ayer))
+            metricas[t] = asdict(est)
+
+        with self._lock:
+            self.estado["metricas"].setdefault(universo["nombre"], {}).update(metricas)
+        return nuevas
+
+    def _refrescar_macro(self, tarea: dict) -> int:
+        universo = self.universos[tarea["universo"]]
+        extractor = self._extractor(tarea["proveedor"])
+        ruta = os.path.join(self.directorio, "macro", f"{universo['nombre']}.parquet")
+        existente = pd.read_parquet(ruta) if os.path.exists(ruta) else pd.DataFrame()
+
+        anio_actual = pd.Timestamp.today().year
+        with self._lock:
+            consultado = self.estado["macro"].get(universo["nombre"])
+        if consultado and consultado[0] <= universo["desde"] and not existente.empty:
+            inicio = max(universo["desde"], consultado[1] - 1)
+        else:
+            inicio = universo["desde"]
+
+        if hasattr(extractor, "obtener_datos_macro_lote"):
+            nuevo = extractor.obtener_datos_macro_lote(universo["indicadores"], universo["paises"],
+                                                       inicio, anio_actual, usar_cache=False)
+        else:
+            # Una llamada por indicador y país: la primera ya tiene su token, el resto lo espera
+            partes = []
+            for i, ind in enumerate(universo["indicadores"]):
+                for j, pais in enumerate(universo["paises"]):
+                    if i or j:
+                        self.limitador(tarea["proveedor"]).adquirir_sync()
+                    df_i = extractor.obtener_datos_macro(ind, start_year=inicio, end_year=anio_actual, pais=pais)
+                    if not df_i.empty:
+                        partes.append(df_i.assign(PAIS=pais) if "PAIS" not in df_i.columns else df_i)
+            nuevo = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame()
+
+        with self._lock:
+            self.estado["macro"][universo["nombre"]] = [min(inicio, (consultado or [inicio])[0]), anio_actual]
+        if nuevo.empty:
+            return 0
+
+        df = pd.concat([existente, nuevo], ignore_index=True) if not existente.empty else nuevo
+        claves = [c for c in ("INDICADOR", "PAIS_CODE", "PAIS", "AÑO", "YEAR", "DATE") if c in df.columns]
+        df = df.drop_duplicates(subset=claves or None, keep="last").reset_index(drop=True)
+        orden = [c for c in ("INDICADOR", "PAIS_CODE", "PAIS", "AÑO", "YEAR", "DATE") if c in df.columns]
+        if orden:
+            df = df.sort_values(orden).reset_index(drop=True)
+        df.to_parquet(ruta + ".tmp", index=False)
+        os.replace(ruta + ".tmp", ruta)
+        return len(df) - len(existente)
+
+    def _ejecutar_proveedor(self, proveedor: str, tareas: list) -> dict:
+        """Lanza las tareas de un proveedor mientras haya presupuesto; el resto se aplaza."""
+        resumen = {"ejecutadas": 0, "aplazadas": 0, "nuevas": 0, "errores": 0}
+        limitador = self.limitador(proveedor)
+        for k, tarea in enumerate(tareas):
+            if not limitador.intentar(self._llamadas(tarea)):
+                resumen["aplazadas"] += len(tareas) - k
+                break
+            inicio = time.perf_counter()
+            try:
+                if tarea["tipo"] == "macro":
+                    nuevas = self._refrescar_macro(tarea)
+                else:
+                    nuevas = self._refrescar_precios(tarea)
+            except Exception as e:
+                print(f"⚠️ [{tarea['id']}] {type(e).__name__}: {e}")
+                with self._lock:
+                    self.estado["tareas"].setdefault(tarea["id"], {}).update(
+                        {"ultimo_error": f"{type(e).__name__}: {e}", "ultimo_intento": time.time()})
+                resumen["errores"] += 1
+                continue
+            with self._lock:
+                self.estado["tareas"][tarea["id"]] = {"ultima_ok": time.time(), "ultimo_error": None,
+                                                      "nuevas": nuevas, "s": round(time.perf_counter() - inicio, 2)}
+            resumen["ejecutadas"] += 1
+            resumen["nuevas"] += nuevas
+        return resumen
+
+    def _exportar_metricas(self, nombres: set):
+        """Tabla de métricas por universo en Parquet, lista para los reportes."""
+        for nombre in nombres:
+            with self._lock:
+                estados = list(self.estado["metricas"].get(nombre, {}).values())
+            if not estados:
+                continue
+            tabla = pd.DataFrame([EstadisticasSerie(**e).metricas() for e in estados])
+            ruta = os.path.join(self.directorio, "metricas", f"{nombre}.parquet")
+            tabla.to_parquet(ruta + ".tmp", index=False)
+            os.replace(ruta + ".tmp", ruta)
+
+    # ==========================
+    # 🔹 Ciclos
+    # ==========================
+    def ciclo(self) -> dict:
+        """Un pase: refresca lo que toca dentro del presupuesto de cada proveedor."""
+        por_proveedor = {}
+        for tarea in self.pendientes():
+            por_proveedor.setdefault(tarea["proveedor"], []).append(tarea)
+
+        total = {"ejecutadas": 0, "aplazadas": 0, "nuevas": 0, "errores": 0}
+        if por_proveedor:
+            with ThreadPoolExecutor(max_workers=len(por_proveedor)) as pool:
+                futuros = [pool.submit(self._ejecutar_proveedor, p, t) for p, t in por_proveedor.items()]
+                for futuro in futuros:
+                    for clave, valor in futuro.result().items():
+                        total[clave] += valor
+            self._exportar_metricas({t["universo"] for ts in por_proveedor.values() for t in ts
+                                     if t["tipo"] == "precios"})
+            self._guardar_estado()
+        return total
+
+    def ejecutar(self, una_vez: bool = False) -> dict:
+        """Bucle de refresco (Ctrl+C para salir). Con `una_vez` hace un único ciclo."""
+        print(f"🕒 Planificador: {len(self.universos)} universo(s), {len(self.tareas())} tarea(s), "
+              f"ciclo de {self.segundos_ciclo:.0f} s.")
+        resumen = {}
+        try:
+            while True:
+                resumen = self.ciclo()
+                if resumen["ejecutadas"] or resumen["aplazadas"] or resumen["errores"]:
+                    print(f"🔄 {time.strftime('%H:%M:%S')} {resumen['ejecutadas']} tarea(s) hechas, "
+                          f"{resumen['nuevas']} dato(s) nuevo(s), {resumen['aplazadas']} aplazada(s), "
+                          f"{resumen['errores']} error(es).")
+                if una_vez:
+                    return resumen
+                time.sleep(self.segundos_ciclo)
+        except KeyboardInterrupt:
+            print("\n👋 Planificador detenido.")
+        return resumen
+
+
+def leer_metricas(universo: str, directorio: str = "data/cache/planificador") -> pd.DataFrame:
+    """Métricas más recientes de un universo de precios (vacío si aún no se ha refrescado)."""
+    ruta = os.path.join(directorio, "metricas", f"{universo}.parquet")
+    return pd.read_parquet(ruta) if os.path.exists(ruta) else pd.DataFrame()
+
+
+def main_planificador(ruta_universos: str, una_vez: bool = False, segundos_ciclo: float = 60) -> int:
+    """Punto de entrada del planificador. Devuelve el código de salida."""
+    universos, limites = cargar_universos(ruta_universos)
+    resumen = Planificador(universos, limites, segundos_ciclo=segundos_ciclo).ejecutar(una_vez=una_vez)
+    return 1 if resumen.get("errores") else 0
@@ -0,0 +1,399 @@
+# src/servicio/servidor.py
+import json
+import math
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from src.utils.espacio_trabajo import EspacioTrabajo, rango_cerrado
+
+# ==========================================================
+# API HTTP/JSON local
+# ==========================================================
+#   GET /salud
+#   GET /series/metricas?ticker=AAPL[&inicio=2020-01-01&fin=2024-12-31]
+#   GET /cartera/metricas?tickers=AAPL,MSFT[&pesos=AAPL:0.6,MSFT:0.4]
+#   GET /cartera/var?tickers=AAPL,MSFT&alpha=0.01
+#   GET /simulacion?ticker=AAPL | tickers=AAPL,MSFT [&dias=252&simulaciones=500&semilla=42]
+#
+# Los mismos parámetros se aceptan como cuerpo JSON en POST.
+# Sin inicio/fin se usan los últimos ANIOS_POR_DEFECTO años hasta hoy.
+
+ANIOS_POR_DEFECTO = 5
+# Lo calculado sobre un rango que llega hasta hoy se rehace pasado este tiempo (barras nuevas)
+TTL_RANGO_ABIERTO = 15 * 60
+
+
+class ErrorPeticion(ValueError):
+    """Parámetros inválidos o datos inexistentes: se responde 400."""
+
+
+# ==========================================================
+# Trabajos del pool de procesos (reciben objetos pequeños)
+# ==========================================================
+def _iniciar_worker():
+    # Ctrl+C llega a todo el grupo de procesos: solo el servidor lo atiende y cierra el pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _resumen_simulacion(sim: pd.DataFrame) -> dict:
+    final = sim.iloc[-1].to_numpy()
+    bandas = np.percentile(sim.to_numpy(), [5, 50, 95], axis=1)
+    return {
+        "dias": sim.shape[0],
+        "simulaciones": sim.shape[1],
+        "final": {
+            "media": float(final.mean()),
+            "p5": float(np.percentile(final, 5)),
+            "p50": float(np.percentile(final, 50)),
+            "p95": float(np.percentile(final, 95)),
+        },
+        "bandas": {"p5": bandas[0].tolist(), "p50": bandas[1].tolist(), "p95": bandas[2].tolist()},
+    }
+
+
+def _simular_serie(serie, dias: int, simulaciones: int, semilla) -> dict:
+    sim = serie.simulate_montecarlo(num_days=dias, num_simulations=simulaciones, random_seed=semilla)
+    return _resumen_simulacion(sim)
+
+
+def _simular_cartera(cartera, dias: int, simulaciones: int, semilla) -> dict:
+    # Cada worker tiene su propio generador global: la semilla no afecta a otras peticiones
+    if semilla is not None:
+        np.random.seed(semilla)
+    return _resumen_simulacion(cartera.simulate_montecarlo(num_days=dias, num_simulations=simulaciones))
+
+
+def _sanear(valor):
+    """Convierte a tipos JSON (numpy → Python, NaN/inf → null, fechas → ISO)."""
+    if isinstance(valor, dict):
+        return {str(k): _sanear(v) for k, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [_sanear(v) for v in valor]
+    if isinstance(valor, np.ndarray):
+        return _sanear(valor.tolist())
+    if isinstance(valor, (np.integer,)):
+        return int(valor)
+    if isinstance(valor, (float, np.floating)):
+        return None if not math.isfinite(valor) else float(valor)
+    if isinstance(valor, (pd.Timestamp,)):
+        return valor.isoformat()
+    return valor
+
+
+# ==========================================================
+# Servicio (estado caliente)
+# ==========================================================
+class ServicioAnalisis:
+    """
+    Estado de larga duración del modo servicio: un extractor, un EspacioTrabajo con los precios
+    por ticker y las SeriePrecios/Cartera/métricas ya calculadas, y un pool de procesos para
+    las simulaciones. Las consultas repetidas se responden desde memoria.
+
+    Solo los precios de rangos cerrados (anteriores a hoy) se guardan en disco; lo que depende
+    de un rango abierto caduca a los `ttl_abierto` segundos y se vuelve a pedir.
+    """
+
+    def __init__(self, proveedor: str = "yahoo", presupuesto_mb: float = 1024, max_workers: int = None,
+                 directorio: str = "data/cache/servicio", ttl_abierto: float = TTL_RANGO_ABIERTO):
+        from src.extractors.interface.cli import crear_extractor_precios
+
+        self.proveedor = proveedor
+        self.extractor = crear_extractor_precios(proveedor)
+        self.espacio = EspacioTrabajo(directorio, presupuesto_mb=presupuesto_mb)
+        self.pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_iniciar_worker)
+        self.inicio = time.time()
+        self.peticiones = 0
+        self.ttl_abierto = ttl_abierto
+        self._caducidad = {}  # clave → instante en que caduca (solo rangos abiertos)
+        # Copias en disco de rangos que no estaban cerrados al guardarse: pueden estar incompletas
+        for clave, meta, _ in self.espacio.listar("precios"):
+            if not rango_cerrado(meta.get("fin")):
+                self.espacio.olvidar(clave)
+        # EspacioTrabajo no es thread-safe; las descargas y cálculos se hacen fuera del lock
+        self._lock = threading.Lock()
+
+    def cerrar(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    # ==========================
+    # 🔹 Caché en memoria
+    # ==========================
+    def _obtener(self, clave: str):
+        with self._lock:
+            return self.espacio.obtener(clave)
+
+    def _vigente(self, clave: str) -> bool:
+        # Llamar con self._lock adquirido
+        return clave in self.espacio and self._caducidad.get(clave, math.inf) > time.time()
+
+    def _guardar(self, clave: str, valor, fin: str, persistir: bool = False, meta: dict = None):
+        # Llamar con self._lock adquirido
+        if rango_cerrado(fin):
+            self._caducidad.pop(clave, None)
+        else:
+            persistir = False
+            self._caducidad[clave] = time.time() + self.ttl_abierto
+        self.espacio.guardar(clave, valor, persistir=persistir, meta=meta)
+
+    def _calcular(self, clave: str, funcion, fin: str):
+        with self._lock:
+            if self._vigente(clave):
+                return self.espacio.obtener(clave)
+        valor = funcion()
+        with self._lock:
+            self._guardar(clave, valor, fin)
+        return valor
+
+    # ==========================
+    # 🔹 Datos de mercado
+    # ==========================
+    def _canonico(self, ticker: str) -> str:
+        # Con proveedor 'auto' los resultados usan el formato canónico ('AENA:BMAD' → 'AENA.MC')
+        normalizar = getattr(self.extractor, "normalizar_ticker", None)
+        return normalizar(ticker) if normalizar else ticker
+
+    def _ticker(self, params: dict) -> str:
+        return self._canonico(_ticker(params))
+
+    def _tickers(self, params: dict) -> list:
+        return list(dict.fromkeys(self._canonico(t) for t in _tickers(params)))
+
+    def _pesos(self, params: dict) -> dict:
+        return {self._canonico(t): w for t, w in _pesos(params).items()}
+
+    @staticmethod
+    def _rango(params: dict) -> tuple:
+        fin = params.get("fin") or pd.Timestamp.today().strftime("%Y-%m-%d")
+        inicio = params.get("inicio") or (pd.Timestamp(fin) - pd.DateOffset(years=ANIOS_POR_DEFECTO)).strftime("%Y-%m-%d")
+        return inicio, fin
+
+    def precios(self, tickers: list, inicio: str, fin: str) -> pd.DataFrame:
+        """
+        Precios por ticker desde memoria/disco; solo los que faltan se piden (en una llamada).
+        Un ticker sin datos no se guarda: la siguiente petición vuelve a intentarlo.
+        """
+        tickers = [self._canonico(t) for t in tickers]
+        claves = {t: EspacioTrabajo.clave("precios", self.proveedor, t, inicio, fin) for t in tickers}
+        with self._lock:
+            faltan = [t for t, c in claves.items() if not self._vigente(c)]
+
+        if faltan:
+            df = self.extractor.obtener_datos(faltan, inicio, fin)
+            por_ticker = dict(tuple(df.groupby("ticker", observed=True))) if not df.empty else {}
+            with self._lock:
+                for t in faltan:
+                    df_t = por_ticker.get(t)
+                    if df_t is not None and not df_t.empty:
+                        self._guardar(claves[t], df_t.reset_index(drop=True), fin, persistir=True,
+                                      meta={"ticker": t, "inicio": inicio, "fin": fin})
+
+        partes = [p for p in (self._obtener(claves[t]) for t in tickers) if p is not None and not p.empty]
+        sin_datos = [t for t in tickers if t not in {str(p["ticker"].iloc[0]) for p in partes}]
+        if sin_datos:
+            raise ErrorPeticion(f"Sin datos para: {', '.join(sin_datos)}")
+        return pd.concat(partes, ignore_index=True)
+
+    def panel(self, tickers: list, inicio: str, fin: str):
+        from src.models.panel_precios import PanelPrecios
+        clave = EspacioTrabajo.clave("panel", self.proveedor, tickers, inicio, fin)
+        return self._calcular(clave, lambda: PanelPrecios.desde_largo(
+            self.precios(tickers, inicio, fin), modo="union", max_huecos=0), fin)
+
+    def serie(self, ticker: str, inicio: str, fin: str):
+        clave = EspacioTrabajo.clave("serie", self.proveedor, ticker, inicio, fin)
+        return self._calcular(clave, lambda: self.panel([ticker], inicio, fin).serie(ticker), fin)
+
+    def cartera(self, tickers: list, inicio: str, fin: str, pesos: dict = None):
+        clave = EspacioTrabajo.clave("cartera", self.proveedor, tickers, inicio, fin,
+                                     sorted((pesos or {}).items()))
+        return self._calcular(clave, lambda: self.panel(tickers, inicio, fin).cartera(tickers, pesos=pesos), fin)
+
+    # ==========================
+    # 🔹 Endpoints
+    # ==========================
+    def salud(self, params: dict) -> dict:
+        return {"estado": "ok", "proveedor": self.proveedor, "peticiones": self.peticiones,
+                "activo_segundos": round(time.time() - self.inicio, 1), "espacio": repr(self.espacio)}
+
+    def metricas_serie(self, params: dict) -> dict:
+        ticker = self._ticker(params)
+        inicio, fin = self._rango(params)
+        clave = EspacioTrabajo.clave("metricas_serie", self.proveedor, ticker, inicio, fin)
+        return self._calcular(clave, lambda: {**self.serie(ticker, inicio, fin).resumen(), "inicio": inicio, "fin": fin},
+                              fin)
+
+    def metricas_cartera(self, params: dict) -> dict:
+        tickers, pesos = self._tickers(params), self._pesos(params)
+        inicio, fin = self._rango(params)
+        clave = EspacioTrabajo.clave("metricas_cartera", self.proveedor, tickers, inicio, fin, sorted(pesos.items()))
+
+        def calcular():
+            cartera = self.cartera(tickers, inicio, fin, pesos)
+            return {**cartera.calcular_metricas_globales(), "correlacion_media": cartera.calcular_diversificacion(),
+                    "observaciones": len(cartera.calcular_retornos()), "inicio": inicio, "fin": fin}
+        return self._calcular(clave, calcular, fin)
+
+    def var(self, params: dict) -> dict:
+        tickers, pesos = self._tickers(params), self._pesos(params)
+        inicio, fin = self._rango(params)
+        alpha = _numero(params, "alpha", 0.05, float)
+        if not 0 < alpha < 1:
+            raise ErrorPeticion("alpha debe estar entre 0 y 1")
+        clave = EspacioTrabajo.clave("var", self.proveedor, tickers, inicio, fin, sorted(pesos.items()), alpha)
+
+        def calcular():
+            cartera = self.cartera(tickers, inicio, fin, pesos)
+            df_rets = cartera.calcular_retornos()
+            if df_rets.empty:
+                raise ErrorPeticion("No hay fechas comunes entre los activos.")
+            w = np.array([cartera.pesos.get(t, 1 / len(df_rets.columns)) for t in df_rets.columns])
+            w = w / w.sum()
+            return {"alpha": alpha, "var": cartera.calcular_var(df_rets, w, alpha=alpha),
+                    "cvar": cartera.calcular_cvar(df_rets, w, alpha=alpha),
+                    "pesos": dict(zip(df_rets.columns, w)), "observaciones": len(df_rets), "inicio": inicio, "fin": fin}
+        return self._calcular(clave, calcular, fin)
+
+    def simulacion(self, params: dict) -> dict:
+        inicio, fin = self._rango(params)
+        dias = _numero(params, "dias", 252, int)
+        simulaciones = _numero(params, "simulaciones", 500, int)
+        semilla = _numero(params, "semilla", None, int)
+        if not (1 < dias <= 5000 and 0 < simulaciones <= 100_000):
+            raise ErrorPeticion("dias debe estar en (1, 5000] y simulaciones en (0, 100000]")
+
+        if params.get("ticker"):
+            ticker = self._ticker(params)
+            objetivo = ("serie", ticker)
+            lanzar = lambda: self.pool.submit(_simular_serie, self.serie(ticker, inicio, fin), dias, simulaciones, semilla)
+        else:
+            tickers, pesos = self._tickers(params), self._pesos(params)
+            objetivo = ("cartera", tickers, sorted(pesos.items()))
+            lanzar = lambda: self.pool.submit(_simular_cartera, self.cartera(tickers, inicio, fin, pesos),
+                                              dias, simulaciones, semilla)
+
+        calcular = lambda: {**lanzar().result(), "inicio": inicio, "fin": fin, "semilla": semilla}
+        if semilla is None:
+            # Sin semilla cada petición pide trayectorias nuevas
+            return calcular()
+        clave = EspacioTrabajo.clave("simulacion", self.proveedor, *objetivo, inicio, fin, dias, simulaciones, semilla)
+        return self._calcular(clave, calcular, fin)
+
+
+# ==========================================================
+# Parámetros
+# ==========================================================
+def _ticker(params: dict) -> str:
+    ticker = str(params.get("ticker", "")).strip().upper()
+    if not ticker:
+        raise ErrorPeticion("Falta el parámetro 'ticker'.")
+    return ticker
+
+
+def _tickers(params: dict) -> list:
+    tickers = params.get("tickers", "")
+    if isinstance(tickers, str):
+        tickers = tickers.split(",")
+    tickers = list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+    if not tickers:
+        raise ErrorPeticion("Falta el parámetro 'tickers' (separados por coma).")
+    return tickers
+
+
+def _pesos(params: dict) -> dict:
+    pesos = params.get("pesos") or {}
+    if isinstance(pesos, str):
+        try:
+            pesos = {t.strip().upper(): float(w) for t, w in (p.split(":") for p in pesos.split(",") if p.strip())}
+        except ValueError:
+            raise ErrorPeticion("'pesos' debe tener el formato TICKER:peso,TICKER:peso")
+    return {str(t).upper(): float(w) for t, w in pesos.items()}
+
+
+def _numero(params: dict, nombre: str, defecto, tipo):
+    valor = params.get(nombre)
+    if valor in (None, ""):
+        return defecto
+    try:
+        return tipo(valor)
+    except (TypeError, ValueError):
+        raise ErrorPeticion(f"'{nombre}' debe ser numérico")
+
+
+# ==========================================================
+# Servidor HTTP
+# ==========================================================
+def _crear_manejador(servicio: ServicioAnalisis):
+    rutas = {
+        "/salud": servicio.salud,
+        "/series/metricas": servicio.metricas_serie,
+        "/cartera/metricas": servicio.metricas_cartera,
+        "/cartera/var": servicio.var,
+        "/simulacion": servicio.simulacion,
+    }
+
+    class Manejador(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _responder(self, codigo: int, cuerpo: dict):
+            datos = json.dumps(_sanear(cuerpo), ensure_ascii=False).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(datos)))
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def _atender(self, params: dict):
+            url = urlparse(self.path)
+            funcion = rutas.get(url.path.rstrip("/") or "/")
+            if funcion is None:
+                return self._responder(404, {"error": f"Ruta desconocida: {url.path}", "rutas": sorted(rutas)})
+
+            t0 = time.perf_counter()
+            servicio.peticiones += 1
+            try:
+                resultado = funcion(params)
+            except ErrorPeticion as e:
+                return self._responder(400, {"error": str(e)})
+            except Exception as e:
+                return self._responder(500, {"error": f"{type(e).__name__}: {e}"})
+            self._responder(200, {**resultado, "ms": round((time.perf_counter() - t0) * 1000, 2)})
+
+        def do_GET(self):
+            consulta = parse_qs(urlparse(self.path).query)
+            self._atender({k: v[-1] for k, v in consulta.items()})
+
+        def do_POST(self):
+            longitud = int(self.headers.get("Content-Length") or 0)
+            try:
+                cuerpo = json.loads(self.rfile.read(longitud) or b"{}")
+            except ValueError:
+                return self._responder(400, {"error": "Cuerpo JSON inválido"})
+            self._atender(cuerpo if isinstance(cuerpo, dict) else {})
+
+        def log_message(self, formato, *args):
+            print(f"🌐 {self.address_string()} {formato % args}")
+
+    return Manejador
+
+
+def servir(host: str = "127.0.0.1", puerto: int = 8765, proveedor: str = "yahoo",
+           presupuesto_mb: float = 1024, max_workers: int = None):
+    """Arranca el servicio y atiende peticiones hasta Ctrl+C."""
+    servicio = ServicioAnalisis(proveedor=proveedor, presupuesto_mb=presupuesto_mb, max_workers=max_workers)
+    servidor = ThreadingHTTPServer((host, puerto), _crear_manejador(servicio))
+    servidor.daemon_threads = True
+    print(f"🚀 Servicio de análisis en http://{host}:{servidor.server_port} (proveedor: {proveedor}). Ctrl+C para parar.")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servicio detenido.")
+    finally:
+        servidor.server_close()
+        servicio.cerrar()
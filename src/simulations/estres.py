@@ -0,0 +1,198 @@
+# src/simulations/estres.py
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+
+class MotorEstres:
+    """
+    Motor de escenarios de estrés para una o varias carteras.
+
+    Todos los escenarios se guardan como matrices y se evalúan de una sola vez:
+    - Escenarios lineales (históricos y shocks de factores): matriz (escenarios × activos)
+      de retornos simples. P&L = pesos (carteras × activos) @ shocks.T
+    - Escenarios de covarianza (volatilidad / correlación): pila (escenarios × activos × activos)
+      de matrices de covarianza. Se reporta el VaR paramétrico de cada cartera.
+
+    La tabla de `ejecutar()` distingue ambas medidas en el nivel "medida" del índice
+    ("pnl_%" frente a "var_param_%"): no son comparables entre sí.
+    """
+
+    def __init__(self, carteras: list, horizonte_dias: int = 1):
+        if not carteras:
+            raise ValueError("El motor de estrés necesita al menos una cartera.")
+
+        self.carteras = carteras
+        self.horizonte_dias = horizonte_dias
+
+        # --- Retornos alineados de todo el universo de activos ---
+        dfs = [c.calcular_retornos() for c in carteras]
+        dfs = [d for d in dfs if not d.empty]
+        if not dfs:
+            raise ValueError("Ninguna cartera tiene retornos válidos.")
+
+        df_rets = pd.concat(dfs, axis=1, join="inner")
+        self.retornos = df_rets.loc[:, ~df_rets.columns.duplicated()].sort_index()
+        self.tickers = list(self.retornos.columns)
+        self._col = {t: i for i, t in enumerate(self.tickers)}
+        self.covarianza = self.retornos.cov().values
+
+        # --- Matriz de pesos (carteras × activos), 0 si la cartera no tiene el activo ---
+        self.pesos = np.zeros((len(carteras), len(self.tickers)))
+        for i, c in enumerate(carteras):
+            propios = [s.ticker for s in c.series if s.ticker in self._col]
+            if not propios:
+                continue
+            w = np.array([c.pesos.get(t, 1 / len(propios)) for t in propios], dtype=float)
+            self.pesos[i, [self._col[t] for t in propios]] = w / w.sum()
+
+        self._nombres_lineales = []
+        self._tipos_lineales = []
+        self._shocks = []            # lista de bloques (k × activos)
+        self._nombres_cov = []
+        self._covs = []              # lista de bloques (k × activos × activos)
+        self._alphas_cov = []
+
+    # ==========================================================
+    # Biblioteca de escenarios
+    # ==========================================================
+    def agregar_historicos(self, ventana: int = 20, paso: int = 1, peores: int = None):
+        """
+        Añade ventanas históricas de `ventana` días tomadas de calcular_retornos().
+        Cada ventana se convierte en un shock de retorno simple acumulado por activo.
+
+        Si se indica `peores`, solo se conservan las N ventanas con peor P&L
+        para la cartera equiponderada del universo.
+        """
+        log_rets = self.retornos.values
+        if len(log_rets) < ventana:
+            print(f"⚠️ Histórico insuficiente para ventanas de {ventana} días.")
+            return self
+
+        # Suma de retornos logarítmicos por ventana mediante suma acumulada
+        acum = np.vstack([np.zeros(log_rets.shape[1]), np.cumsum(log_rets, axis=0)])
+        fin = np.arange(ventana, len(acum), paso)
+        shocks = np.expm1(acum[fin] - acum[fin - ventana])
+        fechas = self.retornos.index[fin - 1]
+
+        if peores is not None and peores < len(shocks):
+            pnl_eq = shocks.mean(axis=1)
+            idx = np.sort(np.argpartition(pnl_eq, peores)[:peores])
+            shocks, fechas = shocks[idx], fechas[idx]
+
+        self._shocks.append(shocks)
+        self._nombres_lineales += [f"Histórico {ventana}d → {pd.Timestamp(f).date()}" for f in fechas]
+        self._tipos_lineales += ["historico"] * len(shocks)
+        return self
+
+    def agregar_shock_factores(self, nombre: str, shocks: dict, exposiciones: pd.DataFrame = None):
+        """
+        Añade un escenario hipotético de shocks de factores.
+
+        Parámetros
+        ----------
+        shocks : dict
+            Factor (o ticker) → retorno simple del shock (ej. {"TIPOS": 0.01, "RENTA_VARIABLE": -0.20}).
+        exposiciones : pd.DataFrame, opcional
+            Matriz (tickers × factores) de sensibilidades. Las claves de `shocks` que
+            coinciden con un ticker se aplican directamente sobre ese activo.
+        """
+        vector = np.zeros(len(self.tickers))
+
+        if exposiciones is not None:
+            factores = [f for f in shocks if f in exposiciones.columns]
+            if factores:
+                expo = exposiciones.reindex(index=self.tickers, columns=factores).fillna(0.0).values
+                vector += expo @ np.array([shocks[f] for f in factores], dtype=float)
+
+        for clave, valor in shocks.items():
+            if clave in self._col:
+                vector[self._col[clave]] += valor
+
+        self._shocks.append(vector[np.newaxis, :])
+        self._nombres_lineales.append(nombre)
+        self._tipos_lineales.append("factores")
+        return self
+
+    def agregar_shock_covarianza(self, nombre: str, mult_vol=1.0, correlacion: float = None, alpha: float = 0.05):
+        """
+        Añade un escenario de estrés sobre la matriz de covarianza.
+
+        Parámetros
+        ----------
+        mult_vol : float o dict
+            Multiplicador de volatilidad global o por ticker.
+        correlacion : float, opcional
+            Correlación objetivo fuera de la diagonal (ej. 0.9 para crisis).
+        alpha : float
+            Nivel del VaR paramétrico reportado.
+        """
+        vols = np.sqrt(np.diag(self.covarianza))
+        # Un activo sin volatilidad (precio plano) no tiene correlación definida: 0 fuera de la diagonal
+        denominador = np.outer(vols, vols)
+        corr = np.divide(self.covarianza, denominador, out=np.zeros_like(self.covarianza),
+                         where=denominador > 0)
+        np.fill_diagonal(corr, 1.0)
+
+        if isinstance(mult_vol, dict):
+            mult = np.array([mult_vol.get(t, 1.0) for t in self.tickers], dtype=float)
+        else:
+            mult = np.full(len(self.tickers), float(mult_vol))
+
+        if correlacion is not None:
+            corr = np.full_like(corr, correlacion)
+            np.fill_diagonal(corr, 1.0)
+
+        vols_estres = vols * mult
+        cov = corr * np.outer(vols_estres, vols_estres)
+
+        self._covs.append(cov[np.newaxis, :, :])
+        self._nombres_cov.append(nombre)
+        self._alphas_cov.append(alpha)
+        return self
+
+    # ==========================================================
+    # Evaluación por lotes
+    # ==========================================================
+    def ejecutar(self) -> pd.DataFrame:
+        """
+        Evalúa todos los escenarios sobre todas las carteras en operaciones matriciales.
+
+        Retorna
+        -------
+        pd.DataFrame
+            Índice (tipo, escenario, medida) y una columna por cartera. En escenarios lineales
+            la medida es "pnl_%" (P&L en % del valor); en los de covarianza, "var_param_%"
+            (VaR paramétrico en % al horizonte indicado).
+        """
+        nombres_carteras = [c.nombre for c in self.carteras]
+        bloques = []
+
+        if self._shocks:
+            shocks = np.vstack(self._shocks)                      # (S × N)
+            pnl = shocks @ self.pesos.T * 100                     # (S × C)
+            indice = pd.MultiIndex.from_arrays([self._tipos_lineales, self._nombres_lineales,
+                                                ["pnl_%"] * len(self._nombres_lineales)],
+                                               names=["tipo", "escenario", "medida"])
+            bloques.append(pd.DataFrame(pnl, index=indice, columns=nombres_carteras))
+
+        if self._covs:
+            covs = np.concatenate(self._covs)                     # (S × N × N)
+            var_cart = np.einsum("ci,sij,cj->sc", self.pesos, covs, self.pesos)
+            z = norm.ppf(np.array(self._alphas_cov))[:, np.newaxis]
+            var_param = z * np.sqrt(var_cart * self.horizonte_dias) * 100
+            indice = pd.MultiIndex.from_arrays([["covarianza"] * len(self._nombres_cov), self._nombres_cov,
+                                                ["var_param_%"] * len(self._nombres_cov)],
+                                               names=["tipo", "escenario", "medida"])
+            bloques.append(pd.DataFrame(var_param, index=indice, columns=nombres_carteras))
+
+        if not bloques:
+            print("⚠️ No hay escenarios definidos en el motor de estrés.")
+            return pd.DataFrame(columns=nombres_carteras)
+
+        return pd.concat(bloques)
+
+    def resumen(self, tabla: pd.DataFrame = None) -> pd.DataFrame:
+        """Peor escenario y valor medio por cartera, tipo de escenario y medida."""
+        tabla = self.ejecutar() if tabla is None else tabla
+        return tabla.groupby(level=["tipo", "medida"]).agg(["min", "mean"])
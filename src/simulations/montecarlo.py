@@ -1,7 +1,6 @@
 # src/simulations/montecarlo.py
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
 def montecarlo_simulation(
     initial_price: float,
@@ -67,6 +66,9 @@ def plot_simulations(sim_df: pd.DataFrame, n_plot: int = 50, title: str = "Monte
     """
     Dibuja las simulaciones (subset de n_plot) y un histograma del valor final.
     """
+    # pyplot solo se carga al dibujar (simular no necesita matplotlib)
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=figsize)
     # plot subset of columns
     n_plot = min(n_plot, sim_df.shape[1])
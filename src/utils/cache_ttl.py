@@ -0,0 +1,56 @@
+# src/utils/cache_ttl.py
+import hashlib
+import json
+import os
+import time
+
+import pandas as pd
+
+
+class CacheTTL:
+    """
+    Caché en disco con caducidad (TTL) basada en la fecha de modificación del fichero.
+
+    Guarda DataFrames (Parquet) o payloads JSON bajo una clave arbitraria:
+        <directorio>/<sha1(clave)>.parquet | .json
+    """
+
+    def __init__(self, directorio: str, ttl_segundos: float):
+        self.directorio = directorio
+        self.ttl_segundos = ttl_segundos
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave: str, extension: str) -> str:
+        nombre = hashlib.sha1(clave.encode("utf-8")).hexdigest()
+        return os.path.join(self.directorio, f"{nombre}.{extension}")
+
+    def _vigente(self, ruta: str) -> bool:
+        return os.path.exists(ruta) and (time.time() - os.path.getmtime(ruta)) < self.ttl_segundos
+
+    # ==========================
+    # 🔹 DataFrames
+    # ==========================
+    def leer_frame(self, clave: str):
+        ruta = self._ruta(clave, "parquet")
+        return pd.read_parquet(ruta) if self._vigente(ruta) else None
+
+    def guardar_frame(self, clave: str, df: pd.DataFrame):
+        ruta = self._ruta(clave, "parquet")
+        df.to_parquet(ruta + ".tmp", index=False)
+        os.replace(ruta + ".tmp", ruta)
+
+    # ==========================
+    # 🔹 JSON
+    # ==========================
+    def leer_json(self, clave: str):
+        ruta = self._ruta(clave, "json")
+        if not self._vigente(ruta):
+            return None
+        with open(ruta, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def guardar_json(self, clave: str, datos):
+        ruta = self._ruta(clave, "json")
+        with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(datos, f)
+        os.replace(ruta + ".tmp", ruta)
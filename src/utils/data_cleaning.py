@@ -1,27 +1,53 @@
 # src/utils/data_cleaning.py
+import numpy as np
 import pandas as pd
 
-def limpiar_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    """Función básica de limpieza y preprocesado para el DF estandarizado."""
+COLUMNAS_PRECIO = ['open', 'high', 'low', 'close', 'adjusted_close']
+
+
+def limpiar_dataframe(df: pd.DataFrame, precios_float32: bool = False) -> pd.DataFrame:
+    """
+    Función básica de limpieza y preprocesado para el DF estandarizado.
+
+    Devuelve un frame canónico y compacto:
+    - date en datetime64, ticker como category
+    - precios en float64 (o float32 si precios_float32=True), volume entero
+    - sin duplicados (date, ticker) ni cierres vacíos, ordenado por (ticker, date)
+    """
     if df.empty:
         return df
 
-    # 1. Asegurar tipos
+    df = df.copy()
+
+    # 1. Asegurar tipos (antes de deduplicar, para no comparar objetos)
     if 'date' in df.columns:
         df['date'] = pd.to_datetime(df['date'])
 
-    # 2. Eliminar duplicados (por 'date' y 'ticker' si existen)
-    subset_cols = [c for c in ['date', 'ticker'] if c in df.columns]
-    if subset_cols:
-        df = df.drop_duplicates(subset=subset_cols, keep='first')
+    tipo_precio = np.float32 if precios_float32 else np.float64
+    for col in COLUMNAS_PRECIO:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(tipo_precio)
 
-    # 3. Rellenar/manejar NaNs
+    if 'volume' in df.columns:
+        volumen = pd.to_numeric(df['volume'], errors='coerce')
+        # int64 si no hay huecos; entero con nulos (Int64) si los hay
+        df['volume'] = volumen.round().astype('int64' if volumen.notna().all() else 'Int64')
+
+    if 'ticker' in df.columns:
+        df['ticker'] = df['ticker'].astype('category')
+
+    # 2. Rellenar/manejar NaNs
     if 'close' in df.columns:
-        df.dropna(subset=['close'], inplace=True)
+        df = df[df['close'].notna()]
 
-    # 4. Forzar numéricos en columnas conocidas
-    for col in ['open', 'high', 'low', 'close', 'volume']:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+    # 3. Ordenar una sola vez por (ticker, date) y eliminar duplicados (se conserva el primero)
+    subset_cols = [c for c in ['ticker', 'date'] if c in df.columns]
+    if subset_cols:
+        df = df.sort_values(subset_cols, kind='mergesort')
+        df = df[~df.duplicated(subset=subset_cols, keep='first')]
+
+    if 'ticker' in df.columns:
+        # Un subconjunto de un frame ya canónico arrastra categorías de tickers ausentes
+        df['ticker'] = df['ticker'].cat.remove_unused_categories()
 
-    return df
+    return df.reset_index(drop=True)
@@ -1,3 +1,5 @@
+from dataclasses import dataclass, field
+
 import pandas as pd
 import numpy as np
 
@@ -9,35 +11,220 @@ def rellenar_na(df: pd.DataFrame, estrategia: str = 'media', columnas: list = No
     """
     columnas = columnas or df.columns
     for col in columnas:
-        if estrategia == 'media' and pd.api.types.is_numeric_dtype(df[col]):
-            df[col] = df[col].fillna(df[col].mean())
-
-        elif estrategia == 'mediana' and pd.api.types.is_numeric_dtype(df[col]):
-            df[col] = df[col].fillna(df[col].median())
+        if estrategia in ('media', 'mediana') and pd.api.types.is_numeric_dtype(df[col]):
+            relleno = df[col].mean() if estrategia == 'media' else df[col].median()
+            # Columnas enteras (p. ej. volume como Int64): el relleno también debe ser entero
+            if pd.api.types.is_integer_dtype(df[col]) and pd.notna(relleno):
+                relleno = round(relleno)
+            df[col] = df[col].fillna(relleno)
         elif estrategia == 'constante':
             df[col] = df[col].fillna(valor)
     return df
 
 
 
+def rellenar_huecos_series(df: pd.DataFrame, calendario=None, max_huecos: int = 5,
+                           columna_ticker: str = 'ticker', columna_fecha: str = 'date') -> pd.DataFrame:
+    """
+    Reindexa cada ticker sobre un calendario de negociación y rellena los huecos.
+
+    - calendario: None (unión de las fechas del propio frame), 'laborables' (lunes-viernes)
+      o cualquier colección de fechas. Cada ticker solo se extiende entre su primera y su
+      última fecha; las filas fuera del calendario se descartan.
+    - Precios: forward-fill dentro de cada ticker, como máximo `max_huecos` sesiones seguidas.
+      En las filas insertadas open/high/low toman el cierre arrastrado (barra plana).
+    - volume: 0 en las sesiones sin negociación.
+    - Solo se rellenan las filas insertadas: los NaN de las filas existentes se conservan
+      para que los traten validar_df / quitar_outliers.
+
+    Los huecos más largos que `max_huecos` se dejan sin rellenar (las filas no se añaden).
+    Todo se hace con operaciones vectorizadas sobre el frame largo, sin bucles por ticker.
+    """
+    if df.empty or columna_ticker not in df.columns or columna_fecha not in df.columns:
+        return df
+
+    fechas = pd.to_datetime(df[columna_fecha]).to_numpy()
+    if calendario is None:
+        cal = np.unique(fechas)
+    elif isinstance(calendario, str) and calendario == 'laborables':
+        cal = pd.bdate_range(fechas.min(), fechas.max()).to_numpy()
+    else:
+        cal = np.unique(pd.to_datetime(pd.Index(calendario)).to_numpy())
+
+    # Filas originales que caen en el calendario, ordenadas por (ticker, fecha)
+    en_cal = np.isin(fechas, cal)
+    base = df[en_cal]
+    codigos, tickers = pd.factorize(base[columna_ticker], sort=True)
+    pos_cal = np.searchsorted(cal, fechas[en_cal])
+    orden = np.lexsort((pos_cal, codigos))
+    codigos, pos_cal = codigos[orden], pos_cal[orden]
+    base = base.iloc[orden]
+
+    # Rango [inicio, fin] de cada ticker en posiciones del calendario
+    n_tickers = len(tickers)
+    inicio = np.full(n_tickers, len(cal))
+    fin = np.full(n_tickers, -1)
+    np.minimum.at(inicio, codigos, pos_cal)
+    np.maximum.at(fin, codigos, pos_cal)
+    longitudes = fin - inicio + 1
+    desplazamiento = np.concatenate([[0], np.cumsum(longitudes)[:-1]])
+
+    # Malla completa ticker × sesión (solo dentro del rango de cada ticker)
+    total = int(longitudes.sum())
+    codigo_malla = np.repeat(np.arange(n_tickers), longitudes)
+    pos_malla = np.arange(total) - np.repeat(desplazamiento, longitudes) + np.repeat(inicio, longitudes)
+    destino = desplazamiento[codigos] + pos_cal - inicio[codigos]
+
+    original = np.zeros(total, dtype=bool)
+    original[destino] = True
+    # Tamaño del hueco al que pertenece cada fila insertada (0 en las originales)
+    id_tramo = np.cumsum(original)
+    tam_tramo = np.bincount(id_tramo, weights=~original, minlength=id_tramo[-1] + 1)
+    conservar = original | (tam_tramo[id_tramo] <= max_huecos)
+
+    resultado = {}
+    for col in base.columns:
+        if col == columna_ticker:
+            continue
+        if col == columna_fecha:
+            resultado[col] = cal[pos_malla]
+            continue
+        serie = base[col]
+        if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+            valores = np.full(total, np.nan)
+            valores[destino] = serie.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            valores = np.full(total, None, dtype=object)
+            valores[destino] = serie.to_numpy(dtype=object)
+        resultado[col] = pd.Series(valores)
+
+    precios = [c for c in ('open', 'high', 'low', 'adjusted_close') if c in resultado]
+    for col, valores in resultado.items():
+        if col in (columna_fecha, 'volume') or col in precios:
+            continue
+        # Los huecos conservados ya miden como mucho max_huecos (ver `conservar`)
+        relleno = valores.groupby(codigo_malla, sort=False).ffill()
+        resultado[col] = valores.where(original, relleno)
+    if 'close' in resultado:
+        # Barra plana en las sesiones insertadas: open/high/low = cierre arrastrado
+        for col in precios:
+            resultado[col] = resultado[col].where(original, resultado['close'])
+    if 'volume' in resultado:
+        resultado['volume'] = resultado['volume'].where(original, 0)
+
+    salida = pd.DataFrame(resultado)
+    salida.insert(len(salida.columns), columna_ticker,
+                  pd.Categorical.from_codes(codigo_malla, categories=pd.Index(tickers)))
+    salida = salida[conservar]
+
+    # Recuperar los tipos originales (float32, int64...) donde sea posible
+    for col in base.columns:
+        if col in (columna_ticker, columna_fecha):
+            continue
+        try:
+            salida[col] = salida[col].astype(base[col].dtype)
+        except (TypeError, ValueError):
+            pass
+
+    n_insertadas = int(conservar.sum() - original.sum())
+    if n_insertadas:
+        print(f"🩹 Rellenadas {n_insertadas} sesiones sin datos (máx. {max_huecos} seguidas por ticker).")
+    return salida[list(df.columns)].reset_index(drop=True)
+
+
 # FUNCION DE LIMPIEZA 2
 
-def quitar_outliers(df: pd.DataFrame, columnas: list, metodo='zscore', umbral=3):
+def _ordenar_por_ticker_fecha(df: pd.DataFrame, columna_ticker: str, columna_fecha: str) -> np.ndarray:
+    """Permutación posicional que ordena por (ticker, fecha); None si ya está ordenado."""
+    claves = [c for c in (columna_ticker, columna_fecha) if c in df.columns]
+    if not claves:
+        return None
+    if len(claves) == 2:
+        codigos = pd.factorize(df[columna_ticker], sort=True)[0] if not isinstance(
+            df[columna_ticker].dtype, pd.CategoricalDtype) else df[columna_ticker].cat.codes.to_numpy()
+        orden = np.lexsort((df[columna_fecha].to_numpy(), codigos))
+    else:
+        orden = np.argsort(df[claves[0]].to_numpy(), kind="stable")
+    return None if (orden == np.arange(len(orden))).all() else orden
+
+
+def _mascara_outliers(valores: pd.Series, grupos, metodo: str, umbral: float,
+                      ventana: int, percentiles: tuple) -> np.ndarray:
+    """Máscara booleana (True = se conserva) para una columna ya ordenada por (grupo, fecha)."""
+    g = valores.groupby(grupos, sort=False, observed=True)
+
+    if metodo == 'zscore':
+        puntuacion = (valores - g.transform('mean')).abs() / g.transform('std', ddof=0)
+        fuera = puntuacion >= umbral
+    elif metodo == 'percentil':
+        q_low = g.transform('quantile', percentiles[0])
+        q_high = g.transform('quantile', percentiles[1])
+        fuera = (valores < q_low) | (valores > q_high)
+    elif metodo == 'mad':
+        if ventana:
+            # Filtro de Hampel: mediana y MAD móviles (centradas) dentro de cada ticker
+            mediana = g.rolling(ventana, min_periods=1, center=True).median().reset_index(level=0, drop=True)
+            desvio = (valores - mediana).abs()
+            mad = desvio.groupby(grupos, sort=False, observed=True).rolling(
+                ventana, min_periods=1, center=True).median().reset_index(level=0, drop=True)
+        else:
+            mediana = g.transform('median')
+            desvio = (valores - mediana).abs()
+            mad = desvio.groupby(grupos, sort=False, observed=True).transform('median')
+        # 1.4826 · MAD estima la desviación típica bajo normalidad; MAD = 0 no marca nada
+        fuera = desvio > umbral * 1.4826 * mad.where(mad > 0, np.inf)
+    else:
+        raise ValueError(f"Método de outliers no soportado: {metodo}")
+
+    # Los NaN (p. ej. el primer retorno de cada ticker) no se consideran outliers
+    return ~fuera.fillna(False).to_numpy(dtype=bool)
+
+
+def quitar_outliers(df: pd.DataFrame, columnas: list, metodo='zscore', umbral=3,
+                    por_ticker: bool = True, sobre: str = 'precio', ventana: int = None,
+                    percentiles: tuple = (0.01, 0.99), columna_ticker: str = 'ticker',
+                    columna_fecha: str = 'date'):
     """
     Elimina outliers de las columnas numéricas.
+
+    - metodo: 'zscore', 'percentil' o 'mad' (mediana/MAD; móvil si se indica `ventana`).
+    - por_ticker: umbrales calculados dentro de cada ticker (un valor de 20€ y otro de 500€
+      no comparten percentiles).
+    - sobre: 'precio' usa el valor de la columna; 'retornos' sus retornos logarítmicos.
+
+    Todas las columnas se combinan en una única máscara que se aplica una sola vez.
     """
-    if metodo == 'zscore':
-        from scipy.stats import zscore
-        for col in columnas:
-            if pd.api.types.is_numeric_dtype(df[col]):
-                df = df[(np.abs(zscore(df[col])) < umbral)]
-    elif metodo == 'percentil':
-        for col in columnas:
-            if pd.api.types.is_numeric_dtype(df[col]):
-                q_low = df[col].quantile(0.01)
-                q_high = df[col].quantile(0.99)
-                df = df[(df[col] >= q_low) & (df[col] <= q_high)]
-    return df
+    if df.empty:
+        return df
+
+    columnas = [c for c in columnas if c in df.columns and pd.api.types.is_numeric_dtype(df[c])]
+    if not columnas:
+        return df
+
+    # Retornos y ventanas móviles necesitan orden temporal dentro de cada ticker
+    orden = _ordenar_por_ticker_fecha(df, columna_ticker, columna_fecha)
+    base = df if orden is None else df.iloc[orden]
+
+    if por_ticker and columna_ticker in base.columns:
+        grupos = pd.factorize(base[columna_ticker])[0]
+    else:
+        grupos = np.zeros(len(base), dtype=np.int8)
+
+    mascara = np.ones(len(base), dtype=bool)
+    for col in columnas:
+        valores = pd.Series(base[col].to_numpy(dtype=float, na_value=np.nan))
+        if sobre == 'retornos':
+            valores = np.log(valores.where(valores > 0)).groupby(grupos, sort=False).diff()
+        elif sobre != 'precio':
+            raise ValueError(f"'sobre' debe ser 'precio' o 'retornos', no {sobre!r}")
+        mascara &= _mascara_outliers(valores, grupos, metodo, umbral, ventana, percentiles)
+
+    # Volver al orden original de las filas
+    if orden is not None:
+        mascara_original = np.empty_like(mascara)
+        mascara_original[orden] = mascara
+        mascara = mascara_original
+    return df[mascara]
 
 
 # FUNCION DE LIMPIEZA 3
@@ -53,32 +240,85 @@ def homogeneizar_fechas(df: pd.DataFrame, columnas: list, formato: str = None):
 
 # FUNCION DE LIMPIEZA 4
 
-def validar_df(df: pd.DataFrame, columnas_unicas: list = None, permitir_negativos: list = None):
+@dataclass(eq=False)
+class ReporteValidacion:
     """
-    Realiza validaciones básicas.
+    Resultado de validar_df: una máscara booleana por comprobación con incidencias.
+
+    No copia las filas problemáticas: la memoria es fija (una máscara de N booleanos por
+    comprobación fallida) y las muestras se materializan solo cuando se piden.
+    Se comporta como el antiguo dict de errores en `len()`, `bool()`, `in` e iteración.
+    """
+    df: pd.DataFrame = field(repr=False)
+    mascaras: dict = field(default_factory=dict, repr=False)
+
+    def __len__(self):
+        return len(self.mascaras)
+
+    def __bool__(self):
+        return bool(self.mascaras)
+
+    def __iter__(self):
+        return iter(self.mascaras)
+
+    def __contains__(self, nombre):
+        return nombre in self.mascaras
+
+    def conteos(self) -> dict:
+        return {nombre: int(m.sum()) for nombre, m in self.mascaras.items()}
+
+    def indices(self, nombre: str) -> np.ndarray:
+        """Posiciones (iloc) de las filas afectadas por una comprobación."""
+        return np.flatnonzero(self.mascaras[nombre])
+
+    def muestra(self, nombre: str, n: int = 5) -> pd.DataFrame:
+        """Primeras `n` filas afectadas (se extraen bajo demanda)."""
+        return self.df.iloc[self.indices(nombre)[:n]]
+
+    def resumen(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            {"filas": list(self.conteos().values())},
+            index=pd.Index(list(self.mascaras), name="comprobacion"),
+        )
+
+
+def validar_df(df: pd.DataFrame, columnas_unicas: list = None, permitir_negativos: list = None,
+               columna_ticker: str = 'ticker', columna_fecha: str = 'date') -> ReporteValidacion:
+    """
+    Realiza validaciones básicas y devuelve un ReporteValidacion.
+
+    - duplicados: sobre la clave compuesta `columnas_unicas` (por defecto (fecha, ticker)
+      si existen; si no, filas completas). La fecha sola siempre se repite entre tickers.
+    - negativos_en_<col>: columnas numéricas no incluidas en `permitir_negativos`.
+    - ohlc_incoherente: high < low, o high/low fuera del rango [open, close].
     """
-    errores = {}
     permitir_negativos = permitir_negativos or []
-    
-    # Duplicados generales
-    dup = df.duplicated()
-    if dup.any():
-        errores['duplicados'] = df[dup]
-    
-    # Negativos no permitidos
+    mascaras = {}
+
+    def registrar(nombre, mascara):
+        mascara = np.asarray(mascara, dtype=bool)
+        if mascara.any():
+            mascaras[nombre] = mascara
+
+    if df.empty:
+        return ReporteValidacion(df, mascaras)
+
+    # Duplicados sobre la clave compuesta
+    claves = [c for c in (columnas_unicas or [columna_fecha, columna_ticker]) if c in df.columns]
+    registrar('duplicados', df.duplicated(subset=claves or None, keep=False).to_numpy())
+
+    # Negativos no permitidos (una comparación por columna)
     for col in df.select_dtypes(include=[np.number]).columns:
         if col not in permitir_negativos:
-            if (df[col] < 0).any():
-                errores[f'negativos_en_{col}'] = df[df[col] < 0]
-    
-    # Columnas únicas (solo si existen)
-    if columnas_unicas:
-        for col in columnas_unicas:
-            if col in df.columns:
-                if df[col].duplicated().any():
-                    errores[f'duplicados_en_{col}'] = df[df[col].duplicated(keep=False)]
-    
-    return errores
+            registrar(f'negativos_en_{col}', df[col].to_numpy(dtype=float, na_value=np.nan) < 0)
+
+    # Coherencia OHLC (las comparaciones con NaN dan False)
+    if {'open', 'high', 'low', 'close'}.issubset(df.columns):
+        o, h, l, c = (df[col].to_numpy(dtype=float, na_value=np.nan) for col in ('open', 'high', 'low', 'close'))
+        with np.errstate(invalid='ignore'):
+            registrar('ohlc_incoherente', (h < l) | (h < np.fmax(o, c)) | (l > np.fmin(o, c)))
+
+    return ReporteValidacion(df, mascaras)
 
 
 
@@ -105,7 +345,7 @@ def sincronizar_fechas(df: pd.DataFrame, columna_fecha: str = "date", columna_ti
     try:
         print("📅 Sincronizando fechas entre los activos...")
 
-        fechas_por_ticker = df.groupby(columna_ticker)[columna_fecha].agg(["min", "max"])
+        fechas_por_ticker = df.groupby(columna_ticker, observed=True)[columna_fecha].agg(["min", "max"])
         fecha_inicio_comun = fechas_por_ticker["min"].max()
         fecha_fin_comun = fechas_por_ticker["max"].min()
 
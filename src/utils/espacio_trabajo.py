@@ -0,0 +1,191 @@
+# src/utils/espacio_trabajo.py
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def _tamano_bytes(valor, vistos: set = None) -> int:
+    """Estimación de la memoria que ocupa un objeto (DataFrames, arrays y sus contenedores)."""
+    vistos = set() if vistos is None else vistos
+    if id(valor) in vistos:
+        # Objetos compartidos (p. ej. el panel de varias series) cuentan una sola vez
+        return 0
+    vistos.add(id(valor))
+
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, dict):
+        return sum(_tamano_bytes(v, vistos) for v in valor.values())
+    if isinstance(valor, (list, tuple, set)):
+        return sum(_tamano_bytes(v, vistos) for v in valor)
+    if hasattr(valor, "__dict__"):
+        return sys.getsizeof(valor) + sum(_tamano_bytes(v, vistos) for v in vars(valor).values())
+    return sys.getsizeof(valor)
+
+
+def rango_cerrado(fecha_fin) -> bool:
+    """Un rango que termina antes de hoy ya no cambia: se puede guardar para otras ejecuciones."""
+    try:
+        return pd.Timestamp(fecha_fin).normalize() < pd.Timestamp.today().normalize()
+    except (ValueError, TypeError):
+        return False
+
+
+class EspacioTrabajo:
+    """
+    Espacio de trabajo de la sesión: datasets descargados, datos limpios, paneles,
+    SeriePrecios/Cartera construidas y simulaciones, bajo claves derivadas de sus parámetros.
+
+    - En memoria: LRU con presupuesto (`presupuesto_mb`); al superarlo se expulsan los
+      objetos menos usados recientemente.
+    - En disco (`persistir=True`): DataFrames en Parquet y el resto en pickle, con un índice
+      JSON. Lo expulsado de memoria o guardado en una ejecución anterior se recarga al pedirlo.
+
+    Los objetos baratos de reconstruir (paneles, series, carteras) se guardan con
+    persistir=False: viven solo en memoria.
+    """
+
+    def __init__(self, directorio: str = "data/cache/sesion", presupuesto_mb: float = 512):
+        self.directorio = directorio
+        self.presupuesto_bytes = int(presupuesto_mb * 1024 ** 2)
+        self._memoria = OrderedDict()  # clave → (valor, bytes)
+        self._bytes = 0
+        os.makedirs(directorio, exist_ok=True)
+        self._ruta_indice = os.path.join(directorio, "indice.json")
+        self._indice = self._leer_indice()
+
+    # ==========================
+    # 🔹 Claves
+    # ==========================
+    @staticmethod
+    def clave(tipo: str, *partes) -> str:
+        """Clave legible y estable: tipo:parte1|parte2|... (las listas se ordenan)."""
+        normalizadas = [",".join(sorted(map(str, p))) if isinstance(p, (list, tuple, set)) else str(p)
+                        for p in partes]
+        return f"{tipo}:" + "|".join(normalizadas)
+
+    # ==========================
+    # 🔹 Índice en disco
+    # ==========================
+    def _leer_indice(self) -> dict:
+        if not os.path.exists(self._ruta_indice):
+            return {}
+        try:
+            with open(self._ruta_indice, "r", encoding="utf-8") as f:
+                indice = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Entradas cuyo fichero ya no existe no se pueden reproducir
+        return {c: e for c, e in indice.items() if os.path.exists(os.path.join(self.directorio, e["fichero"]))}
+
+    def _guardar_indice(self):
+        tmp = self._ruta_indice + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._indice, f, indent=1, ensure_ascii=False, default=str)
+        os.replace(tmp, self._ruta_indice)
+
+    def _persistir(self, clave: str, valor, meta: dict):
+        base = hashlib.sha1(clave.encode("utf-8")).hexdigest()
+        # Parquet exige nombres de columna de texto (las simulaciones usan enteros → pickle)
+        if isinstance(valor, pd.DataFrame) and all(isinstance(c, str) for c in valor.columns):
+            fichero = f"{base}.parquet"
+            valor.to_parquet(os.path.join(self.directorio, fichero + ".tmp"), index=False)
+        else:
+            fichero = f"{base}.pkl"
+            with open(os.path.join(self.directorio, fichero + ".tmp"), "wb") as f:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(os.path.join(self.directorio, fichero + ".tmp"), os.path.join(self.directorio, fichero))
+        self._indice[clave] = {"fichero": fichero, "tipo": clave.split(":", 1)[0], "meta": meta or {},
+                               "guardado": time.strftime("%Y-%m-%d %H:%M")}
+        self._guardar_indice()
+
+    def _recargar(self, clave: str):
+        ruta = os.path.join(self.directorio, self._indice[clave]["fichero"])
+        if ruta.endswith(".parquet"):
+            return pd.read_parquet(ruta)
+        with open(ruta, "rb") as f:
+            return pickle.load(f)
+
+    # ==========================
+    # 🔹 Memoria (LRU)
+    # ==========================
+    def _en_memoria(self, clave: str, valor):
+        if clave in self._memoria:
+            self._bytes -= self._memoria.pop(clave)[1]
+        tamano = _tamano_bytes(valor)
+        self._memoria[clave] = (valor, tamano)
+        self._bytes += tamano
+        # Expulsar lo menos usado hasta entrar en presupuesto (el último en llegar se queda siempre)
+        while self._bytes > self.presupuesto_bytes and len(self._memoria) > 1:
+            _, (_, liberados) = self._memoria.popitem(last=False)
+            self._bytes -= liberados
+
+    # ==========================
+    # 🔹 API
+    # ==========================
+    def __contains__(self, clave: str) -> bool:
+        return clave in self._memoria or clave in self._indice
+
+    def contiene(self, clave: str, en_disco: bool = True) -> bool:
+        """Como `in`, pero con en_disco=False ignora lo guardado en ejecuciones anteriores."""
+        return clave in self._memoria or (en_disco and clave in self._indice)
+
+    def guardar(self, clave: str, valor, persistir: bool = True, meta: dict = None):
+        self._en_memoria(clave, valor)
+        if persistir:
+            self._persistir(clave, valor, meta)
+        elif clave in self._indice:
+            # Una copia antigua en disco ya no corresponde a este valor
+            self._borrar_del_disco(clave)
+        return valor
+
+    def obtener(self, clave: str, defecto=None):
+        """Valor de `clave`: de memoria si está, si no se recarga del disco (y vuelve a memoria)."""
+        if clave in self._memoria:
+            self._memoria.move_to_end(clave)
+            return self._memoria[clave][0]
+        if clave in self._indice:
+            valor = self._recargar(clave)
+            self._en_memoria(clave, valor)
+            return valor
+        return defecto
+
+    def obtener_o_calcular(self, clave: str, funcion, persistir: bool = True, meta: dict = None, aviso: str = None):
+        """Devuelve lo guardado bajo `clave` o lo calcula con `funcion()` y lo guarda."""
+        if clave in self:
+            if aviso:
+                print(f"♻️ {aviso}")
+            return self.obtener(clave)
+        return self.guardar(clave, funcion(), persistir=persistir, meta=meta)
+
+    def listar(self, tipo: str = None) -> list:
+        """Entradas guardadas en disco (de esta u otras ejecuciones): [(clave, meta, fecha)]."""
+        return [(c, e["meta"], e["guardado"]) for c, e in self._indice.items() if tipo is None or e["tipo"] == tipo]
+
+    def olvidar(self, clave: str):
+        if clave in self._memoria:
+            self._bytes -= self._memoria.pop(clave)[1]
+        self._borrar_del_disco(clave)
+
+    def _borrar_del_disco(self, clave: str):
+        entrada = self._indice.pop(clave, None)
+        if entrada:
+            ruta = os.path.join(self.directorio, entrada["fichero"])
+            if os.path.exists(ruta):
+                os.remove(ruta)
+            self._guardar_indice()
+
+    def __repr__(self):
+        return (f"EspacioTrabajo({len(self._memoria)} en memoria, {self._bytes / 1024 ** 2:.1f}/"
+                f"{self.presupuesto_bytes / 1024 ** 2:.0f} MB, {len(self._indice)} en disco)")
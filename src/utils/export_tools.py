@@ -1,30 +1,148 @@
 import os
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from openpyxl import load_workbook
-from openpyxl.drawing.image import Image
+from src.utils.render_graficos import GraficoPendiente, obtener_servicio, resolver_imagen
 
-def exportar_a_excel(ruta_salida: str, hojas: dict, imagenes: list = None):
+FILAS_MAX_EXCEL = 1_048_000
+FILAS_PARCIAL = 50_000
+TAM_BLOQUE = 10_000
+POSIBLES_TIEMPO = ["AÑO", "YEAR", "FECHA", "DATE", "TIME_PERIOD"]
+
+
+# ==========================================================
+# Auxiliares comunes
+# ==========================================================
+def _grafico_temporal(nombre: str, contenido: pd.DataFrame, ruta_salida: str):
+    """Encola el gráfico de evolución temporal de una hoja macro (si aplica); devuelve un GraficoPendiente."""
+    if not isinstance(contenido, pd.DataFrame) or contenido.empty:
+        return None
+    col_tiempo = next((c for c in POSIBLES_TIEMPO if c in contenido.columns), None)
+    col_valor = "VALOR" if "VALOR" in contenido.columns else None
+    if not (col_tiempo and col_valor):
+        return None
+
+    img_path = f"{ruta_salida.replace('.xlsx', '')}_{nombre}.png"
+    return obtener_servicio().serie_temporal(
+        contenido[col_tiempo], contenido[col_valor], img_path,
+        titulo=f"{nombre} - Evolución temporal", xlabel=col_tiempo, ylabel=col_valor,
+    )
+
+
+def _imagenes_existentes(imagenes: list) -> list:
+    # Los gráficos pendientes aún no existen en disco: se esperan al incrustarlos
+    return [p for p in (imagenes or []) if isinstance(p, GraficoPendiente) or os.path.exists(p)]
+
+
+def _imagen(img_path, ancho: int, alto: int):
+    from openpyxl.drawing.image import Image
+    img = Image(img_path)
+    img.width = ancho
+    img.height = alto
+    return img
+
+
+def _incrustar(ws, imagen, ancho: int, alto: int, ancla: str):
+    """Espera (si hace falta) a que el gráfico esté listo y lo añade a la hoja."""
+    ruta = resolver_imagen(imagen)
+    if ruta and os.path.exists(ruta):
+        ws.add_image(_imagen(ruta, ancho, alto), ancla)
+
+
+def _recortar_si_enorme(nombre: str, contenido: pd.DataFrame, ruta_salida: str) -> pd.DataFrame:
+    """Si la hoja no cabe en Excel, guarda la tabla completa en Parquet y devuelve solo las primeras filas."""
+    filas = len(contenido)
+    if filas <= FILAS_MAX_EXCEL:
+        return contenido
+    print(f"⚠️ Hoja '{nombre}' demasiado grande ({filas:,} filas). Guardando parcial en Excel y completa en Parquet.")
+    ruta_parquet = ruta_salida.replace(".xlsx", f"_{nombre}.parquet")
+    import pyarrow.parquet as pq
+    pq.write_table(_a_tabla_arrow(contenido), ruta_parquet, compression="zstd")
+    print(f"📁 Tabla completa guardada en: {ruta_parquet}")
+    return contenido.head(FILAS_PARCIAL)
+
+
+# ==========================================================
+# Escritura en streaming (una sola pasada, memoria constante)
+# ==========================================================
+def _filas(df: pd.DataFrame):
     """
-    Exporta varias hojas a Excel, con control de tamaño y gráficos automáticos.
-    Si se pasan imágenes en 'imagenes', se insertan al final del archivo Excel.
+    Genera las filas de `df` como listas de valores Python, por bloques de TAM_BLOQUE.
+    Los bloques numéricos sin nulos se convierten de golpe con ndarray.tolist();
+    el resto pasa por object con los nulos (NaN, NaT, NA) como celdas vacías.
     """
+    numerico = all(pd.api.types.is_numeric_dtype(t) and not pd.api.types.is_bool_dtype(t)
+                   for t in df.dtypes)
+    for inicio in range(0, len(df), TAM_BLOQUE):
+        bloque = df.iloc[inicio:inicio + TAM_BLOQUE]
+        if numerico:
+            valores = bloque.to_numpy(dtype=float, na_value=np.nan)
+            if not np.isnan(valores).any():
+                yield from valores.tolist()
+                continue
+        yield from bloque.astype(object).where(bloque.notna(), None).to_numpy().tolist()
+
+
+def _escribir_hoja(ws, df: pd.DataFrame):
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    cabecera = []
+    for col in df.columns:
+        celda = WriteOnlyCell(ws, value=str(col))
+        celda.font = Font(bold=True)
+        cabecera.append(celda)
+    ws.append(cabecera)
+    for fila in _filas(df):
+        ws.append(fila)
+
+
+def _exportar_streaming(ruta_salida: str, hojas: dict, imagenes: list):
+    from openpyxl import Workbook
+
+    # Imágenes personalizadas: se asocian a la hoja de igual nombre o a una hoja propia
+    por_hoja = {}
+    for img_path in _imagenes_existentes(imagenes):
+        por_hoja.setdefault(os.path.splitext(os.path.basename(img_path))[0][:31], []).append(img_path)
+
+    # Gráficos automáticos encolados antes de escribir: se dibujan mientras se vuelcan las filas
+    graficos = {nombre: _grafico_temporal(nombre, contenido, ruta_salida) for nombre, contenido in hojas.items()}
+
+    wb = Workbook(write_only=True)
+    for nombre, contenido in hojas.items():
+        ws = wb.create_sheet(nombre[:31])
+        if isinstance(contenido, pd.DataFrame):
+            _escribir_hoja(ws, _recortar_si_enorme(nombre, contenido, ruta_salida))
+            # Gráfico automático incrustado en la misma pasada
+            if graficos[nombre]:
+                _incrustar(ws, graficos[nombre], 480, 240, "H2")
+        else:
+            # Contenido tipo texto o Markdown
+            _escribir_hoja(ws, pd.DataFrame({"Contenido": [str(contenido)]}))
+        for img_path in por_hoja.pop(nombre[:31], []):
+            _incrustar(ws, img_path, 600, 320, "A2")
+
+    for nombre_hoja, rutas in por_hoja.items():
+        ws = wb.create_sheet(nombre_hoja)
+        for img_path in rutas:
+            _incrustar(ws, img_path, 600, 320, "A2")
+
+    wb.save(ruta_salida)
+
+
+# ==========================================================
+# Escritura clásica (pandas + reapertura para los gráficos)
+# ==========================================================
+def _exportar_dos_pasadas(ruta_salida: str, hojas: dict, imagenes: list):
+    from openpyxl import load_workbook
 
-    os.makedirs(os.path.dirname(ruta_salida), exist_ok=True)
+    graficos = {nombre: _grafico_temporal(nombre, contenido, ruta_salida) for nombre, contenido in hojas.items()}
 
     # 1️⃣ Exportar todas las hojas
     with pd.ExcelWriter(ruta_salida, engine="openpyxl") as writer:
         for nombre, contenido in hojas.items():
             if isinstance(contenido, pd.DataFrame):
-                filas, columnas = contenido.shape
-                if filas > 1_048_000:
-                    print(f"⚠️ Hoja '{nombre}' demasiado grande ({filas:,} filas). Guardando parcial en Excel y completa en CSV.")
-                    contenido.head(50_000).to_excel(writer, sheet_name=nombre[:31], index=False)
-                    csv_path = ruta_salida.replace(".xlsx", f"_{nombre}.csv")
-                    contenido.to_csv(csv_path, index=False, encoding="utf-8-sig")
-                    print(f"📁 CSV completo guardado en: {csv_path}")
-                else:
-                    contenido.to_excel(writer, sheet_name=nombre[:31], index=False)
+                contenido = _recortar_si_enorme(nombre, contenido, ruta_salida)
+                contenido.to_excel(writer, sheet_name=nombre[:31], index=False)
             else:
                 # Contenido tipo texto o Markdown
                 df_texto = pd.DataFrame({"Contenido": [str(contenido)]})
@@ -34,52 +152,132 @@ def exportar_a_excel(ruta_salida: str, hojas: dict, imagenes: list = None):
     wb = load_workbook(ruta_salida)
 
     # a) Gráficos automáticos (series temporales)
-    for nombre, contenido in hojas.items():
-        if not isinstance(contenido, pd.DataFrame) or contenido.empty:
-            continue
-
-        posibles_tiempo = ["AÑO", "YEAR", "FECHA", "DATE", "TIME_PERIOD"]
-        col_tiempo = next((c for c in posibles_tiempo if c in contenido.columns), None)
-        col_valor = "VALOR" if "VALOR" in contenido.columns else None
-
-        if col_tiempo and col_valor:
-            plt.figure(figsize=(6, 3))
-            plt.plot(contenido[col_tiempo], contenido[col_valor], marker="o", linewidth=1.2)
-            plt.title(f"{nombre} - Evolución temporal")
-            plt.xlabel(col_tiempo)
-            plt.ylabel(col_valor)
-            plt.grid(True, linestyle="--", alpha=0.6)
-            plt.tight_layout()
-
-            img_path = f"{ruta_salida.replace('.xlsx', '')}_{nombre}.png"
-            plt.savefig(img_path, dpi=120)
-            plt.close()
-
-            if nombre[:31] in wb.sheetnames:
-                ws = wb[nombre[:31]]
-                img = Image(img_path)
-                img.width = 480
-                img.height = 240
-                ws.add_image(img, "H2")
+    for nombre, grafico in graficos.items():
+        if grafico and nombre[:31] in wb.sheetnames:
+            _incrustar(wb[nombre[:31]], grafico, 480, 240, "H2")
 
     # b) Imágenes personalizadas (ej. simulaciones de cartera)
-    if imagenes:
-        for img_path in imagenes:
-            if not os.path.exists(img_path):
-                continue
-            nombre_hoja = os.path.splitext(os.path.basename(img_path))[0][:31]
-            if nombre_hoja not in wb.sheetnames:
-                # Crear hoja para la imagen si no existe
-                ws = wb.create_sheet(nombre_hoja)
-            else:
-                ws = wb[nombre_hoja]
-            img = Image(img_path)
-            img.width = 600
-            img.height = 320
-            ws.add_image(img, "A2")
+    for img_path in _imagenes_existentes(imagenes):
+        nombre_hoja = os.path.splitext(os.path.basename(img_path))[0][:31]
+        if nombre_hoja not in wb.sheetnames:
+            # Crear hoja para la imagen si no existe
+            ws = wb.create_sheet(nombre_hoja)
+        else:
+            ws = wb[nombre_hoja]
+        _incrustar(ws, img_path, 600, 320, "A2")
 
     wb.save(ruta_salida)
     wb.close()
 
+
+def exportar_a_excel(ruta_salida: str, hojas: dict, imagenes: list = None, streaming: bool = True):
+    """
+    Exporta varias hojas a Excel, con control de tamaño y gráficos automáticos.
+    Si se pasan imágenes en 'imagenes', se insertan al final del archivo Excel.
+
+    streaming=True (por defecto) escribe en modo write_only de openpyxl: una sola pasada,
+    filas volcadas por bloques y gráficos incrustados mientras se escribe cada hoja, con
+    memoria constante. streaming=False usa el flujo clásico (pandas + reapertura).
+    """
+
+    os.makedirs(os.path.dirname(ruta_salida) or ".", exist_ok=True)
+
+    if streaming:
+        _exportar_streaming(ruta_salida, hojas, imagenes)
+    else:
+        _exportar_dos_pasadas(ruta_salida, hojas, imagenes)
+
     print(f"✅ Archivo Excel exportado con gráficos: {ruta_salida}")
 
+
+# ==========================================================
+# Exportación columnar (Parquet / Feather)
+# ==========================================================
+def _a_tabla_arrow(contenido):
+    """Convierte una hoja (DataFrame o texto) en una tabla Arrow con tipos de columna propios."""
+    import pyarrow as pa
+
+    if not isinstance(contenido, pd.DataFrame):
+        contenido = pd.DataFrame({"Contenido": [str(contenido)]})
+    elif not isinstance(contenido.index, pd.RangeIndex):
+        # Tablas de métricas (describe(), resúmenes...): el índice es información
+        contenido = contenido.reset_index()
+    # Arrow exige nombres de columna de texto (las simulaciones usan enteros)
+    contenido = contenido.rename(columns=str)
+    return pa.Table.from_pandas(contenido, preserve_index=False)
+
+
+def exportar_a_parquet(
+    directorio_salida: str,
+    hojas: dict,
+    formato: str = "parquet",
+    compresion: str = "zstd",
+    particionar_por: str = None,
+    filas_por_grupo: int = 100_000,
+) -> dict:
+    """
+    Exporta cada hoja como fichero columnar comprimido dentro de `directorio_salida`.
+
+    - formato: 'parquet' o 'feather' (Arrow IPC).
+    - particionar_por: columna (p. ej. 'ticker') por la que se parte en subdirectorios
+      col=valor/ las tablas que la contengan (solo Parquet).
+    - Cada row group guarda estadísticas min/max, de modo que los lectores pueden filtrar
+      por fecha o ticker sin leer el fichero entero (predicate pushdown).
+
+    Devuelve un dict nombre de hoja → ruta escrita.
+    """
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    if formato not in ("parquet", "feather"):
+        raise ValueError(f"Formato columnar no soportado: {formato}")
+
+    os.makedirs(directorio_salida, exist_ok=True)
+    rutas = {}
+    for nombre, contenido in hojas.items():
+        tabla = _a_tabla_arrow(contenido)
+        base = os.path.join(directorio_salida, nombre.replace(" ", "_"))
+
+        if formato == "feather":
+            ruta = f"{base}.feather"
+            feather.write_feather(tabla, ruta, compression=compresion)
+        elif particionar_por and particionar_por in tabla.column_names:
+            ruta = base
+            pq.write_to_dataset(
+                tabla,
+                root_path=ruta,
+                partition_cols=[particionar_por],
+                compression=compresion,
+                row_group_size=filas_por_grupo,
+                write_statistics=True,
+                existing_data_behavior="delete_matching",
+            )
+        else:
+            ruta = f"{base}.parquet"
+            pq.write_table(
+                tabla,
+                ruta,
+                compression=compresion,
+                row_group_size=filas_por_grupo,
+                write_statistics=True,
+            )
+        rutas[nombre] = ruta
+
+    print(f"✅ {len(rutas)} tabla(s) exportadas en formato {formato}: {directorio_salida}")
+    return rutas
+
+
+def exportar_resultados(ruta_excel: str, hojas: dict, imagenes: list = None, formato: str = "excel"):
+    """
+    Exporta en el formato elegido: 'excel', 'parquet' (directorio junto al .xlsx,
+    particionado por ticker) o 'ambos'. Devuelve las rutas escritas.
+    """
+    rutas = []
+    if formato in ("excel", "ambos"):
+        exportar_a_excel(ruta_excel, hojas, imagenes=imagenes)
+        rutas.append(ruta_excel)
+    if formato in ("parquet", "ambos"):
+        directorio = os.path.splitext(ruta_excel)[0]
+        exportar_a_parquet(directorio, hojas, particionar_por="ticker")
+        rutas.append(directorio)
+    return rutas
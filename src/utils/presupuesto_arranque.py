@@ -0,0 +1,85 @@
+# src/utils/presupuesto_arranque.py
+import argparse
+import os
+import subprocess
+import sys
+
+# ==========================================================
+# Presupuesto de tiempo de importación
+# ==========================================================
+# Uso:  python -m src.utils.presupuesto_arranque [--presupuesto 800] [modulo ...]
+#
+# Mide en un intérprete limpio (python -X importtime) lo que cuesta importar el punto de
+# entrada de la CLI y el de los workers batch, y comprueba que ninguna dependencia pesada
+# se cargue antes de elegirla. Devuelve código 1 si se supera el presupuesto.
+
+MODULOS_ENTRADA = ("main", "src.batch.runner")
+
+# Solo deben cargarse al elegir el extractor, exportar a Excel o dibujar
+MODULOS_DIFERIDOS = ("matplotlib", "yfinance", "wbgapi", "requests", "openpyxl", "scipy")
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def medir_importacion(modulo: str, repeticiones: int = 3) -> dict:
+    """
+    Importa `modulo` en un proceso nuevo `repeticiones` veces y devuelve:
+    - ms: tiempo acumulado de la importación (mejor de las repeticiones)
+    - mas_lentos: [(módulo importado directamente, ms)] ordenados de mayor a menor
+    - modulos: nombres de todos los módulos cargados
+    """
+    mejor = None
+    for _ in range(repeticiones):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+            cwd=RAIZ, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"No se pudo importar {modulo}:\n{proc.stderr[-2000:]}")
+
+        total, directos, modulos = 0.0, {}, set()
+        for linea in proc.stderr.splitlines():
+            if not linea.startswith("import time:") or "cumulative" in linea:
+                continue
+            _, acumulado, nombre = linea.split("|")
+            # La sangría (2 espacios por nivel) indica quién importó a quién
+            profundidad = (len(nombre) - len(nombre.lstrip())) // 2
+            nombre = nombre.strip()
+            modulos.add(nombre)
+            if profundidad == 0:
+                total += int(acumulado) / 1000
+            elif profundidad == 1:
+                directos[nombre] = directos.get(nombre, 0) + int(acumulado) / 1000
+
+        if mejor is None or total < mejor["ms"]:
+            mejor = {
+                "ms": round(total, 1),
+                "mas_lentos": sorted(((m, round(t, 1)) for m, t in directos.items()), key=lambda x: -x[1]),
+                "modulos": modulos,
+            }
+    return mejor
+
+
+def comprobar_presupuesto(modulos=MODULOS_ENTRADA, presupuesto_ms: float = 800, diferidos=MODULOS_DIFERIDOS) -> bool:
+    """Imprime el informe de arranque y devuelve True si todos los módulos cumplen."""
+    ok = True
+    for modulo in modulos:
+        medida = medir_importacion(modulo)
+        cargados = sorted(d for d in diferidos
+                          if any(m == d or m.startswith(d + ".") for m in medida["modulos"]))
+        cumple = medida["ms"] <= presupuesto_ms and not cargados
+        ok &= cumple
+
+        print(f"{'✅' if cumple else '❌'} import {modulo}: {medida['ms']:.0f} ms (presupuesto {presupuesto_ms:.0f} ms)")
+        print("   Más lentos: " + ", ".join(f"{m} {t:.0f} ms" for m, t in medida["mas_lentos"][:5]))
+        if cargados:
+            print(f"   ⚠️ Dependencias que deberían cargarse al usarse: {', '.join(cargados)}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comprueba el tiempo de importación de los puntos de entrada.")
+    parser.add_argument("modulos", nargs="*", default=list(MODULOS_ENTRADA))
+    parser.add_argument("--presupuesto", type=float, default=800, help="Milisegundos máximos por módulo.")
+    args = parser.parse_args()
+    sys.exit(0 if comprobar_presupuesto(args.modulos, args.presupuesto) else 1)
@@ -0,0 +1,194 @@
+# src/utils/render_graficos.py
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+
+# ==========================================================
+# Trabajos de dibujo (se ejecutan en los procesos del pool)
+# ==========================================================
+def _iniciar_worker():
+    # Backend sin ventana: los procesos del pool solo escriben ficheros
+    import matplotlib
+    matplotlib.use("Agg", force=True)
+
+
+def _figura(figsize):
+    # API orientada a objetos (sin pyplot): cada figura tiene su propio lienzo Agg y no hay
+    # estado global, así que se puede dibujar desde varios hilos a la vez (etapas del DAG batch)
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def _dibujar_abanico(indice: np.ndarray, trayectorias: np.ndarray, titulo: str, ruta: str, figsize=(10, 5)) -> str:
+    fig = _figura(figsize)
+    ax = fig.subplots()
+    ax.plot(indice, trayectorias, alpha=0.08)
+    ax.set_xlabel("Day")
+    ax.set_ylabel("Price")
+    ax.set_title(titulo)
+    fig.savefig(ruta, bbox_inches="tight")
+    return ruta
+
+
+def _dibujar_histograma(valores: np.ndarray, titulo: str, ruta: str, bins: int = 40) -> str:
+    fig = _figura((8, 4))
+    ax = fig.subplots()
+    ax.hist(valores, bins=bins)
+    ax.set_title(titulo)
+    fig.savefig(ruta, bbox_inches="tight")
+    return ruta
+
+
+def _dibujar_serie_temporal(x, y, titulo: str, xlabel: str, ylabel: str, ruta: str) -> str:
+    fig = _figura((6, 3))
+    ax = fig.subplots()
+    ax.plot(x, y, marker="o", linewidth=1.2)
+    ax.set_title(titulo)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(True, linestyle="--", alpha=0.6)
+    fig.tight_layout()
+    fig.savefig(ruta, dpi=120)
+    return ruta
+
+
+# ==========================================================
+# Servicio de renderizado
+# ==========================================================
+class GraficoPendiente:
+    """
+    Gráfico encolado: la ruta se conoce desde el principio y el fichero existe
+    cuando termina el trabajo. `esperar()` bloquea solo hasta ese gráfico.
+    """
+
+    def __init__(self, ruta: str, futuro: Future):
+        self.ruta = ruta
+        self.futuro = futuro
+
+    def __fspath__(self):
+        return self.ruta
+
+    def __repr__(self):
+        estado = "listo" if self.futuro.done() else "pendiente"
+        return f"GraficoPendiente({self.ruta!r}, {estado})"
+
+    def listo(self) -> bool:
+        return self.futuro.done()
+
+    def esperar(self, timeout: float = None) -> str:
+        return self.futuro.result(timeout)
+
+
+def resolver_imagen(imagen) -> str:
+    """Ruta de una imagen ya lista: espera si es un GraficoPendiente, si no la devuelve tal cual."""
+    if isinstance(imagen, GraficoPendiente):
+        try:
+            return imagen.esperar()
+        except Exception as e:
+            print(f"⚠️ No se pudo generar el gráfico {imagen.ruta}: {e}")
+            return None
+    return imagen
+
+
+class ServicioGraficos:
+    """
+    Cola de trabajos de matplotlib (abanicos de simulación, histogramas, series macro)
+    ejecutados en un pool de procesos con backend Agg.
+
+    Matplotlib es monohilo y el dibujo es CPU: repartirlo en procesos permite seguir
+    simulando o escribiendo el Excel mientras se generan los PNG. Cada método devuelve
+    un GraficoPendiente; quien incrusta la imagen espera solo por ese gráfico.
+
+    max_workers=0 dibuja en el propio proceso (útil para depurar o con 1 CPU).
+    """
+
+    def __init__(self, max_workers: int = None):
+        if max_workers is None:
+            max_workers = min(4, os.cpu_count() or 1)
+        self.max_workers = max_workers
+        self._pool = None
+        self._pendientes = []
+        self._lock = threading.Lock()
+
+    def _enviar(self, ruta: str, funcion, *args) -> GraficoPendiente:
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        if self.max_workers == 0:
+            futuro = Future()
+            try:
+                futuro.set_result(funcion(*args))
+            except Exception as e:
+                futuro.set_exception(e)
+        else:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_iniciar_worker)
+                futuro = self._pool.submit(funcion, *args)
+        grafico = GraficoPendiente(ruta, futuro)
+        with self._lock:
+            # Solo se guardan los que siguen en curso (los terminados ya no hay que esperarlos)
+            self._pendientes = [g for g in self._pendientes if not g.listo()] + [grafico]
+        return grafico
+
+    # ==========================
+    # 🔹 Tipos de gráfico
+    # ==========================
+    def abanico_simulacion(self, sim_df: pd.DataFrame, ruta: str, n_plot: int = 50, titulo: str = "Monte Carlo simulations") -> GraficoPendiente:
+        # Solo viajan al worker las trayectorias que se dibujan
+        n_plot = min(n_plot, sim_df.shape[1])
+        return self._enviar(ruta, _dibujar_abanico, sim_df.index.to_numpy(),
+                            sim_df.iloc[:, :n_plot].to_numpy(), titulo, ruta)
+
+    def histograma_final(self, sim_df: pd.DataFrame, ruta: str, titulo: str = None) -> GraficoPendiente:
+        titulo = titulo or f"Distribución del precio final ({sim_df.shape[1]} simulaciones)"
+        return self._enviar(ruta, _dibujar_histograma, sim_df.iloc[-1, :].to_numpy(), titulo, ruta)
+
+    def simulacion(self, sim_df: pd.DataFrame, ruta: str, n_plot: int = 50, titulo: str = "Monte Carlo simulations") -> list:
+        """Abanico + histograma del valor final (mismos ficheros que plot_simulations)."""
+        return [
+            self.abanico_simulacion(sim_df, ruta, n_plot=n_plot, titulo=titulo),
+            self.histograma_final(sim_df, ruta.replace(".png", "_hist.png")),
+        ]
+
+    def serie_temporal(self, x, y, ruta: str, titulo: str, xlabel: str = "", ylabel: str = "") -> GraficoPendiente:
+        return self._enviar(ruta, _dibujar_serie_temporal, np.asarray(x), np.asarray(y), titulo, xlabel, ylabel, ruta)
+
+    # ==========================
+    # 🔹 Sincronización
+    # ==========================
+    def esperar_todos(self, timeout: float = None) -> list:
+        """Espera a los gráficos que siguen en curso y devuelve sus rutas."""
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, []
+        wait([g.futuro for g in pendientes], timeout=timeout)
+        return [r for r in (resolver_imagen(g) for g in pendientes) if r]
+
+    def cerrar(self):
+        self.esperar_todos()
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+_servicio = None
+
+
+def obtener_servicio() -> ServicioGraficos:
+    """Servicio compartido por todo el proceso (el pool se crea al primer gráfico)."""
+    global _servicio
+    if _servicio is None:
+        _servicio = ServicioGraficos()
+    return _servicio
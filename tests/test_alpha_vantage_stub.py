@@ -0,0 +1,82 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from src.extractors.alpha_vantage_extractor import ExtractorAlphaVantage
+
+SERIE = {
+    "Time Series (Daily)": {
+        "2024-01-03": {"1. open": "11", "2. high": "12", "3. low": "10", "4. close": "11.5", "5. volume": "1000"},
+        "2024-01-02": {"1. open": "10", "2. high": "11", "3. low": "9", "4. close": "10.5", "5. volume": "900"},
+    }
+}
+
+LIMITE_DIARIO = {"Information": "Thank you for using Alpha Vantage! Our standard API rate limit is "
+                                "25 requests per day. Please subscribe to any of the premium plans."}
+
+
+@pytest.fixture
+def servidor_stub():
+    """Servidor HTTP local que responde con la secuencia de (estado, cuerpo) indicada."""
+    respuestas, peticiones = [], []
+
+    class Manejador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            peticiones.append(self.path)
+            estado, cuerpo = respuestas.pop(0) if len(respuestas) > 1 else respuestas[0]
+            datos = json.dumps(cuerpo).encode()
+            self.send_response(estado)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(datos)))
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            self.wfile.write(datos)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), Manejador)
+    hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+    hilo.start()
+    yield f"http://127.0.0.1:{servidor.server_port}/query", respuestas, peticiones
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_429_se_reintenta_hasta_obtener_datos(servidor_stub):
+    url, respuestas, peticiones = servidor_stub
+    respuestas.extend([(429, {"Note": "Too many requests"}), (200, SERIE)])
+
+    extractor = ExtractorAlphaVantage(api_key="demo", llamadas_por_minuto=6000, base_url=url)
+    # El reintento del 429 es otra llamada al proveedor: tiene que pasar por el limitador
+    reservas = []
+    reservar = extractor.limitador._reservar
+    extractor.limitador._reservar = lambda: reservas.append(1) or reservar()
+    df = extractor.obtener_datos(["IBM"], "2024-01-01", "2024-01-31")
+
+    assert len(peticiones) == len(reservas) == 2
+    assert list(df["close"]) == [10.5, 11.5]
+    assert set(df["ticker"].astype(str)) == {"IBM"}
+
+
+def test_cuota_diaria_no_se_reintenta(servidor_stub):
+    url, respuestas, peticiones = servidor_stub
+    respuestas.append((200, LIMITE_DIARIO))
+
+    extractor = ExtractorAlphaVantage(api_key="demo", llamadas_por_minuto=6000, base_url=url)
+    df = extractor.obtener_datos(["IBM"], "2024-01-01", "2024-01-31")
+
+    assert df.empty
+    assert len(peticiones) == 1
+
+
+def test_cuota_diaria_cancela_el_resto_de_tickers(servidor_stub):
+    url, respuestas, peticiones = servidor_stub
+    respuestas.append((200, LIMITE_DIARIO))
+
+    extractor = ExtractorAlphaVantage(api_key="demo", llamadas_por_minuto=6000, max_en_vuelo=1, base_url=url)
+    df = extractor.obtener_datos(["IBM", "AAPL", "MSFT", "GOOGL", "AMZN"], "2024-01-01", "2024-01-31")
+
+    assert df.empty
+    assert len(peticiones) == 1
@@ -0,0 +1,15 @@
+from src.batch.runner import _tickers_validos, etapa_panel, normalizar_trabajo
+from src.extractors.sintetico_extractor import ExtractorSintetico
+
+
+def test_tickers_del_router_en_formato_canonico():
+    trabajo = normalizar_trabajo({"proveedor": "auto", "tickers": "aena:bmad,AAPL,AENA.MC",
+                                  "fecha_inicio": "2024-01-01", "fecha_fin": "2024-03-31"})
+    assert trabajo["tickers"] == ["AENA.MC", "AAPL"]
+
+
+def test_lista_mixta_conserva_los_tickers_con_datos():
+    df = ExtractorSintetico().obtener_datos(["AENA.MC", "AAPL"], "2024-01-01", "2024-03-31")
+    panel = etapa_panel((df, {}))
+    assert _tickers_validos(panel, ["AENA.MC", "AAPL", "XXX"]) == ["AENA.MC", "AAPL"]
+    assert _tickers_validos(panel, ["XXX"]) == panel.tickers
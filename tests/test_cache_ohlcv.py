@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+from src.extractors.cache_ohlcv import CacheOHLCV
+
+
+def _barras(ticker, fechas):
+    return pd.DataFrame([{"date": pd.Timestamp(f), "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0,
+                          "volume": 1, "ticker": ticker} for f in fechas])
+
+
+def test_cobertura_de_dos_instancias_se_fusiona(tmp_path):
+    # Dos procesos que cargaron la cobertura a la vez: ninguno pisa lo que guardó el otro
+    a, b = CacheOHLCV("p", raiz=str(tmp_path)), CacheOHLCV("p", raiz=str(tmp_path))
+    a.marcar_cubierto("AAPL", "2024-01-01", "2024-01-31")
+    b.marcar_cubierto("MSFT", "2024-01-01", "2024-01-31")
+    b.marcar_cubierto("AAPL", "2024-02-01", "2024-02-29")
+    a.guardar()
+    b.guardar()
+
+    cobertura = CacheOHLCV("p", raiz=str(tmp_path)).cobertura
+    assert cobertura["AAPL"] == [(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-29"))]
+    assert cobertura["MSFT"] == [(pd.Timestamp("2024-01-01"), pd.Timestamp("2024-01-31"))]
+
+
+def test_escrituras_simultaneas_no_pierden_barras(tmp_path):
+    cache = CacheOHLCV("p", raiz=str(tmp_path))
+    dias = pd.bdate_range("2024-01-01", periods=40)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda d: cache.escribir("AAPL", _barras("AAPL", [d])), dias))
+
+    assert list(cache.leer("AAPL")["date"]) == list(dias)
+    assert not [f for f in (tmp_path / "p").iterdir() if f.name.endswith(".tmp")]
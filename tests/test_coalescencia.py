@@ -0,0 +1,40 @@
+import pandas as pd
+from src.extractors.coalescencia import ExtractorCoalescente
+from src.extractors.router_extractor import ExtractorRouter
+
+
+class ExtractorFijo:
+    """Devuelve dos barras por ticker pedido, con el símbolo tal como se pidió."""
+
+    def __init__(self):
+        self.pedidos = []
+
+    def obtener_datos(self, tickers, fecha_inicio, fecha_fin):
+        self.pedidos.append(list(tickers))
+        return pd.DataFrame([
+            {"date": pd.Timestamp(f), "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1, "ticker": t}
+            for t in tickers for f in ("2024-01-02", "2024-01-03")
+        ])
+
+
+def test_router_coalescido_conserva_tickers_renombrados(tmp_path):
+    fijo = ExtractorFijo()
+    router = ExtractorRouter({"yahoo": fijo}, ruta_historial=str(tmp_path / "historial.json"))
+    extractor = ExtractorCoalescente(router)
+
+    df = extractor.obtener_datos(["AENA:BMAD", "AAPL"], "2024-01-01", "2024-01-31")
+
+    assert fijo.pedidos == [["AENA.MC", "AAPL"]]
+    assert sorted(df["ticker"].astype(str).unique()) == ["AAPL", "AENA.MC"]
+    assert len(df) == 4
+
+
+def test_alias_del_mismo_ticker_se_piden_una_vez(tmp_path):
+    fijo = ExtractorFijo()
+    router = ExtractorRouter({"yahoo": fijo}, ruta_historial=str(tmp_path / "historial.json"))
+    extractor = ExtractorCoalescente(router)
+
+    df = extractor.obtener_datos(["AENA:BMAD", "AENA.MC"], "2024-01-01", "2024-01-31")
+
+    assert fijo.pedidos == [["AENA.MC"]]
+    assert len(df) == 2
@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+from src.utils.data_tools import rellenar_huecos_series
+
+
+def test_solo_se_rellenan_las_sesiones_insertadas():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-05"]),
+        "open": [10.0, 11.0, 12.0], "high": [10.0, 11.0, 12.0], "low": [10.0, 11.0, 12.0],
+        "close": [10.0, np.nan, 12.0], "volume": [100, 200, 300], "ticker": ["A"] * 3,
+    })
+    salida = rellenar_huecos_series(df, calendario="laborables").set_index("date")
+
+    assert np.isnan(salida.loc["2024-01-03", "close"])          # NaN original: se conserva
+    assert salida.loc["2024-01-04", "close"] == 10.0            # sesión insertada: último cierre válido
+    assert salida.loc["2024-01-04", "volume"] == 0
+    assert salida.loc["2024-01-03", "open"] == 11.0
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+from src.models.panel_precios import PanelPrecios
+from src.extractors.sintetico_extractor import ExtractorSintetico
+
+
+def _motor():
+    df = ExtractorSintetico().obtener_datos(["AAA", "BBB"], "2023-01-01", "2023-12-31")
+    plano = df[df["ticker"] == "AAA"].assign(ticker="PLANO", close=10.0, open=10.0, high=10.0, low=10.0)
+    panel = PanelPrecios.desde_largo(pd.concat([df, plano], ignore_index=True), modo="union", max_huecos=0)
+    return panel.cartera(["AAA", "BBB", "PLANO"], nombre="C").motor_estres()
+
+
+def test_activo_sin_volatilidad_no_propaga_nan():
+    motor = _motor()
+    motor.agregar_shock_covarianza("vol_x2", mult_vol=2.0)
+    motor.agregar_shock_covarianza("correlacion", correlacion=0.9)
+    tabla = motor.ejecutar()
+    assert np.isfinite(tabla.to_numpy()).all()
+
+
+def test_var_de_covarianza_etiquetado_aparte_del_pnl():
+    motor = _motor()
+    motor.agregar_historicos(ventana=20, peores=3)
+    motor.agregar_shock_covarianza("vol_x2", mult_vol=2.0)
+    tabla = motor.ejecutar()
+    medidas = tabla.reset_index().groupby("tipo")["medida"].unique().map(list).to_dict()
+    assert medidas == {"historico": ["pnl_%"], "covarianza": ["var_param_%"]}
@@ -0,0 +1,19 @@
+from src.extractors.cache_ohlcv import COLUMNAS_ESTANDAR
+from src.extractors.parseo_json import parsear_alphavantage, parsear_twelvedata
+
+SERIE = {"2024-01-03": {"1. open": "11", "2. high": "12", "3. low": "10", "4. close": "11.5", "5. volume": "1000"}}
+
+
+def test_rango_sin_sesiones_conserva_las_columnas():
+    df = parsear_alphavantage(SERIE, "IBM", "2024-02-01", "2024-02-29")
+    assert df.empty
+    assert list(df.columns) == COLUMNAS_ESTANDAR
+
+    df = parsear_twelvedata([], "IBM", "2024-02-01", "2024-02-29")
+    assert list(df.columns) == COLUMNAS_ESTANDAR
+
+
+def test_rango_con_sesiones():
+    df = parsear_alphavantage(SERIE, "IBM", "2024-01-01", "2024-01-31")
+    assert list(df["close"]) == [11.5]
+    assert set(COLUMNAS_ESTANDAR) <= set(df.columns)
@@ -0,0 +1,26 @@
+import glob
+import os
+
+from src.pipeline.dag import Pipeline
+
+
+def _doble(x):
+    return 2 * x
+
+
+def _pipeline(directorio):
+    return Pipeline(directorio_cache=directorio, max_workers=1).agregar("doble", _doble, parametros={"x": 21})
+
+
+def test_metadatos_ilegibles_se_recalculan(tmp_path):
+    directorio = str(tmp_path / "pipeline")
+    assert _pipeline(directorio).ejecutar()["doble"] == 42
+
+    # Metadatos a medio escribir por otro worker: la etapa se recalcula en vez de fallar
+    (ruta_meta,) = glob.glob(os.path.join(directorio, "*", "*.json"))
+    with open(ruta_meta, "w", encoding="utf-8") as f:
+        f.write('{"etapa": "dob')
+    pipeline = _pipeline(directorio)
+    assert pipeline.ejecutar()["doble"] == 42
+    assert [estado for _, estado, _ in pipeline.informe] == ["ejecutada"]
+    assert not glob.glob(os.path.join(directorio, "*", "*.tmp"))
@@ -0,0 +1,36 @@
+from src.extractors.descarga_concurrente import LimitadorTokens
+from src.planificador.refresco import Planificador, normalizar_universo
+
+
+def _planificador(tmp_path, universos, limite, segundos_ciclo=600):
+    universos = [normalizar_universo({"proveedor": "sintetico", "desde": "2024-01-01", **u}, i)
+                 for i, u in enumerate(universos)]
+    return Planificador(universos, {"sintetico": limite}, directorio=str(tmp_path / "planificador"),
+                        segundos_ciclo=segundos_ciclo, raiz_cache=str(tmp_path / "ohlcv"))
+
+
+def test_reserva_de_varios_tokens():
+    limitador = LimitadorTokens(0.001, rafaga=2)
+    assert limitador.intentar(0)
+    assert limitador.intentar(5)          # con la ráfaga llena se permite, dejando saldo negativo
+    assert not limitador.intentar(1)
+    assert limitador.intentar(0)
+
+
+def test_rafaga_limitada_a_un_minuto(tmp_path):
+    planificador = _planificador(tmp_path, [{"nombre": f"u{i}", "tickers": [f"T{i}"]} for i in range(6)], 3)
+    assert planificador.limitador("sintetico").capacidad == 3
+
+    resumen = planificador.ciclo()
+    assert (resumen["ejecutadas"], resumen["aplazadas"]) == (3, 3)
+
+
+def test_se_cobra_cada_llamada_al_proveedor(tmp_path):
+    planificador = _planificador(tmp_path, [{"nombre": "a", "tickers": ["A"]}, {"nombre": "b", "tickers": ["B"]}], 2)
+    # 'A' ya tiene marzo en caché: faltan dos rangos (antes y después) → dos llamadas
+    cache = planificador._cacheado("sintetico").cache
+    cache.marcar_cubierto("A", "2024-03-01", "2024-03-31")
+    cache.guardar()
+
+    resumen = planificador.ciclo()
+    assert (resumen["ejecutadas"], resumen["aplazadas"]) == (1, 1)
@@ -0,0 +1,21 @@
+import json
+
+from src.extractors.router_extractor import ExtractorRouter
+
+
+def test_historial_de_dos_routers_se_acumula(tmp_path):
+    ruta = str(tmp_path / "historial.json")
+    a = ExtractorRouter({"yahoo": object()}, ruta_historial=ruta)
+    b = ExtractorRouter({"yahoo": object()}, ruta_historial=ruta)
+
+    a._registrar("yahoo", "AAPL", True)
+    b._registrar("yahoo", "AAPL", False)
+    b._registrar("yahoo", "MSFT", True)
+    a._guardar_historial()
+    b._guardar_historial()
+
+    with open(ruta, encoding="utf-8") as f:
+        historial = json.load(f)
+    assert historial == {"yahoo": {"AAPL": [1, 1], "MSFT": [1, 0]}}
+    assert b.historial == historial
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+from src.extractors.router_extractor import ExtractorRouter
+from src.servicio.servidor import ErrorPeticion, ServicioAnalisis
+
+
+class ExtractorIntermitente:
+    """Primera llamada sin datos; después, dos barras por ticker con el símbolo tal como se pidió."""
+
+    def __init__(self):
+        self.pedidos = []
+
+    def obtener_datos(self, tickers, fecha_inicio, fecha_fin):
+        self.pedidos.append(list(tickers))
+        if len(self.pedidos) == 1:
+            return pd.DataFrame()
+        return pd.DataFrame([
+            {"date": pd.Timestamp(f), "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1, "ticker": t}
+            for t in tickers for f in ("2024-01-02", "2024-01-03")
+        ])
+
+
+@pytest.fixture
+def servicio(tmp_path):
+    servicio = ServicioAnalisis("sintetico", max_workers=1, directorio=str(tmp_path / "servicio"))
+    yield servicio
+    servicio.cerrar()
+
+
+def test_resultado_vacio_no_se_guarda(servicio, tmp_path):
+    servicio.extractor = ExtractorIntermitente()
+
+    with pytest.raises(ErrorPeticion):
+        servicio.precios(["AAPL"], "2024-01-01", "2024-01-31")
+    df = servicio.precios(["AAPL"], "2024-01-01", "2024-01-31")
+
+    assert servicio.extractor.pedidos == [["AAPL"], ["AAPL"]]
+    assert len(df) == 2
+
+    # Tras un reinicio los precios se leen del disco, sin volver a pedirlos
+    otro = ServicioAnalisis("sintetico", max_workers=1, directorio=str(tmp_path / "servicio"))
+    otro.extractor = ExtractorIntermitente()
+    try:
+        assert len(otro.precios(["AAPL"], "2024-01-01", "2024-01-31")) == 2
+        assert otro.extractor.pedidos == []
+    finally:
+        otro.cerrar()
+
+
+def test_ticker_renombrado_por_el_router(servicio, tmp_path):
+    fuente = ExtractorIntermitente()
+    fuente.pedidos.append(["(sin datos)"])
+    servicio.extractor = ExtractorRouter({"yahoo": fuente}, ruta_historial=str(tmp_path / "historial.json"))
+
+    df = servicio.precios([servicio._ticker({"ticker": "aena:bmad"})], "2024-01-01", "2024-01-31")
+
+    assert fuente.pedidos[-1] == ["AENA.MC"]
+    assert set(df["ticker"].astype(str)) == {"AENA.MC"}
+
+
+def test_rango_abierto_no_se_persiste_y_caduca(servicio, tmp_path):
+    servicio.extractor = ExtractorIntermitente()
+    servicio.extractor.pedidos.append(["(sin datos)"])
+    hoy = pd.Timestamp.today().strftime("%Y-%m-%d")
+
+    servicio.precios(["AAPL"], "2024-01-01", hoy)
+    servicio.precios(["AAPL"], "2024-01-01", hoy)
+    assert len(servicio.extractor.pedidos) == 2          # la segunda se sirve de memoria
+    assert servicio.espacio.listar("precios") == []
+
+    servicio.ttl_abierto = 0                             # caduca al instante: cada petición vuelve a pedirlo
+    servicio.precios(["AAPL"], "2024-02-01", hoy)
+    servicio.precios(["AAPL"], "2024-02-01", hoy)
+    assert len(servicio.extractor.pedidos) == 4
@@ -0,0 +1,20 @@
+import pandas as pd
+from src.extractors.sintetico_extractor import ExtractorSintetico
+
+
+def test_rangos_solapados_dan_las_mismas_barras():
+    extractor = ExtractorSintetico(prob_hueco=0.05, prob_nan=0.05)
+    largo = extractor.obtener_datos(["AAPL", "MSFT"], "2023-06-01", "2024-03-31")
+    corto = extractor.obtener_datos(["AAPL", "MSFT"], "2024-01-10", "2024-01-31")
+
+    solape = largo[(largo["date"] >= "2024-01-10") & (largo["date"] <= "2024-01-31")].reset_index(drop=True)
+    assert len(corto) > 0
+    pd.testing.assert_frame_equal(corto.reset_index(drop=True), solape)
+
+
+def test_rango_partido_no_introduce_saltos():
+    extractor = ExtractorSintetico()
+    entero = extractor.obtener_datos(["SAN.MC"], "2024-01-01", "2024-02-29")
+    partes = pd.concat([extractor.obtener_datos(["SAN.MC"], "2024-01-01", "2024-01-31"),
+                        extractor.obtener_datos(["SAN.MC"], "2024-02-01", "2024-02-29")], ignore_index=True)
+    pd.testing.assert_frame_equal(partes, entero)